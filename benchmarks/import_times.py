@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+#  (C) Copyright Wieger Wesselink 2020. Distributed under the GPL-3.0-or-later
+#  Software License, (See accompanying file LICENSE or copy at
+#  https://www.gnu.org/licenses/gpl-3.0.txt)
+
+# Measures the time of typical gambatools imports in a fresh interpreter. To compare with another version,
+# check it out in a separate work tree, and pass its source directory:
+#
+#   git worktree add /tmp/gambatools-old <revision>
+#   python benchmarks/import_times.py --src /tmp/gambatools-old/src
+#   python benchmarks/import_times.py
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import List
+
+STATEMENTS = ['from gambatools.dfa_algorithms import dfa_accepts_word',
+              'import gambatools.notebook',
+              ]
+
+
+def import_time(statement: str, src: str) -> float:
+    """Returns the time in seconds of executing statement in a fresh interpreter"""
+    code = 'import time\nstart = time.perf_counter()\n{}\nprint(time.perf_counter() - start)'.format(statement)
+    env = dict(os.environ, PYTHONPATH=src)
+    output = subprocess.run([sys.executable, '-c', code], env=env, check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+    return float(output.split()[-1])
+
+
+def main():
+    default_src = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+    cmdline_parser = argparse.ArgumentParser(description='Measures the import times of gambatools modules')
+    cmdline_parser.add_argument('--src', metavar='DIR', type=str, default=default_src, help='the source directory of gambatools')
+    cmdline_parser.add_argument('--repeat', metavar='N', type=int, default=10, help='the number of measurements; the minimum is reported')
+    args = cmdline_parser.parse_args()
+
+    for statement in STATEMENTS:
+        import_time(statement, args.src)  # make sure the bytecode is cached
+        times: List[float] = [import_time(statement, args.src) for _ in range(args.repeat)]
+        print('{:8.1f} ms  {}'.format(1000 * min(times), statement))
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,10 @@
 #  https://www.gnu.org/licenses/gpl-3.0.txt)
 
 import argparse
+import contextlib
+import hashlib
+import io
+import multiprocessing
 import os
 import re
 import json
@@ -28,8 +32,13 @@ from gambatools.text_utility import read_utf8_text, write_utf8_text, remove_comm
 from gambatools.language_generator import generate_language
 from gambatools.tm import TM
 from gambatools.tm_algorithms import parse_tm
+from gambatools.global_settings import GambaTools
+from gambatools.result_cache import cached_text
 
 
+# The file in the output directory that stores the hashes of the inputs of the generated notebooks
+MANIFEST_FILE = '.make_notebook.json'
+
 default_notebook_settings: Dict[str, str] = {
     'length': '8',
     'states': '0',
@@ -89,7 +98,25 @@ def unquote(word: str) -> str:
     return word
 
 
+# The commands with a result that only depends on the contents of the input files and the other arguments
+cached_commands = {'generate', 'nfa2dfa', 'dfa2regexp', 'dfa_union', 'dfa_intersection', 'dfa_symmetric_difference',
+                   'dfa_complement', 'dfa_reverse', 'dfa_minimize', 'dfa_hopfcroft', 'cfg_cyk_matrix',
+                   'chomsky1', 'chomsky2', 'chomsky3', 'chomsky4', 'chomsky5'}
+
+
 def apply_command(command: str, arguments: List[str]) -> str:
+    if command not in cached_commands:
+        return compute_command(command, arguments)
+    parts = [command]
+    for arg in arguments:
+        if os.path.isfile(arg):
+            parts.extend(['file', extension(arg), read_utf8_text(arg)])
+        else:
+            parts.extend(['value', arg])
+    return cached_text(parts, lambda: compute_command(command, arguments))
+
+
+def compute_command(command: str, arguments: List[str]) -> str:
     if command is None:
         return arguments[0]
     elif command == 'load':
@@ -276,6 +303,53 @@ def generate_latex(outputfile: str, questions: List[str]):
     write_utf8_text(outputfile, text)
 
 
+def notebook_digest(notebook_settings: Dict[str, str], with_answers: bool) -> str:
+    """Returns a hash of everything a notebook depends on: the settings, and the contents of the template file
+       and of all other files that are referred to in the settings"""
+    h = hashlib.sha256(json.dumps([sorted(notebook_settings.items()), with_answers]).encode('utf-8'))
+    for key, value in sorted(notebook_settings.items()):
+        if os.path.isfile(value):
+            with open(value, 'rb') as f:
+                h.update(key.encode('utf-8') + b'\0' + f.read())
+    return h.hexdigest()
+
+
+def process_paragraph(i: int, paragraph: str, output_directory: str, with_answers: bool, manifest: Dict[str, str]) -> Tuple[Optional[str], Optional[str], Optional[str], str]:
+    """Creates the notebook for a paragraph of the batch file. Returns the question, the output file, the hash
+       of its inputs and the printed output. If the hash matches the entry in manifest, the notebook is not
+       created again."""
+    question, outputfile, digest = None, None, None
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        try:
+            notebook_settings = parse_paragraph(paragraph)
+            question = notebook_settings.get('question', 'question {}'.format(i))
+
+            # determine the output file
+            name = notebook_settings.get('name', None)
+            if not name:
+                input_file = notebook_settings.get('inputfile', None)
+                name = remove_extension(os.path.basename(input_file)) if input_file else 'exercise{}'.format(i)
+            outputfile = os.path.join(output_directory, '{}.ipynb'.format(name))
+
+            digest = notebook_digest(notebook_settings, with_answers)
+            if manifest.get(outputfile) == digest and os.path.exists(outputfile):
+                print('Skipping {}, since it is up to date'.format(outputfile))
+            else:
+                print('Creating {}'.format(outputfile))
+                make_notebook(outputfile, notebook_settings, with_answers)
+        except Exception as e:
+            print('Error: {}'.format(e))
+            digest = None
+    return question, outputfile, digest, out.getvalue()
+
+
+def _init_worker(working_directory: Optional[str], cache_directory: Optional[str]) -> None:
+    if working_directory:
+        os.chdir(working_directory)
+    GambaTools.cache_directory = cache_directory
+
+
 def main():
     cmdline_parser = argparse.ArgumentParser(formatter_class=SmartFormatter)
     cmdline_parser.add_argument('inputfile', metavar='FILE', type=str,
@@ -297,8 +371,14 @@ def main():
     cmdline_parser.add_argument('-o', '--output-directory', metavar='DIR', type=str, action = 'store', help='the directory where the generated output is stored')
     cmdline_parser.add_argument('--with-answers', help="insert the answer in the notebook", action="store_true")
     cmdline_parser.add_argument('--latex', help="generate LaTeX output containing a list of the questions", action="store_true")
+    cmdline_parser.add_argument('--cache-dir', metavar='DIR', type=str, action='store', help='the directory of a persistent cache for generated answers')
+    cmdline_parser.add_argument('-j', '--jobs', metavar='N', type=int, action='store', default=1, help='the number of notebooks that are created in parallel')
+    cmdline_parser.add_argument('--incremental', help="only create notebooks of which the template or input files have changed since the previous run", action="store_true")
     args = cmdline_parser.parse_args()
 
+    if args.cache_dir:
+        GambaTools.cache_directory = os.path.abspath(args.cache_dir)
+
     output_directory = args.output_directory or 'output'
     if not os.path.isabs(output_directory):
         output_directory = os.path.join(os.getcwd(), output_directory)
@@ -309,24 +389,29 @@ def main():
     if args.working_directory:
         os.chdir(args.working_directory)
 
-    questions = []
+    # the hashes of the inputs of the notebooks that were created by the previous run
+    manifest_file = os.path.join(output_directory, MANIFEST_FILE)
+    manifest = {}
+    if args.incremental and os.path.exists(manifest_file):
+        manifest = json.loads(read_utf8_text(manifest_file))
 
-    for i, paragraph in enumerate(read_paragraphs(args.inputfile)):
-        try:
-            notebook_settings = parse_paragraph(paragraph)
-            questions.append(notebook_settings.get('question', 'question {}'.format(i)))
-
-            # determine the output file
-            name = notebook_settings.get('name', None)
-            if not name:
-                input_file = notebook_settings.get('inputfile', None)
-                name = remove_extension(os.path.basename(input_file)) if input_file else 'exercise{}'.format(i)
-            outputfile = os.path.join(output_directory, '{}.ipynb'.format(name))
+    jobs = [(i, paragraph, output_directory, args.with_answers, manifest) for i, paragraph in enumerate(read_paragraphs(args.inputfile))]
+    if args.jobs > 1:
+        with multiprocessing.Pool(args.jobs, initializer=_init_worker, initargs=(os.getcwd(), GambaTools.cache_directory)) as pool:
+            results = pool.starmap(process_paragraph, jobs, chunksize=1)
+    else:
+        results = [process_paragraph(*job) for job in jobs]
 
-            print('Creating {}'.format(outputfile))
-            make_notebook(outputfile, notebook_settings, args.with_answers)
-        except Exception as e:
-            print('Error: {}'.format(e))
+    # the output is printed in the order of the paragraphs
+    questions = []
+    new_manifest = {}
+    for question, outputfile, digest, output in results:
+        print(output, end='')
+        if question is not None:
+            questions.append(question)
+        if digest is not None:
+            new_manifest[outputfile] = digest
+    write_utf8_text(manifest_file, json.dumps(new_manifest, indent=2, sort_keys=True))
 
     if args.latex:
         outputfile = remove_extension(args.inputfile) + '.tex'
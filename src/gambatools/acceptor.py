@@ -0,0 +1,148 @@
+#  (C) Copyright Wieger Wesselink 2020. Distributed under the GPL-3.0-or-later
+#  Software License, (See accompanying file LICENSE or copy at
+#  https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
+
+from gambatools.cfg import CFG, Variable
+from gambatools.cfg_algorithms import cfg_to_chomsky
+from gambatools.dfa import DFA, State, Symbol
+from gambatools.nfa import NFA
+from gambatools.nfa_algorithms import _nfa_cache
+from gambatools.pda import PDA
+from gambatools.pda_algorithms import pda_accepts_word, pda_split_transitions
+from gambatools.regexp import Regexp
+from gambatools.regexp_algorithms import regexp_accepts_word, regexp_symbols, regexp_to_nfa
+from gambatools.tm import TM
+from gambatools.tm_algorithms import tm_compile
+
+
+class Acceptor(object):
+    """Decides if words are accepted by a DFA, NFA, PDA, TM, CFG or regular expression. Everything that
+       does not depend on the word is prepared once: the epsilon closures of an NFA, the Chomsky normal
+       form of a CFG, the compiled form of a TM, and the split transitions of a PDA. A regular expression
+       with single letter symbols is converted into an NFA. For an NFA the subset transitions that are
+       computed are remembered, such that a sequence of words is processed like a lazily built DFA."""
+
+    def __init__(self, A: Union[DFA, NFA, PDA, TM, CFG, Regexp], max_steps: int = 1000):
+        self.A = A
+        self.max_steps = max_steps
+        if isinstance(A, DFA):
+            self._accepts = self._dfa_accepts
+        elif isinstance(A, NFA):
+            self._init_nfa(A)
+        elif isinstance(A, PDA):
+            self._moves = pda_split_transitions(A)
+            self._accepts = self._pda_accepts
+        elif isinstance(A, TM):
+            self._compiled_tm = tm_compile(A)
+            self._accepts = self._tm_accepts
+        elif isinstance(A, CFG):
+            self._init_cfg(A)
+        elif isinstance(A, Regexp):
+            if all(len(a.symbol) == 1 for a in regexp_symbols(A)):
+                self._init_nfa(regexp_to_nfa(A))
+            else:
+                self._accepts = self._regexp_accepts
+        else:
+            raise RuntimeError('cannot decide membership for an object of type {}'.format(A.__class__.__name__))
+
+    def accepts(self, word: str) -> bool:
+        return bool(self._accepts(word))
+
+    def first_failure(self, accepted: Iterable[str], rejected: Iterable[str]) -> Optional[Tuple[str, bool]]:
+        """Returns (word, True) for the first word in accepted that is not accepted, or (word, False) for
+           the first word in rejected that is accepted, or None if there is no such word. The words
+           are deduplicated and checked in order of increasing length, so the reported word is a shortest one."""
+        todo = [(word, True) for word in set(accepted)] + [(word, False) for word in set(rejected)]
+        todo.sort(key=lambda x: (len(x[0]), x[0], not x[1]))
+        accepts = self._accepts
+        for word, expected in todo:
+            if bool(accepts(word)) != expected:
+                return word, expected
+        return None
+
+    def _dfa_accepts(self, word: str) -> bool:
+        delta = self.A.delta
+        q = self.A.q0
+        for a in word:
+            q = delta.get((q, a))
+            if q is None:  # a is not in the alphabet
+                return False
+        return q in self.A.F
+
+    def _init_nfa(self, N: NFA) -> None:
+        Eq, Eqa = _nfa_cache(N)
+        self._nfa_F = N.F
+        self._nfa_initial: FrozenSet[State] = frozenset(Eq[N.q0])
+        self._nfa_successors: Dict[Tuple[State, Symbol], Set[State]] = dict(Eqa)
+        self._nfa_transitions: Dict[Tuple[FrozenSet[State], str], FrozenSet[State]] = {}
+        self._accepts = self._nfa_accepts
+
+    def _nfa_accepts(self, word: str) -> bool:
+        transitions = self._nfa_transitions
+        successors = self._nfa_successors
+        R = self._nfa_initial
+        for a in word:
+            R1 = transitions.get((R, a))
+            if R1 is None:
+                R1 = frozenset().union(*[successors.get((q, a), ()) for q in R])
+                transitions[R, a] = R1
+            R = R1
+            if not R:
+                return False
+        return not R.isdisjoint(self._nfa_F)
+
+    def _pda_accepts(self, word: str) -> bool:
+        return pda_accepts_word(self.A, word, self._moves)
+
+    def _tm_accepts(self, word: str) -> Optional[bool]:
+        result, _ = self._compiled_tm.run(word, self.max_steps)
+        return result
+
+    def _regexp_accepts(self, word: str) -> bool:
+        return regexp_accepts_word(self.A, word)
+
+    def _init_cfg(self, G: CFG) -> None:
+        if not G.is_chomsky():
+            G = cfg_to_chomsky(G)
+        self._cfg_S = G.S
+        self._cfg_accepts_epsilon = False
+        self._cfg_terminal_rules: Dict[str, Set[Variable]] = defaultdict(set)             # a -> {A | A -> a}
+        self._cfg_binary_rules: List[Tuple[Variable, Variable, Variable]] = []            # (A, B, C) for A -> BC
+        for rule in G.R:
+            symbols = rule.alternative.symbols
+            if not symbols:
+                self._cfg_accepts_epsilon = self._cfg_accepts_epsilon or rule.variable == G.S
+            elif len(symbols) == 1:
+                self._cfg_terminal_rules[symbols[0]].add(rule.variable)
+            else:
+                self._cfg_binary_rules.append((rule.variable, symbols[0], symbols[1]))
+        self._accepts = self._cfg_accepts
+
+    def _cfg_accepts(self, word: str) -> bool:
+        """The CYK algorithm, see also cfg_cyk_matrix"""
+        n = len(word)
+        if n == 0:
+            return self._cfg_accepts_epsilon
+        terminal_rules = self._cfg_terminal_rules
+        binary_rules = self._cfg_binary_rules
+
+        # X[i][j] = { A | A derives word[i:i + j + 1] }
+        X = [[set() for _ in range(n - i)] for i in range(n)]
+        for i, a in enumerate(word):
+            X[i][0] = terminal_rules.get(a, set())
+            if not X[i][0]:
+                return False
+        for m in range(1, n):
+            for i in range(n - m):
+                Xim = X[i][m]
+                for k in range(m):
+                    left = X[i][k]
+                    right = X[i + k + 1][m - k - 1]
+                    if left and right:
+                        for (A, B, C) in binary_rules:
+                            if B in left and C in right:
+                                Xim.add(A)
+        return self._cfg_S in X[0][n - 1]
@@ -2,7 +2,7 @@
 #  Software License, (See accompanying file LICENSE or copy at
 #  https://www.gnu.org/licenses/gpl-3.0.txt)
 
-from typing import Set, List, Tuple, Mapping, Any
+from typing import Set, List, Tuple, Mapping, Any, Optional
 
 
 class Automaton(object):
@@ -11,17 +11,20 @@ class Automaton(object):
                  transitions: List[Tuple[str, str, str]],
                  initial_states: Set[str],
                  final_states: Set[str],
-                 items: Mapping[str, List[Any]]
+                 items: Mapping[str, List[Any]],
+                 state_regex: Optional[str] = None,
+                 checked_states: Optional[Set[str]] = None
                 ):
         self.states = states
         self.transitions = transitions
         self.initial_states = initial_states
         self.final_states = final_states
         self.items = items
+        self.state_regex = state_regex
+        self.checked_states = checked_states if checked_states is not None else set([])  # the labels that are known to match state_regex
 
     def used_states(self) -> Set[str]:
         result = self.initial_states | self.final_states
-        for (p, _, q) in self.transitions:
-            result.add(p)
-            result.add(q)
+        result.update([p for (p, _, _) in self.transitions])
+        result.update([q for (_, _, q) in self.transitions])
         return result
@@ -45,7 +45,7 @@ def pda_keywords() -> FrozenSet[str]:
 
 
 def tm_keywords() -> FrozenSet[str]:
-    return frozenset(['input_symbols', 'tape_symbols', 'blank', 'accept', 'reject'])
+    return frozenset(['input_symbols', 'tape_symbols', 'blank', 'accept', 'reject', 'tapes', 'tape_mode'])
 
 
 def automaton_keywords() -> FrozenSet[str]:
@@ -74,8 +74,10 @@ class AutomatonBuilder(object):
             raise RuntimeError('invalid symbol {}'.format(symbol))
 
     def _check_symbols(self, symbols):
+        match = re.compile(self.symbol_regex).fullmatch
         for symbol in symbols:
-            self._check_symbol(symbol)
+            if not match(symbol):
+                raise RuntimeError('invalid symbol {}'.format(symbol))
 
     def _check_state_label(self, state) -> None:
         if not re.fullmatch(self.state_regex, state):
@@ -87,8 +89,13 @@ class AutomatonBuilder(object):
 
     def _check_state_labels(self):
         A = self.A
-        for state in A.states:
-            self._check_state_label(state)
+        states = A.states
+        if A.state_regex is not None and A.state_regex == self.state_regex:
+            states = states - A.checked_states  # these labels have already been checked by the parser
+        match = re.compile(self.state_regex).fullmatch
+        for state in states:
+            if not match(state):
+                raise RuntimeError('invalid state label {}'.format(state))
 
     def _check_one_initial_state(self):
         A = self.A
@@ -166,6 +173,12 @@ class AutomatonParser(object):
         self.initial_states: Set[str] = set([])
         self.final_states: Set[str] = set([])
 
+        # The regular expressions are compiled once, and every distinct label is checked only once
+        self._match_state = re.compile(state_regex).fullmatch
+        self._match_transition = re.compile(transition_regex).fullmatch
+        self._state_labels: Set[str] = set([])
+        self._transition_labels: Set[str] = set([])
+
     def _check_no_duplicate_keys(self, key: str):
         if key in self.items:
             raise RuntimeError('the keyword "{}" is specified multiple times'.format(key))
@@ -183,12 +196,16 @@ class AutomatonParser(object):
                 raise RuntimeError('the keyword "{}" is missing'.format(key))
 
     def _check_state_label(self, state) -> None:
-        if not re.fullmatch(self.state_regex, state):
-            raise RuntimeError('invalid state label {}'.format(state))
+        if state not in self._state_labels:
+            if not self._match_state(state):
+                raise RuntimeError('invalid state label {}'.format(state))
+            self._state_labels.add(state)
 
     def _check_transition_label(self, label) -> None:
-        if not re.fullmatch(self.transition_regex, label):
-            raise RuntimeError('invalid transition label {}'.format(label))
+        if label not in self._transition_labels:
+            if not self._match_transition(label):
+                raise RuntimeError('invalid transition label {}'.format(label))
+            self._transition_labels.add(label)
 
     def parse_state(self, state: str) -> str:
         self._check_state_label(state)
@@ -215,7 +232,7 @@ class AutomatonParser(object):
             self.transitions.append((p, a, q))
 
     def parse_line(self, line: str):
-        words = line.strip().split()
+        words = line.split()
         if not words or words[0].startswith('%'):
             pass
         elif words[0] == 'states':
@@ -235,10 +252,26 @@ class AutomatonParser(object):
             self.parse_transition(words, line)
 
     def parse(self, text: str) -> Automaton:
-        lines = text.split('\n')
-        for line in lines:
+        # Lines of the form 'p q a' are by far the most common, so they are handled here directly. The
+        # other lines, and transitions with labels that have not been seen before, go through parse_line.
+        keywords = self.keywords | {'states', 'initial', 'final'}
+        state_labels = self._state_labels
+        transition_labels = self._transition_labels
+        append = self.transitions.append
+        for line in text.split('\n'):
+            words = line.split()
+            if len(words) == 3:
+                p, q, a = words
+                if p not in keywords and not p.startswith('%'):
+                    if p in state_labels and q in state_labels and a in transition_labels:
+                        append((p, a, q))
+                        continue
+                    p = self.parse_state(p)
+                    q = self.parse_state(q)
+                    append((p, self.parse_transition_label(a), q))
+                    continue
             self.parse_line(line)
-        return Automaton(self.states, self.transitions, self.initial_states, self.final_states, self.items)
+        return Automaton(self.states, self.transitions, self.initial_states, self.final_states, self.items, state_regex=self.state_regex, checked_states=self._state_labels)
 
 
 def parse_automaton(text: str, transition_regex=default_transition_label_regex(), state_regex=default_state_label_regex(), symbol_regex=default_symbol_regex()) -> Automaton:
@@ -0,0 +1,218 @@
+#  (C) Copyright Wieger Wesselink 2020. Distributed under the GPL-3.0-or-later
+#  Software License, (See accompanying file LICENSE or copy at
+#  https://www.gnu.org/licenses/gpl-3.0.txt)
+
+# A compact binary format for DFAs, NFAs, PDAs and Turing machines. The layout is
+#
+#   header        b'GAMB', version (uint16), kind (uint16)
+#   string table  count, size, offsets[count + 1], utf-8 data padded to a multiple of 4 bytes
+#   sections      length, values[length]
+#
+# All integers are little endian int32, and all sections are 4-byte aligned, such that they can be
+# mapped directly with numpy.frombuffer or array.array. States and symbols are stored as indices
+# in the string table, which is sorted. The sections depend on the kind of automaton:
+#
+#   DFA  [q0], Q, Sigma, F, table with table[i * |Sigma| + j] = the position of delta[Q[i], Sigma[j]] in Q
+#   NFA  [q0, epsilon], Q, Sigma, F, transitions (p, a, q)
+#   PDA  [q0, epsilon], Q, Sigma, Gamma, F, transitions (p, a, u, q, v)
+#   TM   [q0, q_accept, q_reject, blank, tapes, two_way], Q, Sigma, Gamma,
+#        transitions (p, a_1..a_k, q, b_1..b_k, d_1..d_k) with k the number of tapes
+
+from array import array
+from collections import defaultdict
+import itertools
+import mmap
+import struct
+import sys
+from typing import Iterable, List, Tuple, Union
+
+from gambatools.dfa import DFA, State, Symbol
+from gambatools.nfa import NFA
+from gambatools.pda import PDA
+from gambatools.tm import TM, Direction
+
+BINARY_MAGIC = b'GAMB'
+BINARY_VERSION = 1
+
+_KIND_DFA = 1
+_KIND_NFA = 2
+_KIND_PDA = 3
+_KIND_TM = 4
+
+_header = struct.Struct('<4sHH')
+
+
+def _int_array(values: Iterable[int]) -> bytes:
+    a = array('i', values)
+    if sys.byteorder == 'big':
+        a.byteswap()
+    return a.tobytes()
+
+
+def _encode(kind: int, strings: Iterable[str], sections: List[Union[List[str], array]]) -> bytes:
+    """Encodes the sections, where sections that are lists of strings are stored as indices in the string table"""
+    strings = sorted(set(strings))
+    index = {s: i for i, s in enumerate(strings)}
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = [0]
+    for e in encoded:
+        offsets.append(offsets[-1] + len(e))
+    data = b''.join(encoded)
+
+    parts = [_header.pack(BINARY_MAGIC, BINARY_VERSION, kind),
+             _int_array([len(strings), len(data)]),
+             _int_array(offsets),
+             data + b'\0' * (-len(data) % 4)]
+    for section in sections:
+        parts.append(_int_array([len(section)]))
+        parts.append(_int_array(section if isinstance(section, array) else [index[s] for s in section]))
+    return b''.join(parts)
+
+
+def _decode(data: Union[bytes, bytearray, memoryview, mmap.mmap]) -> Tuple[int, List[str], List[array]]:
+    """Returns the kind, the string table and the sections of a binary automaton"""
+    with memoryview(data) as view:
+        def ints(position: int, count: int) -> array:
+            a = array('i')
+            a.frombytes(view[position:position + 4 * count])
+            if sys.byteorder == 'big':
+                a.byteswap()
+            return a
+
+        if len(view) < _header.size:
+            raise RuntimeError('the data is too short to contain an automaton')
+        magic, version, kind = _header.unpack_from(view, 0)
+        if magic != BINARY_MAGIC:
+            raise RuntimeError('the data does not contain a binary automaton')
+        if version != BINARY_VERSION:
+            raise RuntimeError('unsupported binary automaton version {}'.format(version))
+
+        position = _header.size
+        count, size = ints(position, 2)
+        position += 8
+        offsets = ints(position, count + 1)
+        position += 4 * (count + 1)
+        text = bytes(view[position:position + size])
+        position += size + (-size % 4)
+        try:
+            # if the labels are ASCII, the byte offsets are character offsets, and the text is decoded at once
+            decoded = text.decode('ascii')
+            strings = list(map(decoded.__getitem__, map(slice, offsets[:-1], offsets[1:])))
+        except UnicodeDecodeError:
+            strings = [text[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(count)]
+
+        sections = []
+        while position < len(view):
+            length, = ints(position, 1)
+            position += 4
+            sections.append(ints(position, length))
+            position += 4 * length
+    return kind, strings, sections
+
+
+def _strings(strings: List[str], section: array) -> List[str]:
+    return list(map(strings.__getitem__, section))
+
+
+def dfa_to_bytes(D: DFA) -> bytes:
+    Q = sorted(D.Q)
+    Sigma = sorted(D.Sigma)
+    position = {q: i for i, q in enumerate(Q)}
+    delta = D.delta
+    table = array('i', [position[delta[q, a]] for q in Q for a in Sigma])
+    return _encode(_KIND_DFA, [D.q0, *Q, *Sigma, *D.F], [[D.q0], Q, Sigma, sorted(D.F), table])
+
+
+def nfa_to_bytes(N: NFA) -> bytes:
+    transitions = [s for (p, a), Q1 in N.delta.items() for q in sorted(Q1) for s in (p, a, q)]
+    strings = [N.q0, N.epsilon, *N.Q, *N.Sigma, *N.F, *transitions]
+    return _encode(_KIND_NFA, strings, [[N.q0, N.epsilon], sorted(N.Q), sorted(N.Sigma), sorted(N.F), transitions])
+
+
+def pda_to_bytes(P: PDA) -> bytes:
+    transitions = [s for (p, a, u), Q1 in P.delta.items() for (q, v) in sorted(Q1) for s in (p, a, u, q, v)]
+    strings = [P.q0, P.epsilon, *P.Q, *P.Sigma, *P.Gamma, *P.F, *transitions]
+    return _encode(_KIND_PDA, strings, [[P.q0, P.epsilon], sorted(P.Q), sorted(P.Sigma), sorted(P.Gamma), sorted(P.F), transitions])
+
+
+def tm_to_bytes(T: TM) -> bytes:
+    k = T.tapes
+    transitions = []
+    for (p, a), (q, b, d) in T.delta.items():
+        if k == 1:
+            transitions.extend((p, a, q, b, d))
+        else:
+            transitions.append(p)
+            transitions.extend(a)
+            transitions.append(q)
+            transitions.extend(b)
+            transitions.extend(d)
+    parameters = [T.q0, T.q_accept, T.q_reject, T.blank, str(k), str(int(T.two_way))]
+    strings = [*parameters, *T.Q, *T.Sigma, *T.Gamma, *transitions]
+    return _encode(_KIND_TM, strings, [parameters, sorted(T.Q), sorted(T.Sigma), sorted(T.Gamma), transitions])
+
+
+def automaton_to_bytes(A: Union[DFA, NFA, PDA, TM]) -> bytes:
+    """Returns the binary representation of a DFA, NFA, PDA or TM"""
+    if isinstance(A, DFA):
+        return dfa_to_bytes(A)
+    elif isinstance(A, NFA):
+        return nfa_to_bytes(A)
+    elif isinstance(A, PDA):
+        return pda_to_bytes(A)
+    elif isinstance(A, TM):
+        return tm_to_bytes(A)
+    raise RuntimeError('cannot convert an object of type {} to bytes'.format(A.__class__.__name__))
+
+
+def automaton_from_bytes(data: Union[bytes, bytearray, memoryview, mmap.mmap]) -> Union[DFA, NFA, PDA, TM]:
+    """Reads a DFA, NFA, PDA or TM from its binary representation"""
+    kind, strings, sections = _decode(data)
+    if kind == _KIND_DFA:
+        (q0,), Q, Sigma, F, table = [_strings(strings, section) for section in sections[:4]] + sections[4:]
+        if len(table) != len(Q) * len(Sigma) or q0 not in Q or not set(F) <= set(Q):
+            raise RuntimeError('the data does not contain a valid DFA')
+        delta = dict(zip(itertools.product(Q, Sigma), map(Q.__getitem__, table)))
+        return DFA(set(Q), set(Sigma), delta, State(q0), set(F), check_validity=False)  # the encoding guarantees validity
+
+    sections = [_strings(strings, section) for section in sections]
+    if kind == _KIND_NFA:
+        (q0, epsilon), Q, Sigma, F, transitions = sections
+        delta = defaultdict(set)
+        i = iter(transitions)
+        for (p, a, q) in zip(i, i, i):
+            delta[p, a].add(q)
+        return NFA(set(Q), set(Sigma), delta, State(q0), set(F), Symbol(epsilon))
+    elif kind == _KIND_PDA:
+        (q0, epsilon), Q, Sigma, Gamma, F, transitions = sections
+        delta = defaultdict(set)
+        i = iter(transitions)
+        for (p, a, u, q, v) in zip(i, i, i, i, i):
+            delta[p, a, u].add((q, v))
+        return PDA(set(Q), set(Sigma), set(Gamma), delta, State(q0), set(F), Symbol(epsilon))
+    elif kind == _KIND_TM:
+        (q0, q_accept, q_reject, blank, k, two_way), Q, Sigma, Gamma, transitions = sections
+        k = int(k)
+        delta = {}
+        width = 2 + 3 * k
+        for j in range(0, len(transitions), width):
+            row = transitions[j:j + width]
+            if k == 1:
+                p, a, q, b, d = row
+                delta[p, a] = (q, b, Direction(d))
+            else:
+                delta[row[0], tuple(row[1:k + 1])] = (row[k + 1], tuple(row[k + 2:2 * k + 2]), tuple(row[2 * k + 2:]))
+        return TM(set(Q), set(Sigma), set(Gamma), delta, State(q0), State(q_accept), State(q_reject), Symbol(blank), tapes=k, two_way=two_way == '1')
+    raise RuntimeError('unknown kind of automaton {}'.format(kind))
+
+
+def save_automaton_binary(A: Union[DFA, NFA, PDA, TM], filename: str) -> None:
+    with open(filename, 'wb') as f:
+        f.write(automaton_to_bytes(A))
+
+
+def load_automaton_binary(filename: str) -> Union[DFA, NFA, PDA, TM]:
+    """Loads an automaton that was saved with save_automaton_binary. The file is memory mapped."""
+    with open(filename, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            return automaton_from_bytes(m)
@@ -4,9 +4,10 @@
 
 import re
 from collections import defaultdict
-from typing import Any, Callable, Set
+from typing import Any, Callable, Set, TYPE_CHECKING
 
-import graphviz
+if TYPE_CHECKING:
+    import graphviz
 
 
 def make_label_default(label: str) -> str:
@@ -18,11 +19,18 @@ def make_label_default(label: str) -> str:
         label = re.sub('_', '□', label)
         a, b, _, d = label
         return '{}→{},{}'.format(a, b, d)
+    elif len(label) % 3 == 1 and len(label) > 4 and label[2 * (len(label) // 3)] == ',' and set(label[2 * (len(label) // 3) + 1:]) <= set('LRS'):  # assume it is a multi-tape TM transition
+        k = len(label) // 3
+        label = re.sub('_', '□', label)
+        a, b, d = label[:k], label[k:2 * k], label[2 * k + 1:]
+        return '{}→{},{}'.format(','.join(a), ','.join(b), ','.join(d))
     else:
         return re.sub('_', 'ε', label)
 
 
-def automaton_to_dot(A: Any, join_labels: bool = True, make_label: Callable[[str], str] = make_label_default) -> graphviz.Digraph:
+def automaton_to_dot(A: Any, join_labels: bool = True, make_label: Callable[[str], str] = make_label_default) -> 'graphviz.Digraph':
+    import graphviz  # imported here, such that the algorithms can be used without loading graphviz
+
     Q = A.states
     I = A.initial_states
     F = A.final_states
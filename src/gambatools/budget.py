@@ -0,0 +1,94 @@
+#  (C) Copyright Wieger Wesselink 2020. Distributed under the GPL-3.0-or-later
+#  Software License, (See accompanying file LICENSE or copy at
+#  https://www.gnu.org/licenses/gpl-3.0.txt)
+
+# Cooperative resource limits for algorithms that may blow up on pathological input, like nfa_to_dfa,
+# pda_words_up_to_n, cfg_words_up_to_n and regexp_words_up_to_n. A budget is activated like this:
+#
+#   with budget_limit(Budget(max_steps=10**6, max_time=5)):
+#       D = nfa_to_dfa(N)
+#
+# The algorithms check the active budget periodically, and raise BudgetExceeded when it is exhausted.
+# Without an active budget the checks are skipped.
+
+import contextlib
+import threading
+import time
+from typing import Iterator, Optional
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised when an algorithm exceeds its budget. The attribute resource is 'steps', 'states', 'time' or 'memory'."""
+
+    def __init__(self, resource: str, limit: float):
+        descriptions = {'steps': 'number of steps', 'states': 'number of states', 'time': 'time in seconds', 'memory': 'estimated memory in bytes'}
+        super().__init__('the maximum {} ({}) is exceeded'.format(descriptions[resource], limit))
+        self.resource = resource
+        self.limit = limit
+
+
+class Budget(object):
+    """The limits of a computation. A limit that is None is not checked. The wall time is only checked every
+       check_interval steps, since reading the clock is relatively expensive. The memory is an estimate
+       that is supplied by the algorithms, see estimated_words_size."""
+
+    def __init__(self, max_steps: Optional[int] = None, max_states: Optional[int] = None, max_time: Optional[float] = None, max_memory: Optional[int] = None, check_interval: int = 1000):
+        self.max_steps = max_steps
+        self.max_states = max_states
+        self.max_time = max_time
+        self.max_memory = max_memory
+        self.check_interval = check_interval
+        self.start()
+
+    def start(self) -> None:
+        """Resets the step counter and the clock"""
+        self.steps = 0
+        self.start_time = time.perf_counter()
+        self._next_time_check = self.check_interval
+
+    def step(self, count: int = 1) -> None:
+        self.steps += count
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise BudgetExceeded('steps', self.max_steps)
+        if self.steps >= self._next_time_check:
+            self._next_time_check = self.steps + self.check_interval
+            self.check_time()
+
+    def check_time(self) -> None:
+        if self.max_time is not None and time.perf_counter() - self.start_time > self.max_time:
+            raise BudgetExceeded('time', self.max_time)
+
+    def check_states(self, count: int) -> None:
+        if self.max_states is not None and count > self.max_states:
+            raise BudgetExceeded('states', self.max_states)
+
+    def check_memory(self, estimate: int) -> None:
+        if self.max_memory is not None and estimate > self.max_memory:
+            raise BudgetExceeded('memory', self.max_memory)
+
+
+# The active budget is stored per thread, such that concurrent checks in threads do not interfere
+_local = threading.local()
+
+
+def current_budget() -> Optional[Budget]:
+    """Returns the active budget of the current thread, or None if there is no active budget"""
+    return getattr(_local, 'budget', None)
+
+
+@contextlib.contextmanager
+def budget_limit(budget: Optional[Budget]) -> Iterator[Optional[Budget]]:
+    """Activates the budget within a with statement. The budget is restarted, such that it can be reused."""
+    previous = current_budget()
+    if budget is not None:
+        budget.start()
+    _local.budget = budget
+    try:
+        yield budget
+    finally:
+        _local.budget = previous
+
+
+def estimated_words_size(count: int, length: int) -> int:
+    """Returns an estimate of the memory in bytes that is used by a set of count words of the given length"""
+    return count * (length + 80)
@@ -9,11 +9,11 @@ import string
 from collections import defaultdict
 from typing import List, Set, MutableMapping, Tuple, Union, Optional, DefaultDict
 
-from gambatools.algorithms import last_index, first_index
 from gambatools.dfa import State, Symbol, DFA
 from gambatools.nfa import NFA
 from gambatools.cfg import CFG, Terminal, Variable, Alternative, Rule, DerivationTerm
 from gambatools.list_utility import remove_none, remove_duplicates, remove_if
+from gambatools.budget import current_budget, estimated_words_size
 
 
 class BaetenCFGParser(object):
@@ -521,80 +521,155 @@ def cfg_accepts_word(G: CFG, w: str, verbose: bool = False) -> bool:
     return S in X[0, n - 1]
 
 
-# Returns a derivation of the word w
-def cfg_derive_word(G: CFG, w: str, derivation_type: str = 'any') -> DerivationTerm:
-    assert G.is_chomsky()
-    assert derivation_type in ['any', 'leftmost', 'rightmost']
+# A node of a parse tree is a tuple (symbol, p, q, children), where the symbol derives w[p:q]
+ParseTree = Tuple[Union[Variable, Terminal], int, int, list]
+
+
+class ParseForest(object):
+    """A shared packed parse forest of a word w with respect to a grammar G in Chomsky normal form.
+       For each span (i, j) and variable A it stores the packed alternatives of A that derive w[i..j],
+       as back-pointers (k, B, C) meaning A -> BC with B deriving w[i..k] and C deriving w[k+1..j].
+       The number of parse trees of each node is computed while the forest is built."""
+
+    def __init__(self, G: CFG, w: str):
+        self.G = G
+        self.w = w
+        self.nodes: DefaultDict[Tuple[int, int], DefaultDict[Variable, List[Tuple[int, Variable, Variable]]]] = defaultdict(lambda: defaultdict(list))
+        self.counts: DefaultDict[Tuple[int, int], DefaultDict[Variable, int]] = defaultdict(lambda: defaultdict(int))
+        self._build()
+
+    def _build(self) -> None:
+        G = self.G
+        w = self.w
+        n = len(w)
+        nodes = self.nodes
+        counts = self.counts
+
+        # P1 maps a terminal a to the variables A with A -> a, P2 maps (B, C) to the variables A with A -> BC
+        P1: DefaultDict[Terminal, List[Variable]] = defaultdict(list)
+        P2: DefaultDict[Tuple[Variable, Variable], List[Variable]] = defaultdict(list)
+        for rule in remove_duplicates(G.R):
+            symbols = rule.alternative.symbols
+            if len(symbols) == 1:
+                P1[symbols[0]].append(rule.variable)
+            elif len(symbols) == 2:
+                P2[symbols[0], symbols[1]].append(rule.variable)
 
-    def find_rule(rules, Xpm, Xmq):
-        for BC in rules:
-            B, C = BC
-            if B in Xpm and C in Xmq:
-                return B, C
-        return None
-
-    def print_derivation_tree(root):
-        S, p, q, children = root
-        for child in children:
-            print_derivation_tree(child)
-
-    def extract_derivation(root, leftmost: bool):
-        S = root[0]
-        element = [S]
-        result = [element]
-        todo = [root]
+        for i in range(n):
+            for A in P1[Terminal(w[i])]:
+                counts[i, i][A] = 1
+
+        for m in range(1, n):
+            for i in range(n - m):
+                j = i + m
+                nodes_ij = nodes[i, j]
+                counts_ij = counts[i, j]
+                for k in range(i, j):
+                    left = counts[i, k]
+                    right = counts[k + 1, j]
+                    if not left or not right:
+                        continue
+                    for B, count_B in left.items():
+                        for C, count_C in right.items():
+                            for A in P2.get((B, C), []):
+                                nodes_ij[A].append((k, B, C))
+                                counts_ij[A] += count_B * count_C
+
+    def _accepts_empty_word(self) -> bool:
+        return Rule(self.G.S, Alternative([])) in self.G.R
+
+    def matrix(self) -> DefaultDict[Tuple[int, int], Set[Variable]]:
+        """Returns the CYK matrix X, with X[i, j] = { A | A ->* w[i]...w[j] }"""
+        X = defaultdict(lambda: set([]))
+        for (i, j), counts_ij in self.counts.items():
+            X[i, j] = set(counts_ij.keys())
+        return X
+
+    def accepts(self) -> bool:
+        return self.parse_count() > 0
+
+    def parse_count(self) -> int:
+        """Returns the number of parse trees of w"""
+        n = len(self.w)
+        if n == 0:
+            return 1 if self._accepts_empty_word() else 0
+        return self.counts[0, n - 1].get(self.G.S, 0)
+
+    def is_ambiguous(self) -> bool:
+        """Returns true if w has more than one parse tree"""
+        return self.parse_count() > 1
+
+    def tree(self, index: int = 0) -> ParseTree:
+        """Returns the parse tree with the given index, with 0 <= index < self.parse_count()"""
+        count = self.parse_count()
+        if not 0 <= index < count:
+            raise RuntimeError("the word '{}' has no parse tree with index {}".format(self.w, index))
+
+        w = self.w
+        root = (self.G.S, 0, len(w), [])
+        todo = [(root, index)]
         while todo:
-            A, p, q, children = todo.pop(0) if leftmost else todo.pop()
-            if children:
-                value = [child[0] for child in children]
-                pos = first_index(element, A) if leftmost else last_index(element, A)
-                element = element[:pos] + value + element[pos+1:]
-                result.append(element)
-                if leftmost:
-                    todo = children + todo
-                else:
-                    todo = todo + children
-        return result
+            (A, p, q, children), index = todo.pop()
+            if q - p == 1:
+                children.append((Terminal(w[p]), p, q, []))
+                continue
+            for (k, B, C) in self.nodes[p, q - 1][A]:
+                count_B = self.counts[p, k][B]
+                count_C = self.counts[k + 1, q - 1][C]
+                if index < count_B * count_C:
+                    index_B, index_C = divmod(index, count_C)
+                    child1 = (B, p, k + 1, [])
+                    child2 = (C, k + 1, q, [])
+                    children.append(child1)
+                    children.append(child2)
+                    todo.append((child1, index_B))
+                    todo.append((child2, index_C))
+                    break
+                index -= count_B * count_C
+        return root
+
+    def derivation(self, derivation_type: str = 'any', index: int = 0) -> List[DerivationTerm]:
+        """Returns the derivation of w that corresponds to the parse tree with the given index"""
+        assert derivation_type in ['any', 'leftmost', 'rightmost']
+        if self.w == '':
+            self.tree(index)  # raises an exception if the empty word is not accepted
+            return [[self.G.S], []]
+        return parse_tree_derivation(self.tree(index), derivation_type in ['any', 'leftmost'])
+
+
+def parse_tree_derivation(root: ParseTree, leftmost: bool) -> List[DerivationTerm]:
+    """Returns the leftmost or rightmost derivation corresponding to a parse tree.
+       The nodes that still have to be expanded are kept on a stack, such that no
+       searching is needed to locate the variable that is replaced in each step."""
+    done = []
+    todo = [root]
+    result = [[root[0]]]
+    while todo:
+        symbol, p, q, children = todo.pop()
+        if not children:
+            done.append(symbol)
+            continue
+        todo.extend(reversed(children) if leftmost else children)
+        pending = [node[0] for node in reversed(todo)] if leftmost else [node[0] for node in todo]
+        result.append(done + pending if leftmost else pending + done[::-1])
+    return result
 
-    R = G.R
-    S = G.S
 
-    X = cfg_cyk_matrix(G, w)
-    n = len(w)
-    if S not in X[0, n - 1]:
-        raise RuntimeError("the word '{}' is not accepted by the grammar".format(w))
+def cfg_parse_forest(G: CFG, w: str) -> ParseForest:
+    """Computes a shared packed parse forest of w using the CYK algorithm"""
+    assert G.is_chomsky()
+    return ParseForest(G, w)
 
-    # Build a mappings P1 and P2 for productions of length 1 and 2
-    P = defaultdict(lambda: [])
-    for rule in R:
-        P[rule.variable].append(rule.alternative.symbols)
 
-    root = (S, 0, n, [])
-    todo = [ root ]
-    while todo:
-        A, p, q, children = todo.pop()
-        if q - p == 1:
-            a = w[p]
-            child = (a, p, q, [])
-            children.append(child)
-        else:
-            for m in range(p+1, q):
-                Xpm = X[p, m-1]
-                Xmq = X[m, q-1]
-                BC = find_rule(P[A], Xpm, Xmq)
-                if not BC:
-                    continue
-                B, C = BC
-                child1 = (B, p, m, [])
-                child2 = (C, m, q, [])
-                children.append(child1)
-                children.append(child2)
-                todo.append(child1)
-                todo.append(child2)
-                break
-
-    # print_derivation_tree(root)
-    return extract_derivation(root, derivation_type in ['any', 'leftmost'])
+# Returns a derivation of the word w
+def cfg_derive_word(G: CFG, w: str, derivation_type: str = 'any') -> List[DerivationTerm]:
+    assert G.is_chomsky()
+    assert derivation_type in ['any', 'leftmost', 'rightmost']
+
+    forest = cfg_parse_forest(G, w)
+    if not forest.accepts():
+        raise RuntimeError("the word '{}' is not accepted by the grammar".format(w))
+    return forest.derivation(derivation_type)
 
 
 def cfg_words_up_to_n(G: CFG, n: int) -> Set[str]:
@@ -636,9 +711,18 @@ def cfg_words_up_to_n(G: CFG, n: int) -> Set[str]:
 
     W: List[DerivationTerm] = [[G.S]]
     words = words | make_words([G.S])
+    budget = current_budget()
 
     for i in range(2, n + 1):
-        W = remove_duplicates([x for word in W for x in replace(word)])
+        if budget is None:
+            W = remove_duplicates([x for word in W for x in replace(word)])
+        else:
+            W1 = []
+            for word in W:
+                W1.extend(replace(word))
+                budget.step(len(word))
+                budget.check_memory(estimated_words_size(len(W1) + len(words), i))
+            W = remove_duplicates(W1)
         words = words.union(*[make_words(word) for word in W])
 
     return words
@@ -0,0 +1,93 @@
+#  (C) Copyright Wieger Wesselink 2020. Distributed under the GPL-3.0-or-later
+#  Software License, (See accompanying file LICENSE or copy at
+#  https://www.gnu.org/licenses/gpl-3.0.txt)
+
+# Structured results of the checks of exercises. The functions check_*_result in the notebook modules return
+# a CheckResult, and the corresponding check_* functions print it.
+
+import functools
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from gambatools.budget import BudgetExceeded
+from gambatools.language_generator import word_feedback
+
+
+class CheckResult(object):
+    """The result of checking an answer. The status is 'correct', 'incorrect', 'warning' if only warnings
+       were reported, or 'error' if the check could not be completed, e.g. because of a syntax error.
+       The error code identifies the first problem that was found, and word contains the first word that
+       is wrongly accepted or rejected, if any. The time is the duration of the check in seconds."""
+
+    def __init__(self):
+        self.status = 'correct'
+        self.feedback: List[str] = []
+        self.word: Optional[str] = None
+        self.error_code: Optional[str] = None
+        self.time = 0.0
+        self.details: Dict[str, Any] = {}
+
+    def add(self, feedback: List[str], error_code: str) -> None:
+        """Adds feedback messages. Messages that start with 'Warning' do not make the answer incorrect."""
+        if not feedback:
+            return
+        self.feedback.extend(feedback)
+        if self.error_code is None:
+            self.error_code = error_code
+        if self.status != 'error':
+            only_warnings = self.status != 'incorrect' and all(msg.startswith('Warning') for msg in feedback)
+            self.status = 'warning' if only_warnings else 'incorrect'
+
+    def add_difference(self, difference: Optional[Tuple[str, bool]]) -> None:
+        """Adds the result of languages_difference or equal_languages_difference"""
+        if difference is None:
+            return
+        word, accepted = difference
+        if self.word is None:
+            self.word = word
+        self.add([word_feedback(word, accepted)], 'should_be_accepted' if accepted else 'should_not_be_accepted')
+
+    def set_incorrect(self, error_code: str) -> None:
+        """Marks the answer as incorrect without a feedback message"""
+        self.status = 'incorrect'
+        if self.error_code is None:
+            self.error_code = error_code
+
+    def set_error(self, message: str, error_code: str) -> None:
+        self.status = 'error'
+        self.feedback.append('Error: {}'.format(message))
+        self.error_code = error_code
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {'status': self.status,
+                  'feedback': self.feedback,
+                  'word': self.word,
+                  'error_code': self.error_code,
+                  'time': self.time}
+        result.update(self.details)
+        return result
+
+    def print_feedback(self) -> None:
+        """Prints the feedback in the format of the notebooks, i.e. the messages or OK"""
+        if self.status == 'correct':
+            print('OK')
+        for msg in self.feedback:
+            print(msg)
+
+
+def structured_check(check: Callable[..., CheckResult]) -> Callable[..., CheckResult]:
+    """Decorates a check, such that exceptions are turned into an error result, and the time is measured"""
+    @functools.wraps(check)
+    def timed_check(*args, **kwargs) -> CheckResult:
+        start = time.perf_counter()
+        try:
+            result = check(*args, **kwargs)
+        except BudgetExceeded as e:
+            result = CheckResult()
+            result.set_error(str(e), 'budget_exceeded')
+        except Exception as e:
+            result = CheckResult()
+            result.set_error(str(e), 'exception')
+        result.time = time.perf_counter() - start
+        return result
+    return timed_check
@@ -11,7 +11,6 @@ from typing import Any, Dict, Set, MutableMapping, Tuple, Mapping, List, FrozenS
 from gambatools.automaton import Automaton
 from gambatools.automaton_algorithms import default_transition_label_regex, default_state_label_regex, AutomatonParser, AutomatonBuilder
 from gambatools.dfa import State, Symbol, print_state_set, DFA
-from gambatools.dfa_io import draw_dfa
 from gambatools.nfa import NFA
 from gambatools.logging import log
 
@@ -374,6 +373,8 @@ class DFABuilder(AutomatonBuilder):
     def _check_is_total(self, input_symbols: Set[str]):
         A = self.A
         V = set((p, a) for (p, a, _) in A.transitions)
+        if len(V) == len(A.states) * len(input_symbols) and all(a in input_symbols for (_, a) in V):
+            return
         for p in A.states:
             for a in input_symbols:
                 if (p, a) not in V:
@@ -401,7 +402,7 @@ class DFABuilder(AutomatonBuilder):
             q = State(q)
             a = Symbol(a)
             delta[p, a] = q
-        return DFA(Q, Sigma, delta, q0, F)
+        return DFA(Q, Sigma, delta, q0, F, check_validity=False)  # validity is guaranteed by the checks above
 
 
 # def dfa_product(D1: DFA, D2: DFA) -> DFA:
@@ -582,6 +583,7 @@ def dfa_no_extend(D: DFA) -> DFA:
 def check_dfa_is_total(Q: Set[State], Sigma: Set[Symbol], delta: Mapping[Tuple[State, Symbol], State], q0: State, F: Set[State], context: DFA) -> None:
     D = DFA(Q, Sigma, delta, q0, F, check_validity=False)
     if not D._is_total():
+        from gambatools.dfa_io import draw_dfa
         dot = draw_dfa(Q, Sigma, delta, q0, F)
         dot.render('output-graph', format='png', view=True)
         dot = draw_dfa(context.Q, context.Sigma, context.delta, context.q0, context.F)
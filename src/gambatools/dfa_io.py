@@ -2,13 +2,15 @@
 #  Software License, (See accompanying file LICENSE or copy at
 #  https://www.gnu.org/licenses/gpl-3.0.txt)
 
-from typing import Set, Mapping, Tuple, List, Any
-import graphviz
+from typing import Set, Mapping, Tuple, List, Any, TYPE_CHECKING
 from gambatools.automaton import Automaton
 
 from gambatools.dfa import DFA, State, Symbol
 from gambatools.automaton_io import automaton_to_dot
 
+if TYPE_CHECKING:
+    import graphviz
+
 DOT_AUTOMATON_TEXT = '''digraph
 {
   fake [style=invisible]
@@ -40,7 +42,7 @@ def dfa_to_dot(D: DFA) -> str:
     return text
 
 
-def draw_dfa(Q: Set[State], Sigma: Set[Symbol], delta: Mapping[Tuple[State, Symbol], State], q0: State, F: Set[State]) -> graphviz.Digraph:
+def draw_dfa(Q: Set[State], Sigma: Set[Symbol], delta: Mapping[Tuple[State, Symbol], State], q0: State, F: Set[State]) -> 'graphviz.Digraph':
     states = Q
     transitions = [(p, a, q) for (p, a), q in delta.items()]
     initial_states = {q0}
@@ -12,3 +12,14 @@ class GambaTools(object):
     Set this variable to True to print intermediate output of the algorithms
     """
     enable_logging = False
+
+    """
+    The directory of the persistent cache for reference results, e.g. the languages generated from answer
+    files. If it is None, nothing is cached.
+    """
+    cache_directory = None
+
+    """
+    The maximum size in bytes of the cache. If it is exceeded, the least recently used entries are removed.
+    """
+    cache_max_size = 256 * 2**20
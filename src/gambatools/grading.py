@@ -0,0 +1,254 @@
+#  (C) Copyright Wieger Wesselink 2020. Distributed under the GPL-3.0-or-later
+#  Software License, (See accompanying file LICENSE or copy at
+#  https://www.gnu.org/licenses/gpl-3.0.txt)
+
+# Grading of a batch of submissions against a reference answer. Usage:
+#
+#   python -m gambatools.grading submissions.jsonl --answer answer.pda --length 6 --jobs 8 --timeout 10
+#
+# The submissions are either a directory with one file per submission, in which case the extension of the
+# file determines its type (.dfa, .nfa, .pda, .tm, .cfg or .regexp), or a JSONL file with lines like
+# {"id": "s1234", "kind": "dfa", "text": "..."}. The results are written as JSONL, with one line per submission.
+
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Union
+
+from gambatools.budget import Budget, BudgetExceeded, budget_limit
+from gambatools.check_result import CheckResult
+from gambatools.dfa import DFA
+from gambatools.language_algorithms import parse_word_list
+from gambatools.language_generator import equal_languages_difference, generate_language
+from gambatools.nfa import NFA
+from gambatools.notebook import language_parser, check_max_states
+from gambatools.pda import PDA
+from gambatools.result_cache import cached_words
+from gambatools.text_utility import read_utf8_text
+from gambatools.tm import TM
+
+SUBMISSION_KINDS = ('dfa', 'nfa', 'pda', 'tm', 'cfg', 'regexp')
+
+
+class Submission(object):
+    def __init__(self, id: str, kind: str, text: str):
+        if kind not in SUBMISSION_KINDS:
+            raise RuntimeError("submission {} has an unknown kind '{}'".format(id, kind))
+        self.id = id
+        self.kind = kind
+        self.text = text
+
+
+class Reference(object):
+    """The reference answer of an exercise. If it is a DFA or NFA, submitted finite automata are compared
+       with it exactly, otherwise language is the set of expected words of length at most length. The
+       other submissions are compared with the words of the reference, see words. A reference is
+       computed once, and then shared by all workers."""
+
+    def __init__(self, language: Union[DFA, NFA, Set[str]], length: int, max_states: int = 0, words: Optional[Set[str]] = None):
+        self.language = language
+        self.length = length
+        self.max_states = max_states
+        self._words = words if words is not None or isinstance(language, (DFA, NFA)) else language
+
+    def words(self) -> Set[str]:
+        """Returns the words of the reference of length at most length. They are generated only once."""
+        if self._words is None:
+            self._words = generate_language(self.language, self.length)
+        return self._words
+
+    @staticmethod
+    def from_file(filename: str, length: int, max_states: int = 0) -> 'Reference':
+        text = read_utf8_text(filename)
+        L = language_parser(filename)(text)
+        if not isinstance(L, (DFA, NFA)):
+            L = cached_words([text, os.path.splitext(filename)[1], 'generate', str(length)], lambda: generate_language(L, length))
+        return Reference(L, length, max_states)
+
+    @staticmethod
+    def from_words(word_list: str, length: int, max_states: int = 0) -> 'Reference':
+        return Reference(parse_word_list(word_list), length, max_states)
+
+
+class GradingTimeout(Exception):
+    pass
+
+
+def read_submissions(path: str) -> List[Submission]:
+    """Reads the submissions from a directory or from a JSONL file"""
+    if os.path.isdir(path):
+        result = []
+        for name in sorted(os.listdir(path)):
+            id, extension = os.path.splitext(name)
+            if extension[1:] in SUBMISSION_KINDS:
+                result.append(Submission(id, extension[1:], read_utf8_text(os.path.join(path, name))))
+        return result
+
+    result = []
+    for i, line in enumerate(read_utf8_text(path).splitlines()):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError as e:
+            raise RuntimeError('line {} of {} is not valid JSON: {}'.format(i + 1, path, e))
+        result.append(Submission(str(entry.get('id', i)), entry['kind'], entry['text']))
+    return result
+
+
+def _raise_timeout(signum, frame):
+    raise GradingTimeout()
+
+
+def grade_submission(submission: Submission, reference: Reference, timeout: Optional[float] = None, budget: Optional[Budget] = None) -> Dict[str, Any]:
+    """Checks a submission against the reference. If timeout is set and signals are available, the check is
+       interrupted after timeout seconds. This only works in the main thread of a process. If a budget
+       is given, it is activated during the check, see budget_limit."""
+    result = {'id': submission.id, 'kind': submission.kind, 'word': None}
+    use_alarm = timeout is not None and hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = time.perf_counter()
+    try:
+        with budget_limit(budget):
+            A = language_parser('.' + submission.kind)(submission.text)
+            check = CheckResult()
+            if isinstance(A, (DFA, NFA, PDA, TM)):
+                check.add(check_max_states(A, reference.max_states), 'max_states')
+            if not check.feedback:
+                exact = isinstance(A, (DFA, NFA)) and isinstance(reference.language, (DFA, NFA))
+                L = reference.language if exact else reference.words()
+                check.add_difference(equal_languages_difference(A, L, reference.length))
+        result['status'] = check.status
+        result['feedback'] = check.feedback
+        result['word'] = check.word
+        result['error_code'] = check.error_code
+    except GradingTimeout:
+        result['status'] = 'timeout'
+        result['feedback'] = ['Error: the time limit of {} seconds is exceeded'.format(timeout)]
+        result['error_code'] = 'timeout'
+    except BudgetExceeded as e:
+        result['status'] = 'budget'
+        result['feedback'] = ['Error: {}'.format(e)]
+        result['error_code'] = 'budget_exceeded'
+    except MemoryError:
+        result['status'] = 'memory'
+        result['feedback'] = ['Error: the memory limit is exceeded']
+        result['error_code'] = 'memory'
+    except Exception as e:
+        result['status'] = 'error'
+        result['feedback'] = ['Error: {}'.format(e)]
+        result['error_code'] = 'exception'
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+    result['time'] = time.perf_counter() - start
+    return result
+
+
+# The reference and the limits of a worker process, see _grading_init_worker
+_worker_reference: Optional[Reference] = None
+_worker_timeout: Optional[float] = None
+_worker_budget: Optional[Budget] = None
+
+
+def _grading_init_worker(reference: Reference, timeout: Optional[float], memory_limit: Optional[int], budget: Optional[Budget]) -> None:
+    global _worker_reference, _worker_timeout, _worker_budget
+    _worker_reference = reference
+    _worker_timeout = timeout
+    _worker_budget = budget
+    if memory_limit:
+        try:
+            import resource  # not available on Windows
+            _, hard = resource.getrlimit(resource.RLIMIT_AS)
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, hard))
+        except (ImportError, ValueError, OSError):
+            pass
+
+
+def _grading_run(submission: Submission) -> Dict[str, Any]:
+    return grade_submission(submission, _worker_reference, _worker_timeout, _worker_budget)
+
+
+def grade_submissions(submissions: List[Submission], reference: Reference, processes: int = 1, timeout: Optional[float] = None, memory_limit: Optional[int] = None, budget: Optional[Budget] = None) -> List[Dict[str, Any]]:
+    """Grades the submissions, and returns the results in the same order as the submissions. If processes > 1
+       or a memory limit (in bytes) is given, the submissions are graded by a pool of processes, that each
+       receive the reference once. A worker that does not respond within the timeout, e.g. because it is
+       stuck in a computation that cannot be interrupted, is abandoned and the submission is reported as
+       a timeout. The budget is restarted for every submission."""
+    if any(submission.kind not in ('dfa', 'nfa') for submission in submissions):
+        reference.words()  # generate the words before the reference is sent to the workers
+    if processes <= 1 and memory_limit is None:
+        return [grade_submission(submission, reference, timeout, budget) for submission in submissions]
+
+    import multiprocessing  # imported here, since it is slow to import and only needed for parallel runs
+    pool = multiprocessing.Pool(max(processes, 1), initializer=_grading_init_worker, initargs=(reference, timeout, memory_limit, budget))
+    try:
+        pending = [pool.apply_async(_grading_run, (submission,)) for submission in submissions]
+        results = []
+        for submission, r in zip(submissions, pending):
+            try:
+                # a submission may have to wait for other submissions, so the deadline is generous
+                results.append(r.get(timeout=None if timeout is None else 2 * timeout + 5))
+            except multiprocessing.TimeoutError:
+                results.append({'id': submission.id,
+                                'kind': submission.kind,
+                                'word': None,
+                                'status': 'timeout',
+                                'feedback': ['Error: the time limit of {} seconds is exceeded'.format(timeout)],
+                                'error_code': 'timeout',
+                                'time': timeout})
+            except Exception as e:  # e.g. a worker that was killed because it ran out of memory
+                results.append({'id': submission.id, 'kind': submission.kind, 'word': None, 'status': 'error', 'feedback': ['Error: {}'.format(e)], 'error_code': 'exception', 'time': 0.0})
+    finally:
+        pool.terminate()
+        pool.join()
+    return results
+
+
+def write_results(results: List[Dict[str, Any]], filename: Optional[str] = None) -> None:
+    """Writes the results as JSONL to a file, or to stdout if filename is None"""
+    text = ''.join(json.dumps(result, ensure_ascii=False) + '\n' for result in results)
+    if filename is None:
+        sys.stdout.write(text)
+    else:
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+def main():
+    cmdline_parser = argparse.ArgumentParser(description='Grades a batch of submissions against a reference answer')
+    cmdline_parser.add_argument('submissions', metavar='PATH', type=str, help='a directory with submissions, or a JSONL file')
+    cmdline_parser.add_argument('--answer', metavar='FILE', type=str, help='the file with the reference answer (.dfa, .nfa, .pda, .tm, .cfg or .regexp)')
+    cmdline_parser.add_argument('--words', metavar='FILE', type=str, help='a file with the list of expected words, as an alternative to --answer')
+    cmdline_parser.add_argument('--length', metavar='N', type=int, default=5, help='the maximum length of the words that are compared')
+    cmdline_parser.add_argument('--max-states', metavar='N', type=int, default=0, help='the maximum number of states of a submitted automaton')
+    cmdline_parser.add_argument('-j', '--jobs', metavar='N', type=int, default=1, help='the number of worker processes')
+    cmdline_parser.add_argument('--timeout', metavar='SECONDS', type=float, help='the time limit per submission')
+    cmdline_parser.add_argument('--memory-limit', metavar='MB', type=int, help='the memory limit per worker process')
+    cmdline_parser.add_argument('--max-steps', metavar='N', type=int, help='the maximum number of steps of the algorithms per submission, see gambatools.budget')
+    cmdline_parser.add_argument('-o', '--output', metavar='FILE', type=str, help='the output file, by default the results are written to stdout')
+    args = cmdline_parser.parse_args()
+
+    if args.answer:
+        reference = Reference.from_file(args.answer, args.length, args.max_states)
+    elif args.words:
+        reference = Reference.from_words(read_utf8_text(args.words), args.length, args.max_states)
+    else:
+        cmdline_parser.error('either --answer or --words must be specified')
+
+    submissions = read_submissions(args.submissions)
+    memory_limit = args.memory_limit * 2**20 if args.memory_limit else None
+    budget = Budget(max_steps=args.max_steps, max_time=args.timeout) if args.max_steps else None
+    results = grade_submissions(submissions, reference, args.jobs, args.timeout, memory_limit, budget)
+    write_results(results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,7 @@
 #  Software License, (See accompanying file LICENSE or copy at
 #  https://www.gnu.org/licenses/gpl-3.0.txt)
 
-from typing import Any, Set, List
+from typing import Any, Set, List, Optional, Tuple
 
 import gambatools.dfa
 import gambatools.dfa_algorithms
@@ -38,26 +38,56 @@ def generate_language(L: Any, n: int) -> Set[str]:
     return result
 
 
+def word_feedback(word: str, accepted: bool) -> str:
+    word = 'ε' if not word else word
+    if accepted:
+        return "Error: word '{}' should be accepted".format(word)
+    return "Error: word '{}' should not be accepted".format(word)
+
+
+# A1 is the user supplied answer
+# A2 is the expected result
+# Returns (word, accepted) for a shortest word on which A1 and A2 differ, where accepted means that the
+# word should be accepted. Words that are wrongly accepted are reported first. Returns None if A1 == A2.
+def languages_difference(A1: Set[str], A2: Set[str]) -> Optional[Tuple[str, bool]]:
+    A1minusA2 = A1 - A2
+    if A1minusA2:
+        return min(A1minusA2, key=len), False
+    A2minusA1 = A2 - A1
+    if A2minusA1:
+        return min(A2minusA1, key=len), True
+    return None
+
+
 # A1 is the user supplied answer
 # A2 is the expected result
 def compare_languages(A1: Set[str], A2: Set[str]) -> List[str]:
-    A1minusA2 = sorted(A1 - A2, key=lambda x: (len(x)))
-    A2minusA1 = sorted(A2 - A1, key=lambda x: (len(x)))
-    feedback = []
-    if len(A1minusA2) > 0:
-        word = A1minusA2[0]
-        word = 'ε' if not word else word
-        feedback.append("Error: word '{}' should not be accepted".format(word))
-    elif len(A2minusA1) > 0:
-        word = A2minusA1[0]
-        word = 'ε' if not word else word
-        feedback.append("Error: word '{}' should be accepted".format(word))
-    return feedback
+    difference = languages_difference(A1, A2)
+    return [word_feedback(*difference)] if difference else []
 
 
 # A1 is the user supplied answer
 # A2 is the expected result
-def check_equal_languages(L1: Any, L2: Any, length: int = 4) -> List[str]:
+# If both are finite automata, the languages are compared exactly, and length is not used.
+# The result has the same meaning as in languages_difference.
+def equal_languages_difference(L1: Any, L2: Any, length: int = 4) -> Optional[Tuple[str, bool]]:
+    automaton_types = (gambatools.dfa.DFA, gambatools.nfa.NFA)
+    if isinstance(L1, automaton_types) and isinstance(L2, automaton_types):
+        included, word = gambatools.nfa_algorithms.nfa_included(L1, L2)
+        if not included:
+            return word, False
+        included, word = gambatools.nfa_algorithms.nfa_included(L2, L1)
+        if not included:
+            return word, True
+        return None
     A1 = generate_language(L1, length)
     A2 = generate_language(L2, length)
-    return compare_languages(A1, A2)
+    return languages_difference(A1, A2)
+
+
+# A1 is the user supplied answer
+# A2 is the expected result
+# If both are finite automata, the languages are compared exactly, and length is not used.
+def check_equal_languages(L1: Any, L2: Any, length: int = 4) -> List[str]:
+    difference = equal_languages_difference(L1, L2, length)
+    return [word_feedback(*difference)] if difference else []
@@ -29,10 +29,11 @@ class NFA(object):
         assert q0 in Q
         assert F <= Q
         assert epsilon not in Sigma
+        Sigma_epsilon = Sigma | {epsilon}
         for (q, a) in delta:
             Q1 = delta[q, a]
             assert q in Q
-            assert a in Sigma | {epsilon}
+            assert a in Sigma_epsilon
             assert Q1 <= Q
 
     def E(self, q: Union[State, Set[State]]):
@@ -2,9 +2,11 @@
 #  Software License, (See accompanying file LICENSE or copy at
 #  https://www.gnu.org/licenses/gpl-3.0.txt)
 
-from collections import defaultdict
-from typing import Set, Mapping, MutableMapping, Tuple, Union, List, Optional
+from collections import defaultdict, deque, OrderedDict
+from typing import Any, AbstractSet, Dict, Set, Mapping, MutableMapping, Tuple, Union, List, Optional, FrozenSet
+import collections.abc
 import io
+import itertools
 
 from gambatools.automaton import Automaton
 from gambatools.automaton_algorithms import default_transition_label_regex, default_state_label_regex, AutomatonParser, AutomatonBuilder, \
@@ -12,6 +14,7 @@ from gambatools.automaton_algorithms import default_transition_label_regex, defa
 from gambatools.dfa import State, Symbol, print_state_set, DFA
 from gambatools.nfa import NFA
 from gambatools.identifier_generator import IdentifierGenerator
+from gambatools.budget import current_budget, estimated_words_size
 
 
 def _nfa_cache(N: NFA) -> Tuple[Mapping[State, Set[State]], Mapping[Tuple[State, Symbol], Set[State]]]:
@@ -49,12 +52,66 @@ def nfa_accepts_word(N: NFA, word: str) -> bool:
     return not q.isdisjoint(F)
 
 
-def nfa_words_up_to_n(N: NFA, n: int) -> Set[str]:
+def _nfa_words_up_to_n_bitsets(N: NFA, n: int, Eq, Eqa, F1) -> Set[str]:
+    # The words of length l are numbered by their shortlex index, i.e. the word a_1...a_l corresponds to the
+    # number with digits rank(a_1)...rank(a_l) in base |Sigma|. B[q] is a bitset of the words u of length l
+    # such that u is accepted from q. Since a word au has index rank(a) * |Sigma|^l + index(u), the bitset
+    # of the words au is obtained from B[q1] with a single shift.
+    Sigma = sorted(N.Sigma)
+    k = len(Sigma)
+    B = {q: 1 for q in F1}
+    result = set([])
+    budget = current_budget()
+    for l in range(n + 1):
+        if budget is not None:
+            budget.step(len(Eqa))
+        words = 0
+        for q in Eq[N.q0]:
+            words |= B.get(q, 0)
+        if words:
+            # decode the indices using tables of the prefixes and suffixes of half the length
+            h = l // 2
+            prefixes = [''.join(u) for u in itertools.product(Sigma, repeat=h)]
+            suffixes = [''.join(u) for u in itertools.product(Sigma, repeat=l - h)]
+            m = len(suffixes)
+            digits = bin(words)[:1:-1]
+            i = digits.find('1')
+            while i != -1:
+                j, r = divmod(i, m)
+                result.add(prefixes[j] + suffixes[r])
+                i = digits.find('1', i + 1)
+            if budget is not None:
+                budget.step(len(result))
+                budget.check_memory(estimated_words_size(len(result), l))
+        if l == n:
+            break
+        size = k ** l
+        B1 = {}
+        for (q, a), Q1 in Eqa.items():
+            if a == N.epsilon or a not in N.Sigma:
+                continue
+            shift = Sigma.index(a) * size
+            b = 0
+            for q1 in Q1:
+                b |= B.get(q1, 0)
+            if b:
+                B1[q] = B1.get(q, 0) | (b << shift)
+        B = B1
+    return result
+
+
+def nfa_words_up_to_n(N: NFA, n: int, max_bitset_size: int = 1 << 24) -> Set[str]:
+    """Returns the words of length at most n that are accepted by N. If the number of words of length n
+       over the alphabet of N does not exceed max_bitset_size, the sets of words are represented by bitsets."""
+    N = nfa_reduce(N)
     Eq, Eqa = _nfa_cache(N)
 
     # F contains all states that can terminate
     F1 = [q for q in N.Q if not Eq[q].isdisjoint(N.F)]
 
+    if N.Sigma and len(N.Sigma) ** n <= max_bitset_size:
+        return _nfa_words_up_to_n_bitsets(N, n, Eq, Eqa, F1)
+
     result = set([])
     if N.q0 in F1:
         result.add('')
@@ -63,13 +120,17 @@ def nfa_words_up_to_n(N: NFA, n: int) -> Set[str]:
     for q in Eq[N.q0]:
         W[q] = {''}
 
+    budget = current_budget()
     for i in range(n):
         W1 = defaultdict(lambda: set([]))  # W1: TypedDict[State, Set[str]]
         for (q, words) in W.items():
+            if budget is not None:
+                budget.step(len(N.Sigma) * len(words))
+                budget.check_memory(estimated_words_size(len(result), i + 1))
             for a in N.Sigma:
                 if (q, a) in Eqa:
+                    words_q1 = set([word + a for word in words])
                     for q1 in Eqa[(q, a)]:
-                        words_q1 = set([word + a for word in words])
                         W1[q1] |= words_q1
                         if q1 in F1:
                             result |= words_q1
@@ -107,17 +168,14 @@ def nfa_find_epsilon_path(N: NFA, R: Set[State], f: State) -> Optional[List[Stat
     todo: Set[State] = set([r for r in R])
     while len(todo) > 0:
         src = todo.pop()
-        for (p, a), Q1 in delta.items():
-            if p != src or a != epsilon:
+        for target in delta.get((src, epsilon), ()):
+            if target in visited:
                 continue
-            for q in Q1:
-                target = q
-                backpointers[target] = src
-                if target == f:
-                    return make_path(target)
-                if target not in visited:
-                    todo.add(target)
-                    visited.add(target)
+            backpointers[target] = src
+            if target == f:
+                return make_path(target)
+            todo.add(target)
+            visited.add(target)
     return None
 
 
@@ -125,56 +183,168 @@ def nfa_find_transition(N: NFA, R: Set[State], a: Symbol, target: State) -> Opti
     """Returns src such that src --a--> target"""
     delta = N.delta
     for src in R:
-        for (p, a1), Q1 in delta.items():
-            if src != p or a != a1:
-                continue
-            for q in Q1:
-                if q == target:
-                    return src
+        if target in delta.get((src, a), ()):
+            return src
     return None
 
 
-def nfa_simulate_word(N: NFA, w: str) -> Optional[Tuple[State, str]]:
-    F = N.F
-    H = []
-
-    R = {N.q0}
-    H.append(R)
-    R = epsilon_closure(N, R)
-    H.append(R)
+def nfa_simulate_word(N: NFA, w: str) -> Optional[List[Tuple[State, str]]]:
+    """Returns an accepting run of N on w as a list of pairs (state, remaining input), or None if w is
+       not accepted. For each position in w the forward pass records a predecessor of every state that
+       is reached, such that the run can be reconstructed without searching."""
+    delta = N.delta
+    epsilon = N.epsilon
 
+    # layers[i][q] = (p, is_epsilon) means that q is reached after reading w[:i] via a transition from p
+    layers: List[Dict[State, Optional[Tuple[State, bool]]]] = []
+
+    def close(R: Dict[State, Optional[Tuple[State, bool]]]) -> None:
+        todo = deque(R)
+        while todo:
+            q = todo.popleft()
+            for q1 in delta.get((q, epsilon), ()):
+                if q1 not in R:
+                    R[q1] = (q, True)
+                    todo.append(q1)
+
+    R = {N.q0: None}
+    close(R)
+    layers.append(R)
     for a in w:
-        R = nfa_do_transition(N, Symbol(a), R)
-        H.append(R)
-        R = epsilon_closure(N, R)
-        H.append(R)
-
-    if any(r in F for r in R):
-        S = H.pop()
-        front = next(r for r in S if r in F)
-        result = [(front, '')]
-        word = ''
-        for a in reversed(w):
-            S = H.pop()
-            path = nfa_find_epsilon_path(N, S, front)
-            result = [(r, word) for r in path[:-1]] + result
-            front = path[0]
-            S = H.pop()
-            front = nfa_find_transition(N, S, a, front)
-            word = a + word
-            result = [(front, word)] + result
-        S = H.pop()
-        path = nfa_find_epsilon_path(N, S, front)
-        result = [(r, word) for r in path[:-1]] + result
-        return result
-    else:
+        R1 = {}
+        for q in R:
+            for q1 in delta.get((q, Symbol(a)), ()):
+                if q1 not in R1:
+                    R1[q1] = (q, False)
+        close(R1)
+        layers.append(R1)
+        R = R1
+
+    f = next((q for q in R if q in N.F), None)
+    if f is None:
         return None
+    result = []
+    i = len(w)
+    q = f
+    while True:
+        result.append((q, w[i:]))
+        predecessor = layers[i][q]
+        if predecessor is None:
+            break
+        q, is_epsilon = predecessor
+        if not is_epsilon:
+            i -= 1
+    result.reverse()
+    return result
+
+
+def _bisimulation_representatives(Q: Set[State], initial_block: Mapping[State, Any], edges: Mapping[State, Set[Tuple[Symbol, State]]]) -> Mapping[State, State]:
+    """Computes the coarsest bisimulation of the labeled graph with the given edges that refines the initial
+       blocks, using partition refinement. Returns a mapping of each state to the smallest state of its block."""
+    block = {q: initial_block[q] for q in Q}
+    size = len(set(block.values()))
+    while True:
+        signatures = {q: (block[q], frozenset((a, block[q1]) for (a, q1) in edges[q])) for q in Q}
+        ids = {}
+        block = {q: ids.setdefault(signatures[q], len(ids)) for q in sorted(Q)}
+        if len(ids) == size:
+            break
+        size = len(ids)
+    representative = {}
+    for q in sorted(Q):
+        representative.setdefault(block[q], q)
+    return {q: representative[block[q]] for q in Q}
+
+
+def _nfa_edges(N: NFA, forward: bool) -> Mapping[State, Set[Tuple[Symbol, State]]]:
+    """Returns the outgoing (if forward is true) or incoming edges of the states of N"""
+    result = defaultdict(set)
+    for (q, a), Q1 in N.delta.items():
+        for q1 in Q1:
+            if forward:
+                result[q].add((a, q1))
+            else:
+                result[q1].add((a, q))
+    return result
+
+
+def _nfa_merge_states(N: NFA, representative: Mapping[State, State]) -> NFA:
+    """Returns the NFA in which each state q of N is replaced by representative[q]"""
+    delta = defaultdict(set)
+    for (q, a), Q1 in N.delta.items():
+        if Q1:
+            delta[representative[q], a] |= set(representative[q1] for q1 in Q1)
+    Q = set(representative.values())
+    F = set(representative[q] for q in N.F)
+    return NFA(Q, N.Sigma, delta, representative[N.q0], F, N.epsilon)
 
 
-def nfa_to_dfa(N: NFA) -> DFA:
+def nfa_reduce(N: NFA) -> NFA:
+    """Returns an NFA without epsilon transitions that accepts the same language as N, and that typically has
+       fewer states. The epsilon transitions are removed, states that are not reachable from the initial state
+       or from which no final state can be reached are removed, and states that are forward or backward
+       bisimilar are merged."""
+    Eq, Eqa = _nfa_cache(N)
+    Sigma = N.Sigma
+
+    # remove the epsilon transitions
+    delta = defaultdict(set)
+    for q in N.Q:
+        for r in Eq[q]:
+            for a in Sigma:
+                if (r, a) in Eqa:
+                    delta[q, a] |= Eqa[r, a]
+    F = set(q for q in N.Q if not Eq[q].isdisjoint(N.F))
+
+    # remove the states that are not reachable, or not co-reachable
+    successors = defaultdict(set)
+    predecessors = defaultdict(set)
+    for (q, a), Q1 in delta.items():
+        for q1 in Q1:
+            successors[q].add(q1)
+            predecessors[q1].add(q)
+    reachable = {N.q0}
+    todo = [N.q0]
+    while todo:
+        q = todo.pop()
+        for q1 in successors[q] - reachable:
+            reachable.add(q1)
+            todo.append(q1)
+    coreachable = set(F)
+    todo = list(F)
+    while todo:
+        q = todo.pop()
+        for q1 in predecessors[q] - coreachable:
+            coreachable.add(q1)
+            todo.append(q1)
+    Q = (reachable & coreachable) | {N.q0}
+    delta1 = defaultdict(set)
+    for (q, a), Q1 in delta.items():
+        if q in Q and Q1 & Q:
+            delta1[q, a] = Q1 & Q
+    result = NFA(Q, Sigma.copy(), delta1, N.q0, F & Q, N.epsilon)
+
+    # merge forward and backward bisimilar states until nothing changes
+    while True:
+        size = len(result.Q)
+        representative = _bisimulation_representatives(result.Q, {q: q in result.F for q in result.Q}, _nfa_edges(result, True))
+        result = _nfa_merge_states(result, representative)
+        representative = _bisimulation_representatives(result.Q, {q: q == result.q0 for q in result.Q}, _nfa_edges(result, False))
+        result = _nfa_merge_states(result, representative)
+        if len(result.Q) == size:
+            return result
+
+
+def nfa_to_dfa(N: NFA, reduce: bool = False) -> DFA:
+    """Returns the DFA that is computed by the subset construction. If reduce is true, the subset
+       construction is applied to nfa_reduce(N), which usually results in fewer DFA states. Note that
+       the DFA states are then sets of states of nfa_reduce(N)."""
     def state(q: Set[State]) -> State:
         return State(print_state_set(q))
 
+    if reduce:
+        N = nfa_reduce(N)
+
     Sigma: Set[Symbol] = N.Sigma.copy()
     F: Set[State] = set([])
     Q0: Set[State] = epsilon_closure(N, {N.q0})
@@ -184,10 +354,14 @@ def nfa_to_dfa(N: NFA) -> DFA:
     if not Q0.isdisjoint(N.F):
         F.add(stateQ0)
     todo = [Q0]
+    budget = current_budget()
+    memory = 0  # the estimated size of the state names
 
     while todo:
         Q1 = todo.pop()
         stateQ1 = state(Q1)
+        if budget is not None:
+            budget.step(len(Sigma))
 
         for a in Sigma:
             Q2 = set([])
@@ -201,10 +375,201 @@ def nfa_to_dfa(N: NFA) -> DFA:
             if stateQ2 not in Q:
                 Q.add(stateQ2)
                 todo.append(Q2)
+                if budget is not None:
+                    memory += len(stateQ2) + 80
+                    budget.check_states(len(Q))
+                    budget.check_memory(memory)
 
     return DFA(Q, Sigma, delta, stateQ0, F)
 
 
+class SubsetState(str):
+    """A state of a LazyDFA. It is named like the states of nfa_to_dfa, and it stores the corresponding set of NFA states."""
+
+    def __new__(cls, subset: FrozenSet[State]):
+        result = super().__new__(cls, print_state_set(subset))
+        result.subset = subset
+        return result
+
+
+class _LazyTransitions(collections.abc.Mapping):
+    def __init__(self, D: 'LazyDFA'):
+        self.D = D
+
+    def __getitem__(self, key: Tuple[State, Symbol]) -> State:
+        q, a = key
+        q = self.D.subset_state(q)
+        if q is None or a not in self.D.Sigma:
+            raise KeyError(key)
+        return self.D.transition(q, a)
+
+    def __iter__(self):
+        D = self.D
+        for q in D.Q:
+            for a in D.Sigma:
+                yield q, a
+
+    def __len__(self) -> int:
+        return len(self.D.Q) * len(self.D.Sigma)
+
+
+class _LazyFinalStates(collections.abc.Set):
+    def __init__(self, D: 'LazyDFA'):
+        self.D = D
+
+    @classmethod
+    def _from_iterable(cls, it) -> Set[State]:
+        return set(it)
+
+    def __contains__(self, q) -> bool:
+        q = self.D.subset_state(q)
+        return q is not None and not q.subset.isdisjoint(self.D.N.F)
+
+    def __iter__(self):
+        return (q for q in self.D.Q if q in self)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class LazyDFA(object):
+    """A view of an NFA as the DFA that is computed by nfa_to_dfa. The DFA states are only created
+       when a transition to them is followed, and the transitions are memoized in a cache that holds
+       at most max_cache_size entries; the least recently used entries are removed first. The
+       attributes Sigma, delta, q0 and F can be used like those of a DFA, and the states can also be
+       referred to by name. Iterating over delta or F, or accessing Q, computes all reachable states."""
+
+    def __init__(self, N: NFA, max_cache_size: int = 10000):
+        self.N = N
+        self.Sigma: Set[Symbol] = N.Sigma
+        self.max_cache_size = max_cache_size
+        self._Eq, self._Eqa = _nfa_cache(N)
+        self._cache = OrderedDict()  # maps (subset, a) to the DFA state that is reached via a
+        self.q0: SubsetState = SubsetState(frozenset(self._Eq[N.q0]))
+        self.delta: Mapping[Tuple[State, Symbol], State] = _LazyTransitions(self)
+        self.F: AbstractSet[State] = _LazyFinalStates(self)
+
+    def subset_state(self, q: State) -> Optional[SubsetState]:
+        """Returns the state with name q, or None if q is not the name of a set of NFA states"""
+        if isinstance(q, SubsetState):
+            return q
+        if not isinstance(q, str) or not (q.startswith('{') and q.endswith('}')):
+            return None
+        subset = frozenset(q[1:-1].split(',')) if len(q) > 2 else frozenset()
+        if not subset <= self.N.Q or print_state_set(subset) != q:
+            return None
+        return SubsetState(subset)
+
+    def transition(self, q: SubsetState, a: Symbol) -> SubsetState:
+        key = (q.subset, a)
+        cache = self._cache
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        Eqa = self._Eqa
+        result = SubsetState(frozenset().union(*[Eqa.get((q_i, a), ()) for q_i in q.subset]))
+        cache[key] = result
+        if len(cache) > self.max_cache_size:
+            cache.popitem(last=False)
+        return result
+
+    @property
+    def Q(self) -> Set[State]:
+        result = {self.q0}
+        todo = [self.q0]
+        while todo:
+            q = todo.pop()
+            for a in self.Sigma:
+                q1 = self.transition(q, a)
+                if q1 not in result:
+                    result.add(q1)
+                    todo.append(q1)
+        return result
+
+    def to_dfa(self) -> DFA:
+        Q = self.Q
+        delta = {(State(str(q)), a): State(str(self.transition(q, a))) for q in Q for a in self.Sigma}
+        F = set(State(str(q)) for q in Q if q in self.F)
+        return DFA(set(State(str(q)) for q in Q), self.Sigma.copy(), delta, State(str(self.q0)), F)
+
+
+def nfa_to_lazy_dfa(N: NFA, max_cache_size: int = 10000) -> LazyDFA:
+    return LazyDFA(N, max_cache_size)
+
+
+def _inclusion_cache(A: Union[DFA, NFA]) -> Tuple[FrozenSet[State], Mapping[Tuple[State, Symbol], FrozenSet[State]]]:
+    """Returns the epsilon closure of the initial state and the epsilon closed transitions of a DFA or an NFA"""
+    if isinstance(A, DFA):
+        return frozenset([A.q0]), {(q, a): frozenset([q1]) for (q, a), q1 in A.delta.items()}
+    Eq, Eqa = _nfa_cache(A)
+    return frozenset(Eq[A.q0]), {key: frozenset(Q) for key, Q in Eqa.items()}
+
+
+def nfa_included(N1: Union[DFA, NFA], N2: Union[DFA, NFA]) -> Tuple[bool, Optional[str]]:
+    """Checks if the language of N1 is included in the language of N2, using the antichain algorithm of
+       De Wulf, Doyen, Henzinger and Raskin. It explores pairs (p, S) of a state p of N1 and a set of states
+       S of N2 that are reachable via the same word, and only keeps the pairs with a minimal set S for each p.
+       Returns (True, None) if the language is included, and (False, word) otherwise, with word a shortest
+       word that is accepted by N1 and rejected by N2."""
+    I1, delta1 = _inclusion_cache(N1)
+    I2, delta2 = _inclusion_cache(N2)
+    F1 = N1.F
+    F2 = N2.F
+    Sigma = sorted(N1.Sigma)
+
+    antichain = defaultdict(list)  # maps p to the minimal sets S of the pairs (p, S) that have been found
+    parent = {}  # maps a pair (p, S) to the pair and the symbol from which it was reached
+
+    def add(p: State, S: FrozenSet[State]) -> bool:
+        sets = antichain[p]
+        if any(S1 <= S for S1 in sets):
+            return False
+        antichain[p] = [S1 for S1 in sets if not S <= S1] + [S]
+        return True
+
+    def counterexample(pair) -> str:
+        word = []
+        while parent[pair] is not None:
+            pair, a = parent[pair]
+            word.append(a)
+        return ''.join(reversed(word))
+
+    todo = deque()
+    for p in sorted(I1):
+        if add(p, I2):
+            parent[p, I2] = None
+            if p in F1 and I2.isdisjoint(F2):
+                return False, ''
+            todo.append((p, I2))
+
+    while todo:
+        pair = todo.popleft()
+        p, S = pair
+        for a in Sigma:
+            Q1 = delta1.get((p, a))
+            if not Q1:
+                continue
+            S1 = frozenset().union(*[delta2.get((s, a), ()) for s in S])
+            for p1 in sorted(Q1):
+                if add(p1, S1):
+                    parent[p1, S1] = (pair, a)
+                    if p1 in F1 and S1.isdisjoint(F2):
+                        return False, counterexample((p1, S1))
+                    todo.append((p1, S1))
+    return True, None
+
+
+def nfa_equivalent(N1: Union[DFA, NFA], N2: Union[DFA, NFA]) -> Tuple[bool, Optional[str]]:
+    """Checks if N1 and N2 accept the same language. Returns (True, None) if this is the case, and (False, word)
+       otherwise, with word a shortest word that is accepted by only one of them."""
+    included12, word12 = nfa_included(N1, N2)
+    included21, word21 = nfa_included(N2, N1)
+    if included12 and included21:
+        return True, None
+    words = [word for word in [word12, word21] if word is not None]
+    return False, min(words, key=len)
+
+
 def random_nfa(Sigma: Set[Symbol], n: int) -> NFA:
     import random
 
@@ -2,10 +2,9 @@
 #  Software License, (See accompanying file LICENSE or copy at
 #  https://www.gnu.org/licenses/gpl-3.0.txt)
 
-from typing import Callable, Optional, Tuple, List, Union, Set
+from typing import Callable, Optional, Tuple, List, Union, Set, TYPE_CHECKING
+import os
 import re
-import graphviz
-from tabulate import tabulate
 
 from gambatools.dfa import DFA
 from gambatools.language_algorithms import parse_word_list
@@ -25,9 +24,15 @@ from gambatools.pda_algorithms import pda_simulate_word, pda_accepts_word, parse
 from gambatools.tm_algorithms import tm_accepts_word, tm_simulate_word, parse_tm, tm_words_up_to_n
 from gambatools.printing import print_words
 from gambatools.text_utility import read_utf8_text
-from gambatools.language_generator import check_equal_languages, compare_languages, generate_language
+from gambatools.language_generator import equal_languages_difference, languages_difference, generate_language
 from gambatools.regexp_algorithms import regexp_words_up_to_n, regexp_accepts_word
 from gambatools.regexp_simple_parser import parse_simple_regexp
+from gambatools.result_cache import cached_words
+from gambatools.check_result import CheckResult, structured_check
+from gambatools.acceptor import Acceptor
+
+if TYPE_CHECKING:
+    import graphviz
 
 
 def check_word_in_language(word: str, Sigma: Set[str]) -> None:
@@ -36,31 +41,49 @@ def check_word_in_language(word: str, Sigma: Set[str]) -> None:
             raise RuntimeError('the symbol {} is not in the alphabet {{{}}}'.format(w, Sigma))
 
 
+@structured_check
+def check_automaton_syntax_result(text: str, parse: Callable) -> CheckResult:
+    parse(text)
+    return CheckResult()
+
+
+def check_dfa_syntax_result(text: str) -> CheckResult:
+    return check_automaton_syntax_result(text, parse_dfa)
+
+
+def check_nfa_syntax_result(text: str) -> CheckResult:
+    return check_automaton_syntax_result(text, parse_nfa)
+
+
+def check_pda_syntax_result(text: str) -> CheckResult:
+    return check_automaton_syntax_result(text, parse_pda)
+
+
+def check_tm_syntax_result(text: str) -> CheckResult:
+    return check_automaton_syntax_result(text, parse_tm)
+
+
 def check_automaton_syntax(text: str, parse: Callable) -> None:
-    try:
-        parse(text)
-        print('OK')
-    except Exception as e:
-        print('Error: {}'.format(e))
+    check_automaton_syntax_result(text, parse).print_feedback()
 
 
 def check_dfa_syntax(text: str):
-    check_automaton_syntax(text, parse_dfa)
+    check_dfa_syntax_result(text).print_feedback()
 
 
 def check_nfa_syntax(text: str):
-    check_automaton_syntax(text, parse_nfa)
+    check_nfa_syntax_result(text).print_feedback()
 
 
 def check_pda_syntax(text: str):
-    check_automaton_syntax(text, parse_pda)
+    check_pda_syntax_result(text).print_feedback()
 
 
 def check_tm_syntax(text: str):
-    check_automaton_syntax(text, parse_tm)
+    check_tm_syntax_result(text).print_feedback()
 
 
-def show_automaton(text: str, check: Optional[Callable] = None, state_regex=default_state_label_regex()) -> graphviz.Digraph:
+def show_automaton(text: str, check: Optional[Callable] = None, state_regex=default_state_label_regex()) -> 'graphviz.Digraph':
     try:
         if check:
             check(text)
@@ -70,27 +93,27 @@ def show_automaton(text: str, check: Optional[Callable] = None, state_regex=defa
         print('Error: {}'.format(e))
 
 
-def show(text: str) -> graphviz.Digraph:
+def show(text: str) -> 'graphviz.Digraph':
     return show_automaton(text, state_regex=state_word_or_set_regex())
 
 
-def show_product(text: str) -> graphviz.Digraph:
+def show_product(text: str) -> 'graphviz.Digraph':
     return show_automaton(text, state_regex=state_product_regex())
 
 
-def show_dfa(text: str) -> graphviz.Digraph:
+def show_dfa(text: str) -> 'graphviz.Digraph':
     return show_automaton(text, parse_dfa)
 
 
-def show_nfa(text: str) -> graphviz.Digraph:
+def show_nfa(text: str) -> 'graphviz.Digraph':
     return show_automaton(text, parse_nfa)
 
 
-def show_pda(text: str) -> graphviz.Digraph:
+def show_pda(text: str) -> 'graphviz.Digraph':
     return show_automaton(text, parse_pda)
 
 
-def show_tm(text: str) -> graphviz.Digraph:
+def show_tm(text: str) -> 'graphviz.Digraph':
     return show_automaton(text, parse_tm)
 
 
@@ -110,38 +133,69 @@ def language_parser(filename: str) -> Callable:
     raise RuntimeError('Error: unknown extension in file {}'.format(filename))
 
 
+@structured_check
+def check_language_from_file_result(text: str, text_parser: Callable, answerfile: str, length: int = 5) -> CheckResult:
+    A1 = text_parser(text)
+    answer = read_utf8_text(answerfile)
+    A2 = language_parser(answerfile)(answer)
+    if not (isinstance(A1, (DFA, NFA)) and isinstance(A2, (DFA, NFA))):
+        # the expected language only depends on the answer file and the length
+        A2 = cached_words([answer, os.path.splitext(answerfile)[1], 'generate', str(length)], lambda: generate_language(A2, length))
+    result = CheckResult()
+    result.add_difference(equal_languages_difference(A1, A2, length))
+    return result
+
+
+def check_dfa_language_from_file_result(text: str, filename: str, length: int = 5) -> CheckResult:
+    return check_language_from_file_result(text, parse_dfa, filename, length)
+
+
+def check_nfa_language_from_file_result(text: str, filename: str, length: int = 5) -> CheckResult:
+    return check_language_from_file_result(text, parse_nfa, filename, length)
+
+
+def check_pda_language_from_file_result(text: str, filename: str, length: int = 5) -> CheckResult:
+    return check_language_from_file_result(text, parse_pda, filename, length)
+
+
+def check_tm_language_from_file_result(text: str, filename: str, length: int = 5) -> CheckResult:
+    return check_language_from_file_result(text, parse_tm, filename, length)
+
+
+def check_cfg_language_from_file_result(text: str, filename: str, length: int = 5) -> CheckResult:
+    return check_language_from_file_result(text, parse_simple_cfg, filename, length)
+
+
+def check_regexp_language_from_file_result(text: str, filename: str, length: int = 5) -> CheckResult:
+    return check_language_from_file_result(text, parse_simple_regexp, filename, length)
+
+
 def check_language_from_file(text: str, text_parser: Callable, answerfile: str, length: int = 5) -> None:
-    try:
-        A1 = text_parser(text)
-        A2 = language_parser(answerfile)(read_utf8_text(answerfile))
-        feedback = check_equal_languages(A1, A2, length)
-        print_feedback(feedback)
-    except Exception as e:
-        print('Error: {}'.format(e))
+    check_language_from_file_result(text, text_parser, answerfile, length).print_feedback()
 
 
 def check_dfa_language_from_file(text: str, filename: str, length: int = 5):
-    check_language_from_file(text, parse_dfa, filename, length)
+    check_dfa_language_from_file_result(text, filename, length).print_feedback()
 
 
 def check_nfa_language_from_file(text: str, filename: str, length: int = 5):
-    check_language_from_file(text, parse_nfa, filename, length)
+    check_nfa_language_from_file_result(text, filename, length).print_feedback()
 
 
 def check_pda_language_from_file(text: str, filename: str, length: int = 5):
-    check_language_from_file(text, parse_pda, filename, length)
+    check_pda_language_from_file_result(text, filename, length).print_feedback()
 
 
 def check_tm_language_from_file(text: str, filename: str, length: int = 5):
-    check_language_from_file(text, parse_tm, filename, length)
+    check_tm_language_from_file_result(text, filename, length).print_feedback()
 
 
 def check_cfg_language_from_file(text: str, filename: str, length: int = 5):
-    check_language_from_file(text, parse_simple_cfg, filename, length)
+    check_cfg_language_from_file_result(text, filename, length).print_feedback()
 
 
 def check_regexp_language_from_file(text: str, filename: str, length: int = 5):
-    check_language_from_file(text, parse_simple_regexp, filename, length)
+    check_regexp_language_from_file_result(text, filename, length).print_feedback()
 
 
 def check_max_states(A: Union[DFA, NFA, PDA, TM], max_states: int) -> List[str]:
@@ -158,44 +212,72 @@ def print_feedback(feedback: List[str]) -> None:
         print('OK')
 
 
+@structured_check
+def check_language_from_words_result(text: str, parser: Callable, word_list: str, length: int, max_states: int = 0) -> CheckResult:
+    A = parser(text)
+    result = CheckResult()
+    result.add(check_max_states(A, max_states), 'max_states')
+    A_words = generate_language(A, length)
+    words = parse_word_list(word_list)
+    result.add_difference(languages_difference(A_words, words))
+    return result
+
+
+def check_dfa_language_from_words_result(text: str, word_list: str, length: int, max_states: int = 0) -> CheckResult:
+    return check_language_from_words_result(text, parse_dfa, word_list, length, max_states)
+
+
+def check_nfa_language_from_words_result(text: str, word_list: str, length: int, max_states: int = 0) -> CheckResult:
+    return check_language_from_words_result(text, parse_nfa, word_list, length, max_states)
+
+
+def check_pda_language_from_words_result(text: str, word_list: str, length: int, max_states: int = 0) -> CheckResult:
+    return check_language_from_words_result(text, parse_pda, word_list, length, max_states)
+
+
+def check_tm_language_from_words_result(text: str, word_list: str, length: int, max_states: int = 0) -> CheckResult:
+    return check_language_from_words_result(text, parse_tm, word_list, length, max_states)
+
+
+def check_cfg_language_from_words_result(text: str, word_list: str, length: int) -> CheckResult:
+    return check_language_from_words_result(text, parse_simple_cfg, word_list, length)
+
+
+def check_regexp_language_from_words_result(text: str, word_list: str, length: int) -> CheckResult:
+    return check_language_from_words_result(text, parse_simple_regexp, word_list, length)
+
+
 def check_language_from_words(text: str, parser: Callable, word_list: str, length: int, max_states: int = 0):
-    try:
-        A = parser(text)
-        feedback = check_max_states(A, max_states)
-        A_words = generate_language(A, length)
-        words = parse_word_list(word_list)
-        feedback.extend(compare_languages(A_words, words))
-        print_feedback(feedback)
-    except Exception as e:
-        print('Error: {}'.format(e))
+    check_language_from_words_result(text, parser, word_list, length, max_states).print_feedback()
 
 
 def check_dfa_language_from_words(text: str, word_list: str, length: int, max_states: int = 0):
-    check_language_from_words(text, parse_dfa, word_list, length, max_states)
+    check_dfa_language_from_words_result(text, word_list, length, max_states).print_feedback()
 
 
 def check_nfa_language_from_words(text: str, word_list: str, length: int, max_states: int = 0):
-    check_language_from_words(text, parse_nfa, word_list, length, max_states)
+    check_nfa_language_from_words_result(text, word_list, length, max_states).print_feedback()
 
 
 def check_pda_language_from_words(text: str, word_list: str, length: int, max_states: int = 0):
-    check_language_from_words(text, parse_pda, word_list, length, max_states)
+    check_pda_language_from_words_result(text, word_list, length, max_states).print_feedback()
 
 
 def check_tm_language_from_words(text: str, word_list: str, length: int, max_states: int = 0):
-    check_language_from_words(text, parse_tm, word_list, length, max_states)
+    check_tm_language_from_words_result(text, word_list, length, max_states).print_feedback()
 
 
 def check_cfg_language_from_words(text: str, word_list: str, length: int):
-    check_language_from_words(text, parse_simple_cfg, word_list, length)
+    check_cfg_language_from_words_result(text, word_list, length).print_feedback()
 
 
 def check_regexp_language_from_words(text: str, word_list: str, length: int):
-    check_language_from_words(text, parse_simple_regexp, word_list, length)
+    check_regexp_language_from_words_result(text, word_list, length).print_feedback()
 
 
 def simulate_dfa(text: str, word: str) -> None:
     from IPython.core.display import display, HTML
+    from tabulate import tabulate
 
     try:
         D = parse_dfa(text)
@@ -209,6 +291,7 @@ def simulate_dfa(text: str, word: str) -> None:
 
 def simulate_nfa(text: str, word: str) -> None:
     from IPython.core.display import display, HTML
+    from tabulate import tabulate
 
     def make_row(row: Tuple[State, str]):
         q, word = row
@@ -231,6 +314,7 @@ def simulate_nfa(text: str, word: str) -> None:
 
 def simulate_pda(text: str, word: str) -> None:
     from IPython.core.display import display, HTML
+    from tabulate import tabulate
 
     def make_row(row: Tuple[State, str, List[Symbol]], epsilon: str):
         q, word, stack = row
@@ -255,15 +339,21 @@ def simulate_pda(text: str, word: str) -> None:
 
 def simulate_tm(text: str, word: str) -> None:
     from IPython.core.display import display, HTML
+    from tabulate import tabulate
 
-    def make_row(row: Tuple[State, List[str], int], blank: str) -> Tuple[str, str]:
-        q, tape, pos = row
+    def make_tape(tape: List[str], pos: int, blank: str) -> str:
         tape = tape[:]
         while pos < len(tape) - 1 and tape[-1] == blank:
             tape.pop()
         tape = [t if t != blank else '□' for t in tape]
         tape[pos] = 'UNDERLINE_LEFT{}UNDERLINE_RIGHT'.format(tape[pos])  # TODO: find a cleaner solution for this
-        return str(q), ''.join(tape)
+        return ''.join(tape)
+
+    def make_row(row: Tuple[State, List[str], int], blank: str) -> Tuple[str, str]:
+        q, tape, pos = row
+        if isinstance(pos, list):  # a multi-tape TM
+            return str(q), 'LINE_BREAK'.join(make_tape(tape_i, pos_i, blank) for tape_i, pos_i in zip(tape, pos))
+        return str(q), make_tape(tape, pos, blank)
 
     try:
         T = parse_tm(text)
@@ -273,6 +363,7 @@ def simulate_tm(text: str, word: str) -> None:
         html = tabulate(table, headers=["State", "Tape", "Head"], tablefmt='html')
         html = html.replace('UNDERLINE_LEFT', '<u>')
         html = html.replace('UNDERLINE_RIGHT', '</u>')
+        html = html.replace('LINE_BREAK', '<br>')
         display(HTML(html))
     except Exception as e:
         print('Error: {}'.format(e))
@@ -311,14 +402,18 @@ def regexp_language(text: str, length: int) -> str:
     return automaton_language(text, parse_simple_regexp, regexp_words_up_to_n, length)
 
 
+@structured_check
+def check_number_of_nfa_states_result(nfa: str, count: int) -> CheckResult:
+    N = parse_nfa(nfa)
+    result = CheckResult()
+    if len(N.Q) != count:
+        result.set_incorrect('number_of_states')
+    return result
+
+
 # EV, 5jun2020 added check_number_of_nfa_states
 def check_number_of_nfa_states(nfa: str, count: int) -> None:
-    try:
-        N = parse_nfa(nfa)
-        if len(N.Q) == count:
-            print('OK')
-    except Exception as e:
-        print('Error: {}'.format(e))
+    check_number_of_nfa_states_result(nfa, count).print_feedback()
 
 
 def nfa_accepts(nfa: str, word: str) -> bool:
@@ -337,57 +432,45 @@ def regexp_accepts(regex: str, word: str) -> bool:
         print('Error: {}'.format(e))
 
 
+@structured_check
+def check_automaton_accepts_rejects_result(A: Union[DFA, NFA, PDA, TM, CFG, Regexp], accepted: str, rejected: str) -> CheckResult:
+    result = CheckResult()
+    result.add_difference(Acceptor(A).first_failure(parse_word_list(accepted), parse_word_list(rejected)))
+    return result
+
+
+@structured_check
+def check_cfg_accepts_rejects_result(cfg: str, accepted_words: str, rejected_words: str) -> CheckResult:
+    G = parse_simple_cfg(cfg)
+    return check_automaton_accepts_rejects_result(G, accepted_words, rejected_words)
+
+
+@structured_check
+def check_dfa_accepts_rejects_result(dfa: str, accepted_words: str, rejected_words: str) -> CheckResult:
+    D = parse_dfa(dfa)
+    return check_automaton_accepts_rejects_result(D, accepted_words, rejected_words)
+
+
+@structured_check
+def check_dfa2regexp_result(dfa: str, regexp: str, length: int = 8) -> CheckResult:
+    D = parse_dfa(dfa)
+    R = parse_simple_regexp(regexp)
+    result = CheckResult()
+    result.add_difference(equal_languages_difference(R, D, length))
+    return result
+
+
 def check_automaton_accepts_rejects(A: Union[DFA, NFA, PDA, TM, CFG, Regexp], accepted: str, rejected: str) -> None:
-    def accepts(A: Union[DFA, NFA, PDA, TM, CFG, Regexp], word: str) -> bool:
-        if isinstance(A, DFA):
-            return dfa_accepts_word(A, word)
-        elif isinstance(A, NFA):
-            return nfa_accepts_word(A, word)
-        elif isinstance(A, PDA):
-            return pda_accepts_word(A, word)
-        elif isinstance(A, TM):
-            return tm_accepts_word(A, word)
-        elif isinstance(A, CFG):
-            return cfg_accepts_word(A, word)
-        elif isinstance(A, Regexp):
-            return regexp_accepts_word(A, word)
-
-    accepted_words = parse_word_list(accepted)
-    rejected_words = parse_word_list(rejected)
-
-    for word in accepted_words:
-        if not accepts(A, word):
-            word = word if word else 'ε'
-            print("Error: word '{}' should be accepted".format(word))
-            return
-
-    for word in rejected_words:
-        if accepts(A, word):
-            word = word if word else 'ε'
-            print("Error: word '{}' should not be accepted".format(word))
-            return
-
-    print('OK')
+    check_automaton_accepts_rejects_result(A, accepted, rejected).print_feedback()
 
 
 def check_cfg_accepts_rejects(cfg: str, accepted_words: str, rejected_words: str) -> None:
-    try:
-        G = parse_simple_cfg(cfg)
-        check_automaton_accepts_rejects(G, accepted_words, rejected_words)
-    except RuntimeError as e:
-        print('Error: {}'.format(e))
+    check_cfg_accepts_rejects_result(cfg, accepted_words, rejected_words).print_feedback()
 
 
 def check_dfa_accepts_rejects(dfa: str, accepted_words: str, rejected_words: str) -> None:
-    D = parse_dfa(dfa)
-    check_automaton_accepts_rejects(D, accepted_words, rejected_words)
+    check_dfa_accepts_rejects_result(dfa, accepted_words, rejected_words).print_feedback()
 
 
 def check_dfa2regexp(dfa: str, regexp: str, length: int = 8) -> None:
-    try:
-        D = parse_dfa(dfa)
-        R = parse_simple_regexp(regexp)
-        feedback = check_equal_languages(R, D, length)
-        print_feedback(feedback)
-    except Exception as e:
-        print('Error: {}'.format(e))
+    check_dfa2regexp_result(dfa, regexp, length).print_feedback()
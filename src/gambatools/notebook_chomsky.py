@@ -9,8 +9,8 @@ from gambatools.cfg import CFG, Variable
 from gambatools.cfg_algorithms import parse_simple_cfg, cfg_add_new_start_variable_in_place, \
     cfg_remove_epsilon_rules_in_place, cfg_eliminate_unit_rules_in_place, cfg_make_rules_of_length_two_in_place, \
     cfg_eliminate_terminals_in_place, cfg_to_chomsky, cfg_words_up_to_n
-from gambatools.language_generator import compare_languages
-from gambatools.notebook import print_feedback
+from gambatools.language_generator import languages_difference
+from gambatools.check_result import CheckResult, structured_check
 
 
 def check_cfg_has_start_variable(G: CFG, S: Variable) -> List[str]:
@@ -62,29 +62,31 @@ def cfg_apply_chomsky(G: CFG, phase: int, start_variable: str) -> CFG:
     return G1
 
 
+@structured_check
+def cfg_check_chomsky_result(cfg: str, cfg1: str, phase: int, start_variable: str, length: int) -> CheckResult:
+    result = CheckResult()
+    G = parse_simple_cfg(cfg)
+    G1 = parse_simple_cfg(cfg1)
+    S = Variable(start_variable)
+
+    if phase >= 0:
+        g = cfg_to_chomsky(G) if not G.is_chomsky() else G
+        g1 = cfg_to_chomsky(G1) if not G1.is_chomsky() else G1
+        A1 = cfg_words_up_to_n(g1, length)
+        A2 = cfg_words_up_to_n(g, length)
+        result.add_difference(languages_difference(A1, A2))
+    if phase >= 1:
+        result.add(check_cfg_has_start_variable(G1, S), 'start_variable')
+    if phase >= 2:
+        result.add(check_cfg_has_no_epsilon_rules(G1), 'epsilon_rule')
+    if phase >= 3:
+        result.add(check_cfg_has_no_unit_productions(G1), 'unit_rule')
+    if phase >= 4:
+        result.add(check_cfg_has_right_hand_sides_of_length_at_most_two(G1), 'long_rule')
+    if phase >= 5:
+        result.add(check_cfg_is_chomsky(G1), 'not_chomsky')
+    return result
+
+
 def cfg_check_chomsky(cfg: str, cfg1: str, phase: int, start_variable: str, length: int) -> None:
-    try:
-        feedback = []
-        G = parse_simple_cfg(cfg)
-        G1 = parse_simple_cfg(cfg1)
-        S = Variable(start_variable)
-
-        if phase >= 0:
-            g = cfg_to_chomsky(G) if not G.is_chomsky() else G
-            g1 = cfg_to_chomsky(G1) if not G1.is_chomsky() else G1
-            A1 = cfg_words_up_to_n(g1, length)
-            A2 = cfg_words_up_to_n(g, length)
-            feedback = feedback + compare_languages(A1, A2)
-        if phase >= 1:
-            feedback = feedback + check_cfg_has_start_variable(G1, S)
-        if phase >= 2:
-            feedback = feedback + check_cfg_has_no_epsilon_rules(G1)
-        if phase >= 3:
-            feedback = feedback + check_cfg_has_no_unit_productions(G1)
-        if phase >= 4:
-            feedback = feedback + check_cfg_has_right_hand_sides_of_length_at_most_two(G1)
-        if phase >= 5:
-            feedback = feedback + check_cfg_is_chomsky(G1)
-        print_feedback(feedback)
-    except Exception as e:
-        print('Error: {}'.format(e))
+    cfg_check_chomsky_result(cfg, cfg1, phase, start_variable, length).print_feedback()
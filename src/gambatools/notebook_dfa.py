@@ -9,9 +9,10 @@ from gambatools.dfa_algorithms import parse_dfa, dfa_union, dfa_intersection, df
     dfa_complement, dfa_words_up_to_n, dfa_minimize, dfa_quotient
 from gambatools.dfa import DFA, State, Symbol
 from gambatools.language_algorithms import language_reverse
-from gambatools.language_generator import compare_languages, check_equal_languages, generate_language
+from gambatools.language_generator import languages_difference, generate_language
 from gambatools.nfa_algorithms import parse_nfa
-from gambatools.notebook import print_feedback, show, show_product
+from gambatools.notebook import show, show_product
+from gambatools.check_result import CheckResult, structured_check
 
 
 def extract_states(q: State) -> Tuple[State, State]:
@@ -49,141 +50,159 @@ def check_product_automaton(D: DFA, D1: DFA, D2: DFA, answer: DFA) -> List[str]:
     return feedback
 
 
-def check_dfa_union(dfa: str, dfa1: str, dfa2: str, length: int = 8) -> None:
+@structured_check
+def check_dfa_union_result(dfa: str, dfa1: str, dfa2: str, length: int = 8) -> CheckResult:
     from gambatools.language_algorithms import union
-    try:
-        D1 = parse_dfa(dfa1)
-        D2 = parse_dfa(dfa2)
-        D = dfa_union(D1, D2)
-        answer = parse_dfa(dfa, state_regex=state_product_regex())
-        feedback = check_product_automaton(D, D1, D2, answer)
-        L1 = dfa_words_up_to_n(D1, length)
-        L2 = dfa_words_up_to_n(D2, length)
-        L = dfa_words_up_to_n(answer, length)
-        feedback = feedback + compare_languages(L, union(L1, L2))
-        print_feedback(feedback)
-    except Exception as e:
-        print('Error: {}'.format(e))
+    D1 = parse_dfa(dfa1)
+    D2 = parse_dfa(dfa2)
+    D = dfa_union(D1, D2)
+    answer = parse_dfa(dfa, state_regex=state_product_regex())
+    result = CheckResult()
+    result.add(check_product_automaton(D, D1, D2, answer), 'wrong_automaton')
+    L1 = dfa_words_up_to_n(D1, length)
+    L2 = dfa_words_up_to_n(D2, length)
+    L = dfa_words_up_to_n(answer, length)
+    result.add_difference(languages_difference(L, union(L1, L2)))
+    return result
+
+
+@structured_check
+def check_dfa_intersection_result(dfa: str, dfa1: str, dfa2: str, length: int = 8) -> CheckResult:
+    from gambatools.language_algorithms import intersection
+    D1 = parse_dfa(dfa1)
+    D2 = parse_dfa(dfa2)
+    D = dfa_intersection(D1, D2)
+    answer = parse_dfa(dfa, state_regex=state_product_regex())
+    result = CheckResult()
+    result.add(check_product_automaton(D, D1, D2, answer), 'wrong_automaton')
+    L1 = dfa_words_up_to_n(D1, length)
+    L2 = dfa_words_up_to_n(D2, length)
+    L = dfa_words_up_to_n(answer, length)
+    result.add_difference(languages_difference(L, intersection(L1, L2)))
+    return result
+
+
+@structured_check
+def check_dfa_symmetric_difference_result(dfa: str, dfa1: str, dfa2: str, length: int = 8) -> CheckResult:
+    from gambatools.language_algorithms import symmetric_difference
+    D1 = parse_dfa(dfa1)
+    D2 = parse_dfa(dfa2)
+    D = dfa_symmetric_difference(D1, D2)
+    answer = parse_dfa(dfa, state_regex=state_product_regex())
+    result = CheckResult()
+    result.add(check_product_automaton(D, D1, D2, answer), 'wrong_automaton')
+    L1 = dfa_words_up_to_n(D1, length)
+    L2 = dfa_words_up_to_n(D2, length)
+    L = dfa_words_up_to_n(answer, length)
+    result.add_difference(languages_difference(L, symmetric_difference(L1, L2)))
+    return result
+
+
+@structured_check
+def check_dfa_complement_result(dfa: str, dfa1: str, length: int = 8) -> CheckResult:
+    D1 = parse_dfa(dfa1)
+    D = dfa_complement(D1)
+    answer = parse_dfa(dfa)
 
+    feedback = []
 
-def check_dfa_intersection(dfa: str, dfa1: str, dfa2: str, length: int = 8) -> None:
-    from gambatools.language_algorithms import intersection
-    try:
-        D1 = parse_dfa(dfa1)
-        D2 = parse_dfa(dfa2)
-        D = dfa_intersection(D1, D2)
-        answer = parse_dfa(dfa, state_regex=state_product_regex())
-        feedback = check_product_automaton(D, D1, D2, answer)
-        L1 = dfa_words_up_to_n(D1, length)
-        L2 = dfa_words_up_to_n(D2, length)
-        L = dfa_words_up_to_n(answer, length)
-        feedback = feedback + compare_languages(L, intersection(L1, L2))
-        print_feedback(feedback)
-    except Exception as e:
-        print('Error: {}'.format(e))
+    if D.Sigma != answer.Sigma:
+        feedback.append('The alphabet of the complement should be equal to the alphabet of the original DFA')
 
+    if D.Q != answer.Q:
+        feedback.append('The states of the complement should be equal to the states of the original DFA')
 
-def check_dfa_symmetric_difference(dfa: str, dfa1: str, dfa2: str, length: int = 8) -> None:
-    from gambatools.language_algorithms import symmetric_difference
-    try:
-        D1 = parse_dfa(dfa1)
-        D2 = parse_dfa(dfa2)
-        D = dfa_symmetric_difference(D1, D2)
-        answer = parse_dfa(dfa, state_regex=state_product_regex())
-        feedback = check_product_automaton(D, D1, D2, answer)
-        L1 = dfa_words_up_to_n(D1, length)
-        L2 = dfa_words_up_to_n(D2, length)
-        L = dfa_words_up_to_n(answer, length)
-        feedback = feedback + compare_languages(L, symmetric_difference(L1, L2))
-        print_feedback(feedback)
-    except Exception as e:
-        print('Error: {}'.format(e))
+    if D.q0 != answer.q0:
+        feedback.append('The initial state of the complement should be equal to the initial state of the original DFA')
 
+    if D.delta != answer.delta:
+        feedback.append('The transitions of the complement should be equal to the transitions of the original DFA')
 
-def check_dfa_complement(dfa: str, dfa1: str, length: int = 8) -> None:
-    try:
-        D1 = parse_dfa(dfa1)
-        D = dfa_complement(D1)
-        answer = parse_dfa(dfa)
+    # check the final states
+    for q in D.F - answer.F:
+        feedback.append('The state {} should be final'.format(q))
+    for q in answer.F - D.F:
+        feedback.append('The state {} should not be final'.format(q))
 
-        feedback = []
+    feedback = []
+    result = CheckResult()
+    result.add(feedback, 'wrong_automaton')
+    return result
 
-        if D.Sigma != answer.Sigma:
-            feedback.append('The alphabet of the complement should be equal to the alphabet of the original DFA')
 
-        if D.Q != answer.Q:
-            feedback.append('The states of the complement should be equal to the states of the original DFA')
+@structured_check
+def check_dfa_reverse_result(dfa: str, nfa: str, length: int = 8) -> CheckResult:
+    D = parse_dfa(dfa)
+    answer = parse_nfa(nfa)
 
-        if D.q0 != answer.q0:
-            feedback.append('The initial state of the complement should be equal to the initial state of the original DFA')
+    feedback = []
 
-        if D.delta != answer.delta:
-            feedback.append('The transitions of the complement should be equal to the transitions of the original DFA')
+    if D.Sigma != answer.Sigma:
+        feedback.append('Error: the alphabet of the complement should be equal to the alphabet of the original DFA')
 
-        # check the final states
-        for q in D.F - answer.F:
-            feedback.append('The state {} should be final'.format(q))
-        for q in answer.F - D.F:
-            feedback.append('The state {} should not be final'.format(q))
+    if not D.Q <= answer.Q:
+        feedback.append('Warning: the states of the original DFA should be reused')
 
-        feedback = []
-        print_feedback(feedback)
-    except Exception as e:
-        print('Error: {}'.format(e))
+    for (q, a), q1 in D.delta.items():
+        if q not in answer.delta[q1, a]:
+            feedback.append('Warning: the reversed transition {} --{}-> {} is missing'.format(q1, a, q))
+            break
 
+    if answer.q0 in D.Q:
+        feedback.append('Warning: a new initial state should be introduced')
 
-def check_dfa_reverse(dfa: str, nfa: str, length: int = 8) -> None:
-    try:
-        D = parse_dfa(dfa)
-        answer = parse_nfa(nfa)
+    if answer.F != {D.q0}:
+        feedback.append('Warning: the initial state of the DFA should be the final state of the NFA')
 
-        feedback = []
+    result = CheckResult()
+    result.add(feedback, 'wrong_automaton')
+    L1 = generate_language(answer, length)
+    L2 = language_reverse(generate_language(D, length))
+    result.add_difference(languages_difference(L1, L2))
+    return result
 
-        if D.Sigma != answer.Sigma:
-            feedback.append('Error: the alphabet of the complement should be equal to the alphabet of the original DFA')
 
-        if not D.Q <= answer.Q:
-            feedback.append('Warning: the states of the original DFA should be reused')
+@structured_check
+def check_dfa_minimal_result(dfa: str, answer_dfa: str, length: int = 8) -> CheckResult:
+    D = parse_dfa(dfa)
+    D = dfa_quotient(D)
+    answer = parse_dfa(answer_dfa, state_regex=state_word_or_set_regex())
 
-        for (q, a), q1 in D.delta.items():
-            if q not in answer.delta[q1, a]:
-                feedback.append('Warning: the reversed transition {} --{}-> {} is missing'.format(q1, a, q))
-                break
+    feedback = []
 
-        if answer.q0 in D.Q:
-            feedback.append('Warning: a new initial state should be introduced')
+    if D.Sigma != answer.Sigma:
+        feedback.append('The alphabet of the complement should be equal to the alphabet of the original DFA')
 
-        if answer.F != {D.q0}:
-            feedback.append('Warning: the initial state of the DFA should be the final state of the NFA')
+    if len(D.Q) != len(answer.Q):
+        feedback.append(f'The number of states {len(answer.Q)} is incorrect; it should be {len(D.Q)}')
 
-        L1 = generate_language(answer, length)
-        L2 = language_reverse(generate_language(D, length))
-        feedback = feedback + compare_languages(L1, L2)
+    result = CheckResult()
+    result.add(feedback, 'wrong_automaton')
+    L1 = generate_language(answer, length)
+    L2 = generate_language(D, length)
+    result.add_difference(languages_difference(L1, L2))
+    return result
 
-        print_feedback(feedback)
 
-    except Exception as e:
-        print('Error: {}'.format(e))
+def check_dfa_union(dfa: str, dfa1: str, dfa2: str, length: int = 8) -> None:
+    check_dfa_union_result(dfa, dfa1, dfa2, length).print_feedback()
 
 
-def check_dfa_minimal(dfa: str, answer_dfa: str, length: int = 8) -> None:
-    try:
-        D = parse_dfa(dfa)
-        D = dfa_quotient(D)
-        answer = parse_dfa(answer_dfa, state_regex=state_word_or_set_regex())
+def check_dfa_intersection(dfa: str, dfa1: str, dfa2: str, length: int = 8) -> None:
+    check_dfa_intersection_result(dfa, dfa1, dfa2, length).print_feedback()
+
+
+def check_dfa_symmetric_difference(dfa: str, dfa1: str, dfa2: str, length: int = 8) -> None:
+    check_dfa_symmetric_difference_result(dfa, dfa1, dfa2, length).print_feedback()
 
-        feedback = []
 
-        if D.Sigma != answer.Sigma:
-            feedback.append('The alphabet of the complement should be equal to the alphabet of the original DFA')
+def check_dfa_complement(dfa: str, dfa1: str, length: int = 8) -> None:
+    check_dfa_complement_result(dfa, dfa1, length).print_feedback()
+
 
-        if len(D.Q) != len(answer.Q):
-            feedback.append(f'The number of states {len(answer.Q)} is incorrect; it should be {len(D.Q)}')
+def check_dfa_reverse(dfa: str, nfa: str, length: int = 8) -> None:
+    check_dfa_reverse_result(dfa, nfa, length).print_feedback()
 
-        L1 = generate_language(answer, length)
-        L2 = generate_language(D, length)
-        feedback = feedback + compare_languages(L1, L2)
 
-        print_feedback(feedback)
-    except Exception as e:
-        print('Error: {}'.format(e))
+def check_dfa_minimal(dfa: str, answer_dfa: str, length: int = 8) -> None:
+    check_dfa_minimal_result(dfa, answer_dfa, length).print_feedback()
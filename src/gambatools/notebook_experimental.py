@@ -4,14 +4,14 @@
 
 import random
 
-from IPython.core.display import HTML
-
 from gambatools.cfg_algorithms import parse_simple_cfg, cfg_accepts_word
 from gambatools.language_algorithms import parse_word_list
 from gambatools.printing import print_words
 
 
 def hide_code():
+    from IPython.core.display import HTML
+
     this_cell = """$('div.cell.code_cell.rendered.selected')"""
 
     toggle_text = '.'  # text shown on toggle link
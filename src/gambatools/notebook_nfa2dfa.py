@@ -4,19 +4,21 @@
 
 import itertools
 import re
-from typing import Set
-
-import graphviz
+from typing import Set, TYPE_CHECKING
 
 from gambatools.automaton_algorithms import state_set_regex
 from gambatools.dfa import DFA, State, print_state_set
 from gambatools.dfa_algorithms import parse_dfa
 from gambatools.nfa import NFA
 from gambatools.nfa_algorithms import parse_nfa, nfa_to_dfa, epsilon_closure
-from gambatools.notebook import print_feedback, show_automaton, show
+from gambatools.notebook import show_automaton, show
+from gambatools.check_result import CheckResult, structured_check
+
+if TYPE_CHECKING:
+    import graphviz
 
 
-def show_nfa2dfa(text: str) -> graphviz.Digraph:
+def show_nfa2dfa(text: str) -> 'graphviz.Digraph':
     return show_automaton(text, state_regex=state_set_regex())
 
 
@@ -96,11 +98,14 @@ def check_nfa_to_dfa_answer(N: NFA, answer: NFA):
     return feedback
 
 
+@structured_check
+def check_nfa2dfa_result(nfa: str, dfa: str) -> CheckResult:
+    N = parse_nfa(nfa)
+    answer: NFA = parse_nfa(dfa, state_regex=state_set_regex())  # N.B. We use an NFA, to avoid the strict DFA checking
+    result = CheckResult()
+    result.add(check_nfa_to_dfa_answer(N, answer), 'wrong_automaton')
+    return result
+
+
 def check_nfa2dfa(nfa: str, dfa: str) -> None:
-    try:
-        N = parse_nfa(nfa)
-        answer: NFA = parse_nfa(dfa, state_regex=state_set_regex())  # N.B. We use an NFA, to avoid the strict DFA checking
-        feedback = check_nfa_to_dfa_answer(N, answer)
-        print_feedback(feedback)
-    except Exception as e:
-        print('Error: {}'.format(e))
+    check_nfa2dfa_result(nfa, dfa).print_feedback()
@@ -2,8 +2,8 @@
 #  Software License, (See accompanying file LICENSE or copy at
 #  https://www.gnu.org/licenses/gpl-3.0.txt)
 
-from typing import List, Set, Iterable, Optional, Tuple
-from collections import defaultdict
+from typing import Dict, List, Set, Iterable, Optional, Tuple, Union, DefaultDict
+from collections import defaultdict, deque
 import copy
 import itertools
 import io
@@ -14,6 +14,7 @@ from gambatools.automaton_algorithms import default_state_label_regex, Automaton
 from gambatools.dfa import State, Symbol
 from gambatools.dfa_algorithms import fresh_state
 from gambatools.global_settings import GambaTools
+from gambatools.budget import current_budget, estimated_words_size
 from gambatools.pda import PDA
 from gambatools.cfg import CFG, Variable, Terminal, Rule, Alternative
 
@@ -135,7 +136,8 @@ def pda_to_push_pop(P: PDA) -> PDA:
 
 
 def pda_to_cfg(P: PDA, accepts_on_empty_stack: bool = False) -> CFG:
-    """Implements the algorithm in Sipser 3rd ed. page 122.
+    """Implements the algorithm in Sipser 3rd ed. page 122. Only variables A_pq that are reachable
+       from the start variable and for which P can go from p to q with an unchanged stack are generated.
     """
 
     P = copy.deepcopy(P)
@@ -164,7 +166,6 @@ def pda_to_cfg(P: PDA, accepts_on_empty_stack: bool = False) -> CFG:
     def make_rule(A, a):
         return Rule(A, Alternative([value for value in a if value != epsilon]))
 
-    V: Set[Variable] = {variable(p, q) for (p, q) in itertools.product(Q, repeat=2)}
     Sigma1: Set[Terminal] = set([Terminal(a) for a in Sigma])
     R: List[Rule] = []
     S: Variable = variable(q0, q_accept)
@@ -178,43 +179,157 @@ def pda_to_cfg(P: PDA, accepts_on_empty_stack: bool = False) -> CFG:
             else:
                 T_pop[u].append((p, a, u, q, v))
 
+    # The pairs of transitions p --a--> r that push u and s --b--> q that pop u, indexed by (r, s)
+    matching_pairs = defaultdict(list)
     for u in Gamma:
         for (p, a, _, r, _), (s, b, _, q, _) in itertools.product(T_push[u], T_pop[u]):
-            Apq = variable(p, q)
-            Ars = variable(r, s)
-            a_ = Terminal(a)
-            b_ = Terminal(b)
-            R.append(make_rule(Apq, [a_, Ars, b_]))
+            matching_pairs[r, s].append((p, a, b, q))
 
-    for (p, q, r) in itertools.product(Q, repeat=3):
-        Apq = variable(p, q)
-        Apr = variable(p, r)
-        Arq = variable(r, q)
-        R.append(make_rule(Apq, [Apr, Arq]))
+    # Compute the summarizable pairs (p, q): P can go from p to q with the same stack at both ends.
+    # Only for these pairs the variable A_pq generates a word.
+    summaries: Set[Tuple[State, State]] = {(p, p) for p in Q}
+    successors = defaultdict(set)
+    predecessors = defaultdict(set)
+    for p in Q:
+        successors[p].add(p)
+        predecessors[p].add(p)
+    todo = []
+
+    def add_summary(p: State, q: State) -> None:
+        if (p, q) not in summaries:
+            summaries.add((p, q))
+            successors[p].add(q)
+            predecessors[q].add(p)
+            todo.append((p, q))
 
     for p in Q:
-        App = variable(p, p)
-        R.append(make_rule(App, []))
+        for (p1, a, b, q1) in matching_pairs[p, p]:
+            add_summary(p1, q1)
+    while todo:
+        p, q = todo.pop()
+        for (p1, a, b, q1) in matching_pairs[p, q]:
+            add_summary(p1, q1)
+        for r in list(predecessors[p]):
+            add_summary(r, q)
+        for r in list(successors[q]):
+            add_summary(p, r)
+
+    # Generate the rules for the variables that are reachable from the start variable
+    inner_pairs = defaultdict(list)
+    for (r, s), transitions in matching_pairs.items():
+        if (r, s) in summaries:
+            for (p, a, b, q) in transitions:
+                inner_pairs[p, q].append((a, r, s, b))
+
+    V: Set[Variable] = {S}
+    todo = [(q0, q_accept)] if (q0, q_accept) in summaries else []
+    done = set(todo)
+
+    def visit(p: State, q: State) -> Variable:
+        if (p, q) not in done:
+            done.add((p, q))
+            todo.append((p, q))
+        return variable(p, q)
+
+    while todo:
+        p, q = todo.pop()
+        Apq = variable(p, q)
+        V.add(Apq)
+        for (a, r, s, b) in inner_pairs[p, q]:
+            R.append(make_rule(Apq, [Terminal(a), visit(r, s), Terminal(b)]))
+        for r in sorted(successors[p] & predecessors[q]):
+            R.append(make_rule(Apq, [visit(p, r), visit(r, q)]))
+        if p == q:
+            R.append(make_rule(Apq, []))
 
     return CFG(V, Sigma1, R, S, epsilon)
 
 
+class PDAStack(object):
+    """A persistent stack of symbols. Stacks are linked lists of nodes that share their tails,
+       hence push and pop take constant time. The hash value is computed once, when a node is created."""
+
+    __slots__ = ('top', 'rest', 'size', '_hash')
+
+    def __init__(self, top: Optional[Symbol] = None, rest: Optional['PDAStack'] = None):
+        self.top = top
+        self.rest = rest
+        self.size = 0 if rest is None else rest.size + 1
+        self._hash = hash((top, None if rest is None else rest._hash))
+
+    def is_empty(self) -> bool:
+        return self.rest is None
+
+    def push(self, symbol: Symbol) -> 'PDAStack':
+        return PDAStack(symbol, self)
+
+    def pop(self) -> 'PDAStack':
+        if self.rest is None:
+            raise RuntimeError('cannot pop from an empty stack')
+        return self.rest
+
+    def to_list(self) -> List[Symbol]:
+        """Returns the symbols on the stack, with the top of the stack at the end"""
+        result = []
+        node = self
+        while node.rest is not None:
+            result.append(node.top)
+            node = node.rest
+        result.reverse()
+        return result
+
+    def __eq__(self, other):
+        if not isinstance(other, PDAStack):
+            return NotImplemented
+        x, y = self, other
+        while x is not y:
+            if x._hash != y._hash or x.size != y.size or x.top != y.top:
+                return False
+            x, y = x.rest, y.rest
+        return True
+
+    def __hash__(self):
+        return self._hash
+
+
+empty_pda_stack = PDAStack()
+
+
+def make_pda_stack(symbols: Iterable[Symbol]) -> PDAStack:
+    """Creates a stack from a sequence of symbols, with the top of the stack at the end"""
+    result = empty_pda_stack
+    for symbol in symbols:
+        result = result.push(symbol)
+    return result
+
+
 class PDAState(object):
-    def __init__(self, q: State, stack: List[Symbol]):
+    """A configuration of a PDA, consisting of a state and a persistent stack."""
+
+    __slots__ = ('q', 'node', '_hash')
+
+    def __init__(self, q: State, stack: Union[PDAStack, Iterable[Symbol]]):
         self.q = q
-        self.stack = stack[:]
+        self.node = stack if isinstance(stack, PDAStack) else make_pda_stack(stack)
+        self._hash = hash((q, self.node._hash))
+
+    @property
+    def stack(self) -> List[Symbol]:
+        return self.node.to_list()
 
     def __str__(self):
         return '({}, [{}])'.format(self.q, ''.join(self.stack))
 
     def __eq__(self, other):
-        return self.q == other.q and self.stack == other.stack
+        if not isinstance(other, PDAState):
+            return NotImplemented
+        return self._hash == other._hash and self.q == other.q and self.node == other.node
 
     def __hash__(self):
-        return hash(str(self)) # TODO: improve the efficiency
+        return self._hash
 
     def __lt__(self, other):
-        return str(self) < str(other)  # TODO: improve the efficiency
+        return (self.q, self.stack) < (other.q, other.stack)
 
 
 def pda_can_pop_push(P: PDA, stack: List[Symbol], u: Symbol, v: Symbol) -> bool:
@@ -239,10 +354,60 @@ def pda_pop_push(P: PDA, stack: List[Symbol], u: Symbol, v: Symbol) -> List[Symb
             return stack[:-1] + [v]
 
 
-def pda_epsilon_closure(P: PDA, R: Iterable[PDAState]) -> Set[PDAState]:
+def pda_pop_push_stack(P: PDA, stack: PDAStack, u: Symbol, v: Symbol) -> Optional[PDAStack]:
+    """Pops u from and then pushes v on a persistent stack. Returns None if u cannot be popped."""
+    epsilon = P.epsilon
+    if u != epsilon:
+        if stack.rest is None or stack.top != u:
+            return None
+        stack = stack.rest
+    if v != epsilon:
+        stack = PDAStack(v, stack)
+    return stack
+
+
+class PDATransitionIndex(object):
+    """An index of the transitions of a PDA, keyed by (p, a) and by (p, a, u), with u the symbol that is popped.
+       It is built once per simulation, such that each step only inspects the applicable transitions."""
+
+    def __init__(self, P: PDA):
+        self.epsilon = P.epsilon
+        self.by_input: DefaultDict[Tuple[State, Symbol], List[Tuple[Symbol, State, Symbol]]] = defaultdict(list)
+        self.by_top: DefaultDict[Tuple[State, Symbol, Symbol], List[Tuple[State, Symbol]]] = defaultdict(list)
+        for (p, a, u), Q1 in P.delta.items():
+            for (q, v) in Q1:
+                self.by_input[p, a].append((u, q, v))
+                self.by_top[p, a, u].append((q, v))
+
+    def transitions(self, r: PDAState, a: Symbol) -> List[Tuple[Symbol, State, Symbol]]:
+        """Returns the a-transitions (u, q, v) that are enabled in the configuration r"""
+        epsilon = self.epsilon
+        result = [(epsilon, q, v) for (q, v) in self.by_top.get((r.q, a, epsilon), [])]
+        stack = r.node
+        if stack.rest is not None:
+            result.extend((stack.top, q, v) for (q, v) in self.by_top.get((r.q, a, stack.top), []))
+        return result
+
+    def successors(self, r: PDAState, a: Symbol) -> List[PDAState]:
+        """Returns the configurations that can be reached from r via an a-transition"""
+        epsilon = self.epsilon
+        by_top = self.by_top
+        stack = r.node
+        result = []
+        for (q, v) in by_top.get((r.q, a, epsilon), []):
+            result.append(PDAState(q, stack if v == epsilon else PDAStack(v, stack)))
+        if stack.rest is not None:
+            rest = stack.rest
+            for (q, v) in by_top.get((r.q, a, stack.top), []):
+                result.append(PDAState(q, rest if v == epsilon else PDAStack(v, rest)))
+        return result
+
+
+def pda_epsilon_closure(P: PDA, R: Iterable[PDAState], index: Optional[PDATransitionIndex] = None) -> Set[PDAState]:
     """Returns all states reachable from an element in R via epsilon steps."""
-    delta = P.delta
     epsilon = P.epsilon
+    if index is None:
+        index = PDATransitionIndex(P)
 
     result: Set[PDAState] = set([r for r in R])
     todo: Set[PDAState] = set([r for r in R])
@@ -251,48 +416,42 @@ def pda_epsilon_closure(P: PDA, R: Iterable[PDAState]) -> Set[PDAState]:
     # reason we limit the number of iterations of the loop.
     max_iterations = GambaTools.pda_epsilon_closure_max_iterations
     iteration = 0
+    budget = current_budget()
+    interval = budget.check_interval if budget is not None else 0
 
     while len(todo) > 0 and iteration < max_iterations:
         iteration += 1
         src = todo.pop()
-        for (p, a, u), Q1 in delta.items():
-            if p != src.q or a != epsilon:
-                continue
-            for (q, v) in Q1:
-                if pda_can_pop_push(P, src.stack, u, v):
-                    stack1 = pda_pop_push(P, src.stack, u, v)
-                    target = PDAState(q, stack1)
-                    if target not in result:
-                        todo.add(target)
-                        result.add(target)
+        for target in index.successors(src, epsilon):
+            if target not in result:
+                todo.add(target)
+                result.add(target)
+        if interval and iteration % interval == 0:
+            budget.step(interval)
+            budget.check_states(len(result))
+
+    if budget is not None:
+        budget.step(iteration % interval)
+        budget.check_states(len(result))
     return result
 
 
-def pda_do_transition(P: PDA, a: Symbol, R: Iterable[PDAState]) -> Set[PDAState]:
+def pda_do_transition(P: PDA, a: Symbol, R: Iterable[PDAState], index: Optional[PDATransitionIndex] = None) -> Set[PDAState]:
     """Returns all PDA states reachable from an element in R via an a-transition."""
-    delta = P.delta
+    if index is None:
+        index = PDATransitionIndex(P)
 
     result: Set[PDAState] = set([])
     for r in R:
-        p, stack = r.q, r.stack
-        for (p1, a1, u), Q1 in delta.items():
-            if p != p1 or a != a1:
-                continue
-            for (q, v) in Q1:
-                if pda_can_pop_push(P, stack, u, v):
-                    stack1 = pda_pop_push(P, stack, u, v)
-                    r1 = PDAState(q, stack1)
-                    # print('transition {}{} {},{}->{}'.format(p1, q, a1, u, v))
-                    # print('p = {}'.format(p))
-                    # print('r1 = {}'.format(r1))
-                    result.add(r1)
+        result.update(index.successors(r, a))
     return result
 
 
-def pda_find_epsilon_path(P: PDA, R: Set[PDAState], f: PDAState) -> Optional[List[PDAState]]:
+def pda_find_epsilon_path(P: PDA, R: Set[PDAState], f: PDAState, index: Optional[PDATransitionIndex] = None) -> Optional[List[PDAState]]:
     """Returns a path from an element r in R to f"""
-    delta = P.delta
     epsilon = P.epsilon
+    if index is None:
+        index = PDATransitionIndex(P)
 
     if f in R:
         return [f]
@@ -310,83 +469,185 @@ def pda_find_epsilon_path(P: PDA, R: Set[PDAState], f: PDAState) -> Optional[Lis
     todo: Set[PDAState] = set([r for r in R])
     while len(todo) > 0:
         src = todo.pop()
-        for (p, a, u), Q1 in delta.items():
-            if p != src.q or a != epsilon:
-                continue
-            for (q, v) in Q1:
-                if pda_can_pop_push(P, src.stack, u, v):
-                    stack1 = pda_pop_push(P, src.stack, u, v)
-                    target = PDAState(q, stack1)
-                    backpointers[target] = src
-                    if target == f:
-                        return make_path(target)
-                    if target not in visited:
-                        todo.add(target)
-                        visited.add(target)
+        for target in index.successors(src, epsilon):
+            backpointers[target] = src
+            if target == f:
+                return make_path(target)
+            if target not in visited:
+                todo.add(target)
+                visited.add(target)
     return None
 
 
-def pda_find_transition(P: PDA, R: Set[PDAState], a: Symbol, target: PDAState) -> Optional[PDAState]:
+def pda_find_transition(P: PDA, R: Set[PDAState], a: Symbol, target: PDAState, index: Optional[PDATransitionIndex] = None) -> Optional[PDAState]:
     """Returns src such that src --a--> target"""
-    delta = P.delta
+    if index is None:
+        index = PDATransitionIndex(P)
     for src in R:
-        for (p, a1, u), Q1 in delta.items():
-            if src.q != p or a != a1:
-                continue
-            for (q, v) in Q1:
-                if q == target.q and pda_can_pop_push(P, src.stack, u, v) and pda_pop_push(P, src.stack, u, v) == target.stack:
-                    return src
+        if not any(q == target.q for (_, q, _) in index.by_input.get((src.q, a), [])):
+            continue
+        if target in index.successors(src, a):
+            return src
     return None
 
 
-def pda_accepts_word(P: PDA, w: str) -> bool:
-    F = P.F
-    R = {PDAState(P.q0, [])}
-    R = pda_epsilon_closure(P, R)
-    for a in w:
-        R = pda_do_transition(P, Symbol(a), R)
-        R = pda_epsilon_closure(P, R)
-    return any(r.q in F for r in R)
-
-
-def pda_simulate_word(P: PDA, w: str) -> Optional[Tuple[State, str, List[Symbol]]]:
-    F = P.F
-    H = []
-
-    def make_row(r: PDAState, word: str):
-        return (r.q, word, r.stack[:])
+def pda_split_transitions(P: PDA) -> Tuple[DefaultDict, DefaultDict, DefaultDict]:
+    """Splits the transitions of P into internal moves, pushes and pops, as used by pda_accepts_word.
+       A transition that both pops and pushes a symbol is split into a pop followed by a push via an
+       intermediate state."""
+    epsilon = P.epsilon
+    internal = defaultdict(list)  # p -> [(a, q)]
+    push = defaultdict(list)      # p -> [(a, X, q)]
+    pop = defaultdict(list)       # (p, X) -> [(a, q)]
+    for (p, a, u), Q1 in P.delta.items():
+        for (q, v) in Q1:
+            if u == epsilon and v == epsilon:
+                internal[p].append((a, q))
+            elif u == epsilon:
+                push[p].append((a, v, q))
+            elif v == epsilon:
+                pop[p, u].append((a, q))
+            else:
+                m = (p, a, u, q, v)
+                pop[p, u].append((a, m))
+                push[m].append((epsilon, v, q))
+    return internal, push, pop
+
+
+def pda_accepts_word(P: PDA, w: str, moves: Optional[Tuple[DefaultDict, DefaultDict, DefaultDict]] = None) -> bool:
+    """Decides if w is accepted by P using the summarization technique for pushdown systems.
+       A summary (p, i, q, j) states that P can move from state p at position i of w to state q
+       at position j, such that the stack is the same at both ends and the stack content below
+       it is never inspected. The summaries are saturated, which takes O(|w|^3) time for a fixed
+       PDA, and then w is accepted if a final state is reachable at position |w| from the initial
+       configuration using summaries and unmatched pushes. In contrast with a search over explicit
+       configurations this also terminates with the correct answer in case of epsilon cycles.
+       The result of pda_split_transitions(P) can be passed as moves, to reuse it for many words."""
+    epsilon = P.epsilon
+    n = len(w)
+    internal, push, pop = moves if moves is not None else pda_split_transitions(P)
+
+    def step(a: Symbol, i: int) -> Optional[int]:
+        """Returns the position after reading a at position i, or None if that is not possible"""
+        if a == epsilon:
+            return i
+        if i < n and w[i] == a:
+            return i + 1
+        return None
 
-    R = {PDAState(P.q0, [])}
-    H.append(R)
-    R = pda_epsilon_closure(P, R)
-    H.append(R)
+    ends = defaultdict(set)     # (p, i) -> {(q, j) | (p, i, q, j) is a summary}
+    callers = defaultdict(set)  # (s, k) -> {(p, i, X) | a summary from (p, i) reaches (s, k) by pushing X}
+    todo = []
+
+    def add_summary(p, i, q, j):
+        if (q, j) not in ends[p, i]:
+            ends[p, i].add((q, j))
+            todo.append((p, i, q, j))
+
+    def apply_pop(p, i, X, t, l):
+        for (b, q) in pop.get((t, X), []):
+            l1 = step(b, l)
+            if l1 is not None:
+                add_summary(p, i, q, l1)
+
+    add_summary(P.q0, 0, P.q0, 0)
+    while todo:
+        p, i, t, l = todo.pop()
+        for (a, q) in internal.get(t, []):
+            l1 = step(a, l)
+            if l1 is not None:
+                add_summary(p, i, q, l1)
+        for (a, X, q) in push.get(t, []):
+            l1 = step(a, l)
+            if l1 is None:
+                continue
+            if (p, i, X) not in callers[q, l1]:
+                callers[q, l1].add((p, i, X))
+                for (t1, l2) in list(ends[q, l1]):
+                    apply_pop(p, i, X, t1, l2)
+            add_summary(q, l1, q, l1)
+        for (p0, i0, X) in list(callers[p, i]):
+            apply_pop(p0, i0, X, t, l)
+
+    # Find the configurations that are reachable from the initial configuration. Pushes that
+    # are never matched by a pop may leave symbols on the stack.
+    reached = {(P.q0, 0)}
+    frontier = [(P.q0, 0)]
+    while frontier:
+        p, i = frontier.pop()
+        for (q, j) in ends[p, i]:
+            if j == n and q in P.F:
+                return True
+            for (a, X, r) in push.get(q, []):
+                j1 = step(a, j)
+                if j1 is not None and (r, j1) not in reached:
+                    reached.add((r, j1))
+                    frontier.append((r, j1))
+    return False
+
+
+def pda_simulate_word(P: PDA, w: str) -> Optional[List[Tuple[State, str, List[Symbol]]]]:
+    """Returns an accepting run of P on w as a list of triples (state, remaining input, stack), or None if
+       no accepting run is found. For each position in w the forward pass records a predecessor of every
+       configuration that is reached, such that the run can be reconstructed without searching."""
+    epsilon = P.epsilon
+    index = PDATransitionIndex(P)
 
+    # The closure may not terminate in case of epsilon cycles. For this
+    # reason we limit the number of iterations of the loop.
+    max_iterations = GambaTools.pda_epsilon_closure_max_iterations
+    budget = current_budget()
+    interval = budget.check_interval if budget is not None else 0
+
+    # layers[i][r] = (r0, is_epsilon) means that r is reached after reading w[:i] via a transition from r0
+    layers: List[Dict[PDAState, Optional[Tuple[PDAState, bool]]]] = []
+
+    def close(R: Dict[PDAState, Optional[Tuple[PDAState, bool]]]) -> None:
+        todo = deque(R)
+        iteration = 0
+        while todo and iteration < max_iterations:
+            iteration += 1
+            r = todo.popleft()
+            for r1 in index.successors(r, epsilon):
+                if r1 not in R:
+                    R[r1] = (r, True)
+                    todo.append(r1)
+            if interval and iteration % interval == 0:
+                budget.step(interval)
+                budget.check_states(len(R))
+        if budget is not None:
+            budget.step(iteration % interval)
+            budget.check_states(len(R))
+
+    R = {PDAState(P.q0, empty_pda_stack): None}
+    close(R)
+    layers.append(R)
     for a in w:
-        R = pda_do_transition(P, Symbol(a), R)
-        H.append(R)
-        R = pda_epsilon_closure(P, R)
-        H.append(R)
-
-    if any(r.q in F for r in R):
-        S = H.pop()
-        front = next(r for r in S if r.q in F)
-        result = [make_row(front, '')]
-        word = ''
-        for a in reversed(w):
-            S = H.pop()
-            path = pda_find_epsilon_path(P, S, front)
-            result = [make_row(r, word) for r in path[:-1]] + result
-            front = path[0]
-            S = H.pop()
-            front = pda_find_transition(P, S, a, front)
-            word = a + word
-            result = [make_row(front, word)] + result
-        S = H.pop()
-        path = pda_find_epsilon_path(P, S, front)
-        result = [make_row(r, word) for r in path[:-1]] + result
-        return result
-    else:
+        R1 = {}
+        for r in R:
+            for r1 in index.successors(r, Symbol(a)):
+                if r1 not in R1:
+                    R1[r1] = (r, False)
+        close(R1)
+        layers.append(R1)
+        R = R1
+
+    f = next((r for r in R if r.q in P.F), None)
+    if f is None:
         return None
+    result = []
+    i = len(w)
+    r = f
+    while True:
+        result.append((r.q, w[i:], r.stack))
+        predecessor = layers[i][r]
+        if predecessor is None:
+            break
+        r, is_epsilon = predecessor
+        if not is_epsilon:
+            i -= 1
+    result.reverse()
+    return result
 
 
 def pda_words_up_to_n(P: PDA, n: int) -> Set[str]:
@@ -394,20 +655,25 @@ def pda_words_up_to_n(P: PDA, n: int) -> Set[str]:
     Sigma = P.Sigma
 
     result = set([])
+    index = PDATransitionIndex(P)
     W = defaultdict(lambda: set([]))
-    R = {PDAState(P.q0, [])}
-    R = pda_epsilon_closure(P, R)
+    R = {PDAState(P.q0, empty_pda_stack)}
+    R = pda_epsilon_closure(P, R, index)
     for r in R:
         W[r] = {''}
         if r.q in F:
             result.add('')
 
+    budget = current_budget()
     for i in range(n):
         W1 = defaultdict(lambda: set([]))
         for r, words in W.items():
+            if budget is not None:
+                budget.step(len(Sigma) * len(words))
+                budget.check_memory(estimated_words_size(len(result) + len(words) * len(W), i + 1))
             for a in Sigma:
-                R = pda_do_transition(P, a, {r})
-                R = pda_epsilon_closure(P, R)
+                R = pda_do_transition(P, a, {r}, index)
+                R = pda_epsilon_closure(P, R, index)
                 words_plus_a = set(word + a for word in words)
                 for r1 in R:
                     W1[r1] |= words_plus_a
@@ -12,6 +12,7 @@ from gambatools.regexp import *
 from gambatools.dfa import State, Symbol as nfaSymbol, DFA
 from gambatools.nfa import NFA
 from gambatools.identifier_generator import IdentifierGenerator
+from gambatools.budget import current_budget, estimated_words_size
 from gambatools.regexp import Regexp
 
 
@@ -152,6 +153,12 @@ def regexp_accepts_word(r: Regexp, w: str) -> bool:
 
 
 def concatenate(L1: Set[str], L2: Set[str]) -> Set[str]:
+    budget = current_budget()
+    if budget is not None:
+        # the product is charged before it is computed, since it may be very large
+        count = len(L1) * len(L2)
+        budget.step(count)
+        budget.check_memory(estimated_words_size(count, max(map(len, L1), default=0) + max(map(len, L2), default=0)))
     result = set([x + y for (x, y) in itertools.product(L1, L2)])
     # print('concatenate({}, {}) = {}'.format(L1, L2, result))
     return result
@@ -159,6 +166,9 @@ def concatenate(L1: Set[str], L2: Set[str]) -> Set[str]:
 
 def regexp_words_up_to_n(r: Regexp, n: int) -> Set[str]:
     """A naive implementation of language generation"""
+    budget = current_budget()
+    if budget is not None:
+        budget.step()
     result = None
     if isinstance(r, Zero):
         result = set([])
@@ -175,6 +185,8 @@ def regexp_words_up_to_n(r: Regexp, n: int) -> Set[str]:
             result = {''}
         else:
             result = {''} | set().union(*[concatenate(regexp_words_up_to_n(r.operand, k), regexp_words_up_to_n(r, n - k)) for k in range(1, n + 1)])
+    if budget is not None:
+        budget.check_memory(estimated_words_size(len(result), n))
     # print('regexp_words_up_to_n({}, {}) = {}'.format(x, n, print_words(result)))
     return result
 
@@ -0,0 +1,115 @@
+#  (C) Copyright Wieger Wesselink 2020. Distributed under the GPL-3.0-or-later
+#  Software License, (See accompanying file LICENSE or copy at
+#  https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import re
+from typing import List, Optional
+
+from gambatools.regexp import Regexp, Zero, One, Symbol, Iteration, Concat, Sum
+
+
+class RegexpDescentParser(object):
+    """A recursive descent parser for regular expressions, that accepts the same language as the ANTLR grammars
+       regexp_simple.g4 (simple=True) and regexp.g4 (simple=False), and produces the same abstract syntax trees.
+       In the simple grammar symbols consist of a single letter and concatenation is denoted by juxtaposition,
+       in the other grammar symbols are identifiers and concatenation is denoted by '.'.
+
+       The parser does not do any error recovery: parse returns None if the text is not a regular expression,
+       in which case the ANTLR parser can be used to obtain the error messages."""
+
+    _simple_token_regex = re.compile(r'[01*+()a-zA-Z]')
+    _token_regex = re.compile(r'[01*+().]|[a-zA-Z_][a-zA-Z_0-9]*')
+    _simple_skip_regex = re.compile(r'(?:[ \r\n]+|%[^\r\n]*)*')
+    _skip_regex = re.compile(r'[ \r\n]*')
+
+    class _SyntaxError(Exception):
+        pass
+
+    def __init__(self, simple: bool = False):
+        self.simple = simple
+        self.tokens: List[str] = []
+        self.position = 0
+
+    def tokenize(self, text: str) -> Optional[List[str]]:
+        """Returns the tokens of text, or None if text contains a character that is not recognized"""
+        token_regex, skip_regex = (self._simple_token_regex, self._simple_skip_regex) if self.simple else (self._token_regex, self._skip_regex)
+        tokens = []
+        n = len(text)
+        match = token_regex.match
+        skip = skip_regex.match
+        i = skip(text, 0).end()
+        while i < n:
+            m = match(text, i)
+            if m is None:
+                return None
+            tokens.append(m.group())
+            i = skip(text, m.end()).end()
+        return tokens
+
+    def parse(self, text: str) -> Optional[Regexp]:
+        tokens = self.tokenize(text)
+        if tokens is None:
+            return None
+        self.tokens = tokens
+        self.tokens.append('')  # end of input
+        self.position = 0
+        try:
+            result = self.parse_sum()
+        except (self._SyntaxError, RecursionError):
+            return None
+        if self.tokens[self.position] != '':
+            return None
+        return result
+
+    def parse_sum(self) -> Regexp:
+        result = self.parse_concat()
+        while self.tokens[self.position] == '+':
+            self.position += 1
+            result = Sum(result, self.parse_concat())
+        return result
+
+    def parse_concat(self) -> Regexp:
+        result = self.parse_iteration()
+        tokens = self.tokens
+        if self.simple:
+            while tokens[self.position] not in ('', '+', '*', ')'):
+                result = Concat(result, self.parse_iteration())
+        else:
+            while tokens[self.position] == '.':
+                self.position += 1
+                result = Concat(result, self.parse_iteration())
+        return result
+
+    def parse_iteration(self) -> Regexp:
+        result = self.parse_primary()
+        while self.tokens[self.position] == '*':
+            self.position += 1
+            result = Iteration(result)
+        return result
+
+    def parse_primary(self) -> Regexp:
+        token = self.tokens[self.position]
+        self.position += 1
+        if token == '0':
+            return Zero()
+        elif token == '1':
+            return One()
+        elif token == '(':
+            result = self.parse_sum()
+            if self.tokens[self.position] != ')':
+                raise self._SyntaxError()
+            self.position += 1
+            return result
+        elif token in ('', '+', '*', ')', '.'):
+            raise self._SyntaxError()
+        return Symbol(token)
+
+
+def parse_simple_regexp_descent(text: str) -> Optional[Regexp]:
+    """Parses a regular expression in the simple syntax, or returns None in case of a syntax error"""
+    return RegexpDescentParser(simple=True).parse(text)
+
+
+def parse_regexp_descent(text: str) -> Optional[Regexp]:
+    """Parses a regular expression, or returns None in case of a syntax error"""
+    return RegexpDescentParser(simple=False).parse(text)
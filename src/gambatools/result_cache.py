@@ -0,0 +1,145 @@
+#  (C) Copyright Wieger Wesselink 2020. Distributed under the GPL-3.0-or-later
+#  Software License, (See accompanying file LICENSE or copy at
+#  https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Callable, Dict, Optional, Sequence, Set, Tuple, Union
+
+from gambatools.global_settings import GambaTools
+
+# The version is part of every key, such that results computed by an older version are not used
+CACHE_FORMAT_VERSION = '1'
+
+
+class ResultCache(object):
+    """A persistent cache that maps keys to byte strings. The entries are stored in files in a directory,
+       and the least recently used entries are removed when the total size exceeds max_size bytes.
+       Entries are written atomically, so the cache can be shared by concurrent processes. The total size
+       is counted once, and then updated by put, so the directory is only scanned if it is too large.
+       Entries written by other processes are therefore noticed when eviction is triggered."""
+
+    def __init__(self, directory: str, max_size: int = 256 * 2**20):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+        self._size: Optional[int] = None  # the total size of the entries, counted on the first put
+
+    @staticmethod
+    def key(*parts: Union[str, bytes]) -> str:
+        """Returns a key for the given parts, e.g. the contents of an input file, a command and its parameters"""
+        h = hashlib.sha256(CACHE_FORMAT_VERSION.encode('utf-8'))
+        for part in parts:
+            data = part.encode('utf-8') if isinstance(part, str) else part
+            h.update(str(len(data)).encode('ascii') + b':' + data)
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)  # mark the entry as recently used
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if self._size is None:
+            self._size = self.size()
+        path = self._path(key)
+        try:
+            old_size = os.stat(path).st_size
+        except OSError:
+            old_size = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        self._size += len(data) - old_size
+        if self._size > self.max_size:
+            self.evict()
+
+    def entries(self):
+        """Returns the entries as triples (last use, size, path)"""
+        result = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.startswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                result.append((st.st_mtime, st.st_size, path))
+        return result
+
+    def size(self) -> int:
+        return sum(size for (_, size, _) in self.entries())
+
+    def evict(self) -> None:
+        """Removes the least recently used entries until the total size is at most max_size"""
+        entries = self.entries()
+        total = sum(size for (_, size, _) in entries)
+        for (_, size, path) in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+        self._size = total
+
+    def clear(self) -> None:
+        for (_, _, path) in self.entries():
+            os.remove(path)
+        self._size = 0
+
+
+# The caches returned by default_result_cache, such that the size of a directory is counted only once
+_default_caches: Dict[Tuple[str, int], ResultCache] = {}
+
+
+def default_result_cache() -> Optional[ResultCache]:
+    """Returns the cache in the directory GambaTools.cache_directory, or None if caching is disabled"""
+    if not GambaTools.cache_directory:
+        return None
+    key = (GambaTools.cache_directory, GambaTools.cache_max_size)
+    if key not in _default_caches:
+        _default_caches[key] = ResultCache(*key)
+    return _default_caches[key]
+
+
+def cached_text(parts: Sequence[Union[str, bytes]], compute: Callable[[], str], cache: Optional[ResultCache] = None) -> str:
+    """Returns compute(), and stores the result in the cache with a key derived from parts"""
+    cache = cache or default_result_cache()
+    if cache is None:
+        return compute()
+    key = cache.key(*parts)
+    data = cache.get(key)
+    if data is not None:
+        return data.decode('utf-8')
+    result = compute()
+    cache.put(key, result.encode('utf-8'))
+    return result
+
+
+def cached_words(parts: Sequence[Union[str, bytes]], compute: Callable[[], Set[str]], cache: Optional[ResultCache] = None) -> Set[str]:
+    """Returns compute(), and stores the resulting set of words in the cache with a key derived from parts"""
+    text = cached_text(parts, lambda: json.dumps(sorted(compute()), ensure_ascii=False), cache)
+    return set(json.loads(text))
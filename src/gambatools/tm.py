@@ -2,7 +2,8 @@
 #  Software License, (See accompanying file LICENSE or copy at
 #  https://www.gnu.org/licenses/gpl-3.0.txt)
 
-from typing import NewType, Set, Mapping, Tuple
+from typing import NewType, Set, Mapping, Tuple, Union
+import itertools
 
 from gambatools.dfa import State, Symbol, print_alphabet, print_state_set
 
@@ -10,6 +11,13 @@ Direction = NewType('Direction', str)
 
 
 class TM(object):
+    """A Turing machine with one or more tapes. For a single tape the transitions have the shape
+       delta[p, a] = (q, b, d). For k > 1 tapes the symbols and directions are k-tuples, i.e.
+       delta[p, (a1, ..., ak)] = (q, (b1, ..., bk), (d1, ..., dk)), and a head may also stay
+       in place (direction 'S'). The input is written on the first tape. If two_way is true,
+       the tapes are infinite in both directions, otherwise a head that moves left from the
+       first cell stays where it is."""
+
     def __init__(self,
                  Q: Set[State],
                  Sigma: Set[Symbol],
@@ -19,7 +27,9 @@ class TM(object):
                  q_accept: State,
                  q_reject: State,
                  blank: Symbol = Symbol('_'),
-                 check_validity: bool = True):
+                 check_validity: bool = True,
+                 tapes: int = 1,
+                 two_way: bool = False):
         self.Q = Q
         self.Sigma = Sigma
         self.Gamma = Gamma
@@ -28,6 +38,8 @@ class TM(object):
         self.q_accept = q_accept
         self.q_reject = q_reject
         self.blank = blank
+        self.tapes = tapes
+        self.two_way = two_way
 
         if check_validity:
             self._check_validity()
@@ -41,6 +53,8 @@ class TM(object):
         q_accept = self.q_accept
         q_reject = self.q_reject
         blank = self.blank
+        k = self.tapes
+        assert k >= 1
         assert q0 in Q
         assert q_accept in Q
         assert q_reject in Q
@@ -50,10 +64,16 @@ class TM(object):
         assert Sigma <= Gamma
         for (p, a), (q, b, d) in delta.items():
             assert p in Q
-            assert a in Gamma
             assert q in Q
-            assert b in Gamma
-            assert d in ['L', 'R']
+            if k == 1:
+                assert a in Gamma
+                assert b in Gamma
+                assert d in ['L', 'R']
+            else:
+                assert len(a) == len(b) == len(d) == k
+                assert all(a_i in Gamma for a_i in a)
+                assert all(b_i in Gamma for b_i in b)
+                assert all(d_i in ['L', 'R', 'S'] for d_i in d)
         # total, witness = self.is_total()
         # if not total:
         #     q, a = witness
@@ -67,21 +87,30 @@ class TM(object):
         q_accept = self.q_accept
         q_reject = self.q_reject
         for q in Q - {q_accept, q_reject}:
-            for a in Gamma - {blank}:
-                if (q, a) not in delta:
-                    return False, (q, a)
+            if self.tapes == 1:
+                for a in Gamma - {blank}:
+                    if (q, a) not in delta:
+                        return False, (q, a)
+            else:
+                for a in itertools.product(sorted(Gamma), repeat=self.tapes):
+                    if a != (blank,) * self.tapes and (q, a) not in delta:
+                        return False, (q, a)
         return True, None
 
     def __str__(self):
         return print_tm(self)
 
 
+def print_tm_tuple(a: Union[str, Tuple[str, ...]]) -> str:
+    return a if isinstance(a, str) else '({})'.format(','.join(a))
+
+
 def print_tm_delta(delta: Mapping[Tuple[State, Symbol], Tuple[State, Symbol, Direction]]):
     if len(delta) == 0:
         return 'delta = {:}'
     result = []
     for (p, a), (q, b, d) in delta.items():
-        result.append('delta({}, {}) = ({}, {}, {})'.format(p, a, q, b, d))
+        result.append('delta({}, {}) = ({}, {}, {})'.format(p, print_tm_tuple(a), q, print_tm_tuple(b), print_tm_tuple(d)))
     return '\n'.join(sorted(result))
 
 
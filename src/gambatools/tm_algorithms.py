@@ -2,10 +2,12 @@
 #  Software License, (See accompanying file LICENSE or copy at
 #  https://www.gnu.org/licenses/gpl-3.0.txt)
 
-from typing import List, Set, Tuple, Optional
+from typing import List, Set, Tuple, Optional, Union, Pattern
 from collections import defaultdict
 import itertools
 import io
+import re
+import time
 
 from gambatools.automaton import Automaton
 from gambatools.automaton_algorithms import default_state_label_regex, AutomatonParser, AutomatonBuilder, tm_keywords
@@ -20,7 +22,9 @@ def print_tm_state(q, tape, head):
 
 
 def tm_do_transition(T: TM, p: State, tape: List[Symbol], head: int) -> Tuple[State, int]:
-    """Does a transition of a Turing Machine, and returns the new state and tape position. The tape is modified."""
+    """Does a transition of a single tape Turing Machine, and returns the new state and tape position.
+       The tape is modified. If the tape of T is two-way infinite and the head moves to the left of
+       the first cell, a blank is inserted at the front of the tape."""
     if p in [T.q_reject, T.q_accept]:
         raise RuntimeError('tm_do_transition: can not do a transition in the accepting or rejecting state')
 
@@ -30,35 +34,362 @@ def tm_do_transition(T: TM, p: State, tape: List[Symbol], head: int) -> Tuple[St
     else:
         q, b, d = T.q_reject, a, Direction('R')
     tape[head] = b
-    head1 = max(head - 1, 0) if d == 'L' else head + 1
+    head1 = head - 1 if d == 'L' else head + 1
 
-    if head1 == len(tape):
+    if head1 < 0:
+        if T.two_way:
+            tape.insert(0, T.blank)
+        head1 = 0
+    elif head1 == len(tape):
         tape.append(T.blank)
 
     return q, head1
 
 
-def tm_accepts_word(T: TM, word: str, max_steps: int = 1000) -> Optional[bool]:
-    q0 = T.q0
-    q_accept = T.q_accept
-    q_reject = T.q_reject
-    q = q0
+def tm_do_multitape_transition(T: TM, p: State, tapes: List[List[Symbol]], heads: List[int]) -> Tuple[State, List[int]]:
+    """Does a transition of a multi-tape Turing Machine, and returns the new state and tape positions.
+       The tapes are modified."""
+    if p in [T.q_reject, T.q_accept]:
+        raise RuntimeError('tm_do_multitape_transition: can not do a transition in the accepting or rejecting state')
 
-    tape = [Symbol(w_i) for w_i in word]
-    head = 0
-    if head == len(tape):
-        tape.append(T.blank)
+    a = tuple(tape[head] for tape, head in zip(tapes, heads))
+    if (p, a) in T.delta:
+        q, b, d = T.delta[p, a]
+    else:
+        q, b, d = T.q_reject, a, (Direction('R'),) * T.tapes
+    heads1 = []
+    for tape, head, b_i, d_i in zip(tapes, heads, b, d):
+        tape[head] = b_i
+        head1 = head - 1 if d_i == 'L' else head + 1 if d_i == 'R' else head
+        if head1 < 0:
+            if T.two_way:
+                tape.insert(0, T.blank)
+            head1 = 0
+        elif head1 == len(tape):
+            tape.append(T.blank)
+        heads1.append(head1)
+    return q, heads1
+
+
+class _SymbolTranslation(dict):
+    """A translation table for str.translate, that maps characters that are not in the table to a default value"""
+
+    def __init__(self, table, default: str):
+        super().__init__(table)
+        self.default = default
+
+    def __missing__(self, key):
+        return self.default
+
+
+class CompiledTM(object):
+    """A compiled form of a Turing machine, that is used for fast simulation. States and tape symbols
+       are numbered, and the transitions are stored in a flat table indexed by state * m^k + symbols,
+       with m the number of symbols and k the number of tapes. Each entry is a tuple (next state,
+       written symbol, move), where for k > 1 tapes the written symbols and moves are k-tuples.
+       The accepting and rejecting state have index 0 and 1, and the blank has index 0. The last
+       symbol index is used for input symbols that are not in Gamma."""
+
+    def __init__(self, T: TM):
+        self.T = T
+        self.tapes = T.tapes
+        self.two_way = T.two_way
+        self.states: List[State] = [T.q_accept, T.q_reject] + sorted(T.Q - {T.q_accept, T.q_reject})
+        self.symbols: List[Symbol] = [T.blank] + sorted(T.Gamma - {T.blank})
+        self.state_index = {q: i for i, q in enumerate(self.states)}
+        self.symbol_index = {a: i for i, a in enumerate(self.symbols)}
+        self.unknown_symbol = len(self.symbols)
+        self.translation = _SymbolTranslation({ord(a): chr(i) for i, a in enumerate(self.symbols) if len(a) == 1}, chr(self.unknown_symbol))
+        m = len(self.symbols) + 1
+        k = self.tapes
+        self.m = m
+        move = {'L': -1, 'R': 1, 'S': 0}
+
+        # By default a transition moves to the rejecting state without changing the tape
+        size = len(self.states) * m ** k
+        if k == 1:
+            self.table = [(1, i % m, 1) for i in range(size)]
+            for (p, a), (q, b, d) in T.delta.items():
+                i = self.state_index[p] * m + self.symbol_index[a]
+                self.table[i] = (self.state_index[q], self.symbol_index[b], move[d])
+        else:
+            self.table = [(1, (0,) * k, (0,) * k)] * size
+            for (p, a), (q, b, d) in T.delta.items():
+                i = self.state_index[p]
+                for a_i in a:
+                    i = i * m + self.symbol_index[a_i]
+                self.table[i] = (self.state_index[q], tuple(self.symbol_index[b_i] for b_i in b), tuple(move[d_i] for d_i in d))
+
+        # runs_right[q] (runs_left[q]) is true if a single tape TM moves to the right (left) forever
+        # when it is in state q on a blank cell, and all cells to the right (left) of the head are blank
+        self.runs_right: List[bool] = [k == 1 and self._runs(q, 1) for q in range(len(self.states))]
+        self.runs_left: List[bool] = [k == 1 and self._runs(q, -1) for q in range(len(self.states))]
+
+        # the patterns that are used for macro steps, see _macro_patterns; they are computed on demand
+        self.macro: Optional[List[Optional[Pattern]]] = None
+
+    def _runs(self, q: int, direction: int) -> bool:
+        visited = set()
+        while q >= 2 and q not in visited:
+            visited.add(q)
+            q, _, d = self.table[q * self.m]
+            if d != direction:
+                return False
+        return q >= 2
+
+    @staticmethod
+    def _normalize(tape: Union[bytearray, List[int]], origin: int) -> Tuple[int, Union[bytes, List[int]]]:
+        """Returns the tape without leading and trailing blanks, together with the position of
+           the first remaining cell relative to the origin"""
+        if isinstance(tape, bytearray):
+            content = bytes(tape).rstrip(b'\x00')
+            stripped = content.lstrip(b'\x00')
+            return len(content) - len(stripped) - origin, stripped
+        n = len(tape)
+        while n > 0 and tape[n - 1] == 0:
+            n -= 1
+        first = 0
+        while first < n and tape[first] == 0:
+            first += 1
+        return first - origin, tape[first:n]
+
+    def make_tape(self, word: str) -> Union[bytearray, List[int]]:
+        if self.m <= 256:
+            return bytearray(word.translate(self.translation), 'latin-1')
+        return [self.symbol_index.get(a, self.unknown_symbol) for a in word]
+
+    def run(self, word: str, max_steps: int = 1000, detect_loops: bool = True, accelerate: bool = True) -> Tuple[Optional[bool], int]:
+        """Runs the TM on word for at most max_steps steps. Returns the result (True if the word
+           is accepted, False if it is rejected, None if the TM did not halt) and the number of steps.
+           If detect_loops is true, the run is also stopped with result False as soon as it is proven
+           that the TM does not halt. This is the case if a configuration (state, heads, tapes) is repeated,
+           or if a single tape TM moves away forever over blank cells. Repeated configurations are
+           detected by comparing with snapshots that are taken after roughly 1, 2, 4, 8, ... steps.
+           If accelerate is true, a single tape TM that stays in the same state while moving over a
+           block of equal symbols, or over a block of symbols that it does not change, traverses the
+           block in one iteration (a macro step). The result and the number of steps of a halting run
+           are the same as without acceleration."""
+        q = self.state_index[self.T.q0]
+        if q < 2:
+            return q == 0, 0
+        if self.tapes == 1:
+            return self._run_single_tape(q, word, max_steps, detect_loops, accelerate)
+        return self._run_multi_tape(q, word, max_steps, detect_loops)
+
+    def _macro_patterns(self) -> List[Optional[Pattern]]:
+        """Returns for each table entry a pattern that matches the blocks of cells that can be traversed in a
+           macro step, or None if the entry is not a transition from a state to itself. For an entry that does
+           not change the tape, the pattern matches all symbols with such a transition in the same direction."""
+        m = self.m
+        result = [None] * len(self.table)
+        for i, (q, b, d) in enumerate(self.table):
+            p, a = divmod(i, m)
+            if p < 2 or q != p:
+                continue
+            if a != b:
+                symbols = [a]
+            else:
+                symbols = [a1 for a1 in range(m) if self.table[p * m + a1] == (p, a1, d)]
+            result[i] = re.compile('[{}]*'.format(''.join('\\x{:02x}'.format(a1) for a1 in symbols)).encode())
+        return result
 
-    for _ in range(max_steps):
-        q, head = tm_do_transition(T, q, tape, head)
-        if q == q_accept:
-            return True
-        if q == q_reject:
-            return False
-    return None
+    @staticmethod
+    def _run_length(tape: bytearray, head: int, d: int, pattern: Pattern, limit: int) -> int:
+        """Returns the number of consecutive cells starting at head in direction d that are matched
+           by pattern, with a maximum of limit"""
+        size = min(limit, len(tape) - head if d == 1 else head + 1)
+
+        def matches(i: int, j: int) -> bool:
+            """Returns true if the cells at distance i, ..., j - 1 from head are matched by pattern"""
+            return (pattern.fullmatch(tape, head + i, head + j) if d == 1 else pattern.fullmatch(tape, head - j + 1, head - i + 1)) is not None
+
+        # exponential search followed by a binary search, with invariant matches(0, lo)
+        lo, hi = 1, 2
+        while hi < size and matches(lo, hi):
+            lo, hi = hi, 2 * hi
+        if hi >= size:
+            if matches(lo, size):
+                return size
+            hi = size
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if matches(lo, mid):
+                lo = mid
+            else:
+                hi = mid
+        return lo
+
+    def _run_single_tape(self, q: int, word: str, max_steps: int, detect_loops: bool, accelerate: bool) -> Tuple[Optional[bool], int]:
+        table = self.table
+        m = self.m
+        two_way = self.two_way
+        normalize = self._normalize
+        run_length = self._run_length
+        runs_right = self.runs_right if detect_loops else [False] * len(self.states)
+        runs_left = self.runs_left if detect_loops else [False] * len(self.states)
+
+        tape = self.make_tape(word)
+        tape.extend([0] * max(len(tape), 16))
+        size = len(tape)
+        head = 0
+        origin = 0  # the index of the first input cell
+
+        # macro[i] is the pattern of the blocks of cells that can be traversed in a macro step using table[i]
+        if accelerate and isinstance(tape, bytearray):
+            if self.macro is None:
+                self.macro = self._macro_patterns()
+            macro = self.macro
+        else:
+            macro = [None] * len(table)
+
+        # the snapshot of the configuration
+        snapshot_step = 1 if detect_loops else max_steps + 1
+        snapshot_q = -1
+        snapshot_head = -1
+        snapshot_tape = None
+
+        steps = 0
+        while True:
+            for steps in range(steps + 1, max_steps + 1):
+                i = q * m + tape[head]
+                if macro[i]:
+                    break
+                q, tape[head], d = table[i]
+                head += d
+                if q < 2:
+                    return q == 0, steps
+                if head < 0:
+                    if not two_way:
+                        head = 0
+                    elif runs_left[q]:
+                        return False, steps
+                    else:
+                        tape[0:0] = [0] * size
+                        head += size
+                        origin += size
+                        snapshot_head += size
+                        size = len(tape)
+                elif head == size:
+                    if runs_right[q]:
+                        return False, steps
+                    tape.extend([0] * size)
+                    size = len(tape)
+                if q == snapshot_q and head == snapshot_head and normalize(tape, origin) == snapshot_tape:
+                    return False, steps
+                if steps >= snapshot_step:
+                    snapshot_q, snapshot_head, snapshot_tape = q, head, normalize(tape, origin)
+                    snapshot_step = 2 * steps
+            else:
+                return None, max(max_steps, 0)
+
+            # a macro step, in which the TM stays in state q while it moves over a block of n cells
+            _, b, d = table[i]
+            n = run_length(tape, head, d, macro[i], max_steps - steps + 1)
+            if d == 1:
+                if tape[head] != b:
+                    tape[head:head + n] = bytes((b,)) * n
+                head += n
+            else:
+                if tape[head] != b:
+                    tape[head - n + 1:head + 1] = bytes((b,)) * n
+                head -= n
+            steps += n - 1
+            if head < 0:
+                if not two_way:
+                    head = 0
+                    if q * m + tape[0] == i:  # the TM is stuck in the first cell
+                        return (False, steps) if detect_loops else (None, max(max_steps, 0))
+                elif runs_left[q]:
+                    return False, steps
+                else:
+                    tape[0:0] = [0] * size
+                    head += size
+                    origin += size
+                    snapshot_head += size
+                    size = len(tape)
+            elif head == size:
+                if runs_right[q]:
+                    return False, steps
+                tape.extend([0] * size)
+                size = len(tape)
+            if q == snapshot_q and head == snapshot_head and normalize(tape, origin) == snapshot_tape:
+                return False, steps
+            if steps >= snapshot_step:
+                snapshot_q, snapshot_head, snapshot_tape = q, head, normalize(tape, origin)
+                snapshot_step = 2 * steps
+
+    def _run_multi_tape(self, q: int, word: str, max_steps: int, detect_loops: bool) -> Tuple[Optional[bool], int]:
+        table = self.table
+        m = self.m
+        k = self.tapes
+        two_way = self.two_way
+        normalize = self._normalize
+        tape_indices = range(k)
+
+        tapes = [self.make_tape(word)] + [self.make_tape('') for _ in range(k - 1)]
+        for tape in tapes:
+            tape.extend([0] * max(len(tape), 16))
+        sizes = [len(tape) for tape in tapes]
+        heads = [0] * k
+        origins = [0] * k
+
+        # the snapshot of the configuration
+        snapshot_step = 1 if detect_loops else 0
+        snapshot_q = -1
+        snapshot_heads = None
+        snapshot_tapes = None
+
+        for steps in range(1, max_steps + 1):
+            i = q
+            for t in tape_indices:
+                i = i * m + tapes[t][heads[t]]
+            q, b, d = table[i]
+            if q < 2:
+                return q == 0, steps
+            for t in tape_indices:
+                tape = tapes[t]
+                head = heads[t]
+                tape[head] = b[t]
+                head += d[t]
+                if head < 0:
+                    if two_way:
+                        size = sizes[t]
+                        tape[0:0] = [0] * size
+                        head += size
+                        origins[t] += size
+                        sizes[t] = len(tape)
+                        if snapshot_heads is not None:
+                            snapshot_heads[t] += size
+                    else:
+                        head = 0
+                elif head == sizes[t]:
+                    tape.extend([0] * sizes[t])
+                    sizes[t] = len(tape)
+                heads[t] = head
+            if q == snapshot_q and heads == snapshot_heads and [normalize(tapes[t], origins[t]) for t in tape_indices] == snapshot_tapes:
+                return False, steps
+            if steps == snapshot_step:
+                snapshot_q, snapshot_heads = q, heads[:]
+                snapshot_tapes = [normalize(tapes[t], origins[t]) for t in tape_indices]
+                snapshot_step *= 2
+        return None, max(max_steps, 0)
+
+
+def tm_compile(T: TM) -> CompiledTM:
+    return CompiledTM(T)
+
+
+def tm_accepts_word(T: TM, word: str, max_steps: int = 1000) -> Optional[bool]:
+    """Returns True if T accepts word, and False if T rejects word or if it is detected that T
+       does not halt on word. If T does not halt within max_steps steps None is returned."""
+    result, _ = tm_compile(T).run(word, max_steps)
+    return result
 
 
 def tm_simulate_word(T: TM, word: str, max_steps: int = 1000) -> List[Tuple[State, List[str], int]]:
+    """Simulates T on word, and returns the list of configurations (state, tape, head). For a
+       multi-tape TM the configurations are (state, tapes, heads), with a list of tapes and a list
+       of head positions."""
     q0 = T.q0
     q_accept = T.q_accept
     q_reject = T.q_reject
@@ -66,6 +397,19 @@ def tm_simulate_word(T: TM, word: str, max_steps: int = 1000) -> List[Tuple[Stat
 
     result = []
 
+    if T.tapes > 1:
+        tapes = [[Symbol(w_i) for w_i in word] or [T.blank]] + [[T.blank] for _ in range(T.tapes - 1)]
+        heads = [0] * T.tapes
+        result.append((q, [tape[:] for tape in tapes], heads))
+        for _ in range(max_steps):
+            q, heads = tm_do_multitape_transition(T, q, tapes, heads)
+            result.append((q, [tape[:] for tape in tapes], heads))
+            if q == q_accept:
+                break
+            if q == q_reject:
+                break
+        return result
+
     tape = [Symbol(w_i) for w_i in word]
     head = 0
     if head == len(tape):
@@ -82,17 +426,58 @@ def tm_simulate_word(T: TM, word: str, max_steps: int = 1000) -> List[Tuple[Stat
     return result
 
 
-def tm_words_up_to_n(T: TM, n: int, max_steps: int = 1000) -> Set[str]:
-    Sigma = T.Sigma
-    result = set([])
-    for i in range(n + 1):
-        for w in itertools.product(Sigma, repeat = i):
-            word = ''.join(w)
-            if tm_accepts_word(T, word, max_steps):
-                result.add(word)
+# The compiled TM that is used by the worker processes of tm_run_words
+_worker_tm: Optional[CompiledTM] = None
+
+
+def _tm_init_worker(T: TM) -> None:
+    global _worker_tm
+    _worker_tm = tm_compile(T)
+
+
+def _tm_run_chunk(words: List[str], max_steps: int, deadline: Optional[float], C: Optional[CompiledTM] = None) -> List[Optional[bool]]:
+    C = C or _worker_tm
+    result = []
+    for word in words:
+        if deadline is not None and time.monotonic() > deadline:
+            raise RuntimeError('the time budget for running the Turing machine was exceeded')
+        result.append(C.run(word, max_steps)[0])
     return result
 
 
+def tm_run_words(T: TM, words: List[str], max_steps: int = 1000, processes: int = 1, time_budget: Optional[float] = None, chunk_size: int = 256) -> List[Optional[bool]]:
+    """Runs T on each of the words, and returns the results in the same order as the words.
+       If processes > 1, the words are split into chunks that are evaluated by a pool of processes.
+       If time_budget is set and the words are not all evaluated within time_budget seconds, a
+       RuntimeError is raised."""
+    # a monotonic clock is not affected by adjustments of the wall clock, and is shared by the worker processes
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+    if processes <= 1 or len(words) <= chunk_size:
+        return _tm_run_chunk(words, max_steps, deadline, tm_compile(T))
+
+    import multiprocessing  # imported here, since it is slow to import and only needed for parallel runs
+    chunks = [words[i:i + chunk_size] for i in range(0, len(words), chunk_size)]
+    pool = multiprocessing.Pool(processes, initializer=_tm_init_worker, initargs=(T,))
+    try:
+        results = pool.starmap_async(_tm_run_chunk, [(chunk, max_steps, deadline) for chunk in chunks])
+        chunk_results = results.get(timeout=max(deadline - time.monotonic(), 0) if deadline is not None else None)
+    except multiprocessing.TimeoutError:
+        raise RuntimeError('the time budget for running the Turing machine was exceeded')
+    finally:
+        pool.terminate()
+        pool.join()
+    return list(itertools.chain.from_iterable(chunk_results))
+
+
+def tm_words_up_to_n(T: TM, n: int, max_steps: int = 1000, processes: int = 1, time_budget: Optional[float] = None) -> Set[str]:
+    """Returns the words of length at most n that are accepted by T. The words can be evaluated in
+       parallel by setting processes > 1, see tm_run_words."""
+    Sigma = sorted(T.Sigma)
+    words = [''.join(w) for i in range(n + 1) for w in itertools.product(Sigma, repeat=i)]
+    results = tm_run_words(T, words, max_steps, processes, time_budget)
+    return set(word for word, accepted in zip(words, results) if accepted)
+
+
 def print_tm(P: TM) -> str:
     Q = P.Q
     Sigma = P.Sigma
@@ -111,9 +496,13 @@ def print_tm(P: TM) -> str:
     out.write('input_symbols {}\n'.format(' '.join(sorted(Sigma))))
     out.write('tape_symbols {}\n'.format(' '.join(sorted(Gamma))))
     out.write('blank {}\n'.format(blank))
+    if P.tapes > 1:
+        out.write('tapes {}\n'.format(P.tapes))
+    if P.two_way:
+        out.write('tape_mode two_way\n')
     transitions = defaultdict(lambda: [])
     for (p, a), (q, b, d) in delta.items():
-        transitions['{} {}'.format(p, q)].append('{}{},{}'.format(a, b, d))
+        transitions['{} {}'.format(p, q)].append('{}{},{}'.format(''.join(a), ''.join(b), ''.join(d)))
     for pq in sorted(transitions.keys()):
         out.write('{} {}\n'.format(pq, ' '.join(transitions[pq])))
     result = out.getvalue()
@@ -121,30 +510,56 @@ def print_tm(P: TM) -> str:
     return result
 
 
-def tm_transition_transition_regex() -> str:
+def tm_transition_transition_regex(tapes: int = 1) -> str:
+    """Returns the regular expression of a transition label of a TM with the given number of tapes.
+       For a single tape the label consists of the symbols a and b and a direction d, as in ab,R. For
+       k tapes it consists of k read symbols, k written symbols and k directions, as in ab_b,RS."""
     s = r'[\w\d~!@#$%^&*□]'
-    return r'{0}{0},[LR]'.format(s)
+    if tapes == 1:
+        return r'{0}{0},[LR]'.format(s)
+    return r'{0}{{{1}}},[LRS]{{{2}}}'.format(s, 2 * tapes, tapes)
 
 
-def automaton_to_tm(A: Automaton, transition_regex = tm_transition_transition_regex(), state_regex = default_state_label_regex()) -> TM:
+def tm_any_transition_regex() -> str:
+    """Returns the regular expression of a transition label of a TM with any number of tapes"""
+    s = r'[\w\d~!@#$%^&*□]'
+    return r'{0}{0}+,[LRS]+'.format(s)
+
+
+def automaton_to_tm(A: Automaton, transition_regex: Optional[str] = None, state_regex = default_state_label_regex()) -> TM:
     return TMBuilder(A, state_regex=state_regex, transition_regex=transition_regex).build()
 
 
-def parse_tm(text: str, transition_regex = tm_transition_transition_regex(), state_regex = default_state_label_regex()) -> TM:
-    A = AutomatonParser(state_regex=state_regex, transition_regex=transition_regex, keywords = tm_keywords()).parse(text)
+def parse_tm(text: str, transition_regex: Optional[str] = None, state_regex = default_state_label_regex()) -> TM:
+    """Parses a TM. If transition_regex is None, the transition labels are checked against
+       tm_transition_transition_regex(k), where k is the number of tapes that is specified with
+       the keyword tapes."""
+    parser_transition_regex = transition_regex if transition_regex else tm_any_transition_regex()
+    A = AutomatonParser(state_regex=state_regex, transition_regex=parser_transition_regex, keywords = tm_keywords()).parse(text)
     return automaton_to_tm(A, state_regex=state_regex, transition_regex=transition_regex)
 
 
 class TMBuilder(AutomatonBuilder):
-    def __init__(self, A: Automaton, state_regex=r'\w+', transition_regex=r'\w+'):
+    def __init__(self, A: Automaton, state_regex=r'\w+', transition_regex: Optional[str] = None):
         super().__init__(A, state_regex, transition_regex)
 
-    def used_tape_symbols(self) -> Set[str]:
+    def get_tapes(self) -> int:
+        tapes = self.get_symbol('tapes', '1')
+        if not re.fullmatch(r'[1-9]\d*', tapes):
+            raise RuntimeError('invalid number of tapes {}'.format(tapes))
+        return int(tapes)
+
+    def get_two_way(self) -> bool:
+        tape_mode = self.get_symbol('tape_mode', 'one_way')
+        if tape_mode not in ['one_way', 'two_way']:
+            raise RuntimeError('invalid tape mode {}, expected one_way or two_way'.format(tape_mode))
+        return tape_mode == 'two_way'
+
+    def used_tape_symbols(self, tapes: int = 1) -> Set[str]:
         A = self.A
         result = set([])
         for (_, label, _) in A.transitions:
-            result.add(label[0])
-            result.add(label[1])
+            result.update(label[:2 * tapes])
         return result
 
     def build(self) -> TM:
@@ -156,8 +571,14 @@ class TMBuilder(AutomatonBuilder):
         self._check_states_are_declared()
         self._check_state_labels()
         self._check_one_initial_state()
+        tapes = self.get_tapes()
+        two_way = self.get_two_way()
+        if self.transition_regex is None:
+            self.transition_regex = tm_transition_transition_regex(tapes)
+        for (_, label, _) in A.transitions:
+            self._check_transition_label(label)
         blank = self.parse_symbol('blank', '□', '_')
-        tape_symbols = self.get_symbol_set('tape_symbols', self.used_tape_symbols())
+        tape_symbols = self.get_symbol_set('tape_symbols', self.used_tape_symbols(tapes))
         input_symbols = self.get_symbol_set('input_symbols')
         if not input_symbols:
             input_symbols = tape_symbols - {blank}
@@ -175,9 +596,12 @@ class TMBuilder(AutomatonBuilder):
         for (p, label, q) in A.transitions:
             p = State(p)
             q = State(q)
-            a, b, _, d = label
-            a = Symbol(a)
-            b = Symbol(b)
-            d = Direction(d)
-            delta[p, a] = (q, b, d)
-        return TM(Q, Sigma, Gamma, delta, q0, q_accept, q_reject, blank)
+            if tapes == 1:
+                a, b, _, d = label
+                delta[p, Symbol(a)] = (q, Symbol(b), Direction(d))
+            else:
+                a = tuple(Symbol(a_i) for a_i in label[:tapes])
+                b = tuple(Symbol(b_i) for b_i in label[tapes:2 * tapes])
+                d = tuple(Direction(d_i) for d_i in label[2 * tapes + 1:])
+                delta[p, a] = (q, b, d)
+        return TM(Q, Sigma, Gamma, delta, q0, q_accept, q_reject, blank, tapes=tapes, two_way=two_way)
@@ -0,0 +1,55 @@
+#  (C) Copyright Wieger Wesselink 2020. Distributed under the GPL-3.0-or-later
+#  Software License, (See accompanying file LICENSE or copy at
+#  https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from unittest import TestCase
+
+from gambatools.acceptor import Acceptor
+from gambatools.cfg_algorithms import parse_simple_cfg, cfg_accepts_word
+from gambatools.dfa_algorithms import parse_dfa, dfa_accepts_word
+from gambatools.language_algorithms import words_up_to_n
+from gambatools.nfa_algorithms import parse_nfa, nfa_accepts_word
+from gambatools.pda_algorithms import parse_pda, pda_accepts_word
+from gambatools.regexp import Symbol, Concat, Iteration
+from gambatools.regexp_algorithms import regexp_accepts_word
+from gambatools.regexp_simple_parser import parse_simple_regexp
+from gambatools.text_utility import read_utf8_text
+from gambatools.tm_algorithms import parse_tm, tm_accepts_word
+
+
+class Test(TestCase):
+    def _check_acceptor(self, A, accepts_word, words):
+        acceptor = Acceptor(A)
+        for word in words:
+            self.assertEqual(acceptor.accepts(word), bool(accepts_word(A, word)), word)
+
+    def test_acceptor(self):
+        D = parse_dfa(read_utf8_text('examples/dfa1.dfa'))
+        self._check_acceptor(D, dfa_accepts_word, words_up_to_n(D.Sigma, 6))
+        self.assertFalse(Acceptor(D).accepts('0a1'))
+
+        N = parse_nfa(read_utf8_text('examples/nfa1.nfa'))
+        self._check_acceptor(N, nfa_accepts_word, words_up_to_n(N.Sigma, 7))
+
+        P = parse_pda(read_utf8_text('examples/pda1.pda'))
+        self._check_acceptor(P, pda_accepts_word, words_up_to_n(P.Sigma, 5))
+
+        T = parse_tm(read_utf8_text('examples/tm1.tm'))
+        self._check_acceptor(T, tm_accepts_word, words_up_to_n(T.Sigma, 5))
+
+        G = parse_simple_cfg(read_utf8_text('examples/cfg1.cfg'))
+        self._check_acceptor(G, cfg_accepts_word, words_up_to_n(G.Sigma, 5))
+
+        r = parse_simple_regexp(read_utf8_text('examples/regexp1.regexp'))
+        self._check_acceptor(r, regexp_accepts_word, words_up_to_n({'a', 'b'}, 6))
+
+        # symbols with more than one character are not converted to an NFA
+        r = Concat(Symbol('ab'), Iteration(Symbol('c')))
+        self._check_acceptor(r, regexp_accepts_word, ['', 'ab', 'abc', 'abcc', 'a', 'abab'])
+
+    def test_first_failure(self):
+        G = parse_simple_cfg('S -> aSb | ε')
+        acceptor = Acceptor(G)
+        self.assertIsNone(acceptor.first_failure(['', 'ab', 'aabb', 'ab'], ['a', 'ba']))
+        self.assertEqual(acceptor.first_failure(['aabb', 'abab', 'aab'], ['ba', 'ab']), ('ab', False))
+        self.assertEqual(acceptor.first_failure(['aaabbb', 'abab', 'aab'], []), ('aab', True))
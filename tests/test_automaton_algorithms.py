@@ -5,7 +5,9 @@
 from unittest import TestCase
 
 from gambatools.automaton import Automaton
-from gambatools.automaton_algorithms import parse_automaton
+from gambatools.automaton_algorithms import parse_automaton, AutomatonParser
+from gambatools.dfa_algorithms import parse_dfa, automaton_to_dfa
+from gambatools.tm_algorithms import parse_tm
 
 
 class Test(TestCase):
@@ -20,6 +22,49 @@ class Test(TestCase):
         '''
         A: Automaton = parse_automaton(grammar)
 
+    def test_automaton_parser(self):
+        text = '''
+            % a comment line
+            initial q0
+            final q1
+            input_symbols a b
+            q0 q0 a
+            q0 q1 b
+            q1 q0 a
+            q1 q1 b
+            q0 q0 a
+        '''
+        A = AutomatonParser().parse(text)
+        self.assertEqual(A.transitions, [('q0', 'a', 'q0'), ('q0', 'b', 'q1'), ('q1', 'a', 'q0'), ('q1', 'b', 'q1'), ('q0', 'a', 'q0')])
+        self.assertEqual(A.items['input_symbols'], ['a', 'b'])
+        self.assertEqual(A.initial_states, {'q0'})
+
+        # every label is checked, also after the same line was accepted before
+        with self.assertRaisesRegex(RuntimeError, 'invalid state label q-1'):
+            AutomatonParser().parse('q0 q0 a\nq0 q-1 a')
+        with self.assertRaisesRegex(RuntimeError, 'invalid transition label a-b'):
+            AutomatonParser(transition_regex=r'\w+').parse('q0 q0 a\nq0 q0 a-b')
+        with self.assertRaisesRegex(RuntimeError, 'incomplete transition'):
+            AutomatonParser().parse('q0 q1')
+
+        # automata that were not produced by the parser are still checked by the builder
+        A = AutomatonParser().parse(text)
+        A.states = {'q0', 'q1', 'q-1'}
+        A.state_regex = None
+        with self.assertRaisesRegex(RuntimeError, 'invalid state label q-1'):
+            automaton_to_dfa(A)
+        D = parse_dfa('initial q0\nfinal q1\nq0 q0 a\nq0 q1 b\nq1 q0 a\nq1 q1 b')
+        self.assertEqual(len(D.delta), 4)
+
+        # states that are added by a builder are checked too
+        with self.assertRaisesRegex(RuntimeError, 'invalid state label q.x'):
+            parse_tm('initial q0\naccept q.x\nq0 q0 aa,R')
+
+        # a keyword remains a keyword if a state with the same name exists
+        A = AutomatonParser().parse('initial q0\nq0 final a\nfinal q0 a\n')
+        self.assertEqual(A.final_states, {'q0', 'a'})
+        self.assertEqual(A.transitions, [('q0', 'a', 'final')])
+
 
 if __name__ == '__main__':
     import unittest
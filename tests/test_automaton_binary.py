@@ -0,0 +1,90 @@
+#  (C) Copyright Wieger Wesselink 2020. Distributed under the GPL-3.0-or-later
+#  Software License, (See accompanying file LICENSE or copy at
+#  https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import os
+import tempfile
+from unittest import TestCase
+
+from gambatools.automaton_binary import automaton_to_bytes, automaton_from_bytes, save_automaton_binary, load_automaton_binary
+from gambatools.dfa import Symbol, DFA
+from gambatools.dfa_algorithms import dfa_words_up_to_n
+from gambatools.nfa import NFA
+from gambatools.nfa_algorithms import random_nfa, nfa_to_dfa
+from gambatools.pda import PDA
+from gambatools.pda_algorithms import parse_pda
+from gambatools.tm import TM
+from gambatools.tm_algorithms import parse_tm, tm_words_up_to_n
+
+
+class Test(TestCase):
+    def test_dfa_nfa_binary(self):
+        for i in range(20):
+            N = random_nfa({Symbol('a'), Symbol('b')}, 5)
+            N1 = automaton_from_bytes(automaton_to_bytes(N))
+            self.assertIsInstance(N1, NFA)
+            self.assertEqual((N1.Q, N1.Sigma, N1.q0, N1.F, N1.epsilon), (N.Q, N.Sigma, N.q0, N.F, N.epsilon))
+            self.assertEqual({key: Q1 for key, Q1 in N1.delta.items() if Q1}, {key: Q1 for key, Q1 in N.delta.items() if Q1})
+
+            D = nfa_to_dfa(N)
+            D1 = automaton_from_bytes(automaton_to_bytes(D))
+            self.assertIsInstance(D1, DFA)
+            self.assertEqual((D1.Q, D1.Sigma, D1.delta, D1.q0, D1.F), (D.Q, D.Sigma, D.delta, D.q0, D.F))
+            self.assertEqual(dfa_words_up_to_n(D1, 4), dfa_words_up_to_n(D, 4))
+
+        # the encoding does not depend on the order of the sets
+        self.assertEqual(automaton_to_bytes(D), automaton_to_bytes(D1))
+
+    def test_pda_tm_binary(self):
+        P = parse_pda('''
+            initial q1
+            final q4
+            q1 q2 _,_$
+            q2 q2 0,_0
+            q2 q3 1,0_
+            q3 q3 1,0_
+            q3 q4 _,$_
+        ''')
+        P1 = automaton_from_bytes(automaton_to_bytes(P))
+        self.assertIsInstance(P1, PDA)
+        self.assertEqual((P1.Q, P1.Sigma, P1.Gamma, P1.q0, P1.F, P1.epsilon), (P.Q, P.Sigma, P.Gamma, P.q0, P.F, P.epsilon))
+        self.assertEqual(dict(P1.delta), {key: value for key, value in P.delta.items() if value})
+
+        # labels that are not ASCII
+        P = parse_pda('initial q1\nfinal q2\nq1 q2 ε,ε$\nq2 q2 a,$$')
+        P1 = automaton_from_bytes(automaton_to_bytes(P))
+        self.assertEqual((P1.Q, P1.Sigma, P1.Gamma, P1.epsilon), (P.Q, P.Sigma, P.Gamma, P.epsilon))
+        self.assertEqual(dict(P1.delta), {key: value for key, value in P.delta.items() if value})
+
+        T = parse_tm('''
+            tapes 2
+            tape_mode two_way
+            initial q0
+            accept q_accept
+            reject q_reject
+            input_symbols a b
+            tape_symbols a b _
+            blank _
+            q0 q_accept ____,SS
+            q0 q2 a_aa,RR
+            q2 q2 a_aa,RR
+            q2 q1 b_b_,SL
+            q1 q1 bab_,RL
+            q1 q_accept ____,SS
+        ''')
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'tm.bin')
+            save_automaton_binary(T, filename)
+            T1 = load_automaton_binary(filename)
+        self.assertIsInstance(T1, TM)
+        self.assertEqual((T1.Q, T1.Sigma, T1.Gamma, T1.delta, T1.q0, T1.q_accept, T1.q_reject, T1.blank, T1.tapes, T1.two_way),
+                         (T.Q, T.Sigma, T.Gamma, T.delta, T.q0, T.q_accept, T.q_reject, T.blank, T.tapes, T.two_way))
+        self.assertEqual(tm_words_up_to_n(T1, 4), tm_words_up_to_n(T, 4))
+
+        with self.assertRaises(RuntimeError):
+            automaton_from_bytes(b'GAMX' + automaton_to_bytes(T)[4:])
+
+
+if __name__ == '__main__':
+    import unittest
+    unittest.main()
@@ -0,0 +1,117 @@
+#  (C) Copyright Wieger Wesselink 2020. Distributed under the GPL-3.0-or-later
+#  Software License, (See accompanying file LICENSE or copy at
+#  https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import threading
+from unittest import TestCase
+
+from gambatools.budget import Budget, BudgetExceeded, budget_limit, current_budget
+from gambatools.cfg_algorithms import parse_simple_cfg, cfg_words_up_to_n
+from gambatools.grading import Reference, Submission, grade_submission
+from gambatools.nfa_algorithms import parse_nfa, nfa_to_dfa
+from gambatools.global_settings import GambaTools
+from gambatools.pda_algorithms import parse_pda, pda_words_up_to_n, pda_epsilon_closure, pda_simulate_word, PDAState
+from gambatools.regexp_algorithms import regexp_words_up_to_n, concatenate
+from gambatools.regexp_simple_parser import parse_simple_regexp
+from gambatools.text_utility import read_utf8_text
+
+
+def nth_symbol_from_the_end_nfa(n: int) -> str:
+    """An NFA for the words with an a at position n from the end. Its minimal DFA has 2^n states."""
+    lines = ['initial q0', 'final q{}'.format(n), 'q0 q0 a', 'q0 q0 b', 'q0 q1 a']
+    for i in range(1, n):
+        lines.extend(['q{} q{} a'.format(i, i + 1), 'q{} q{} b'.format(i, i + 1)])
+    return '\n'.join(lines)
+
+
+class Test(TestCase):
+    def test_budget(self):
+        budget = Budget(max_steps=10, max_states=5, max_memory=100)
+        budget.step(10)
+        self.assertRaises(BudgetExceeded, budget.step)
+        budget.start()
+        budget.step(10)
+        budget.check_states(5)
+        with self.assertRaises(BudgetExceeded) as context:
+            budget.check_states(6)
+        self.assertEqual(context.exception.resource, 'states')
+        self.assertIsInstance(context.exception, RuntimeError)
+        self.assertRaises(BudgetExceeded, budget.check_memory, 101)
+
+        budget = Budget(max_time=0, check_interval=1)
+        with self.assertRaises(BudgetExceeded) as context:
+            while True:
+                budget.step()
+        self.assertEqual(context.exception.resource, 'time')
+
+    def test_budget_limit(self):
+        outer = Budget()
+        inner = Budget()
+        self.assertIsNone(current_budget())
+        with budget_limit(outer):
+            with budget_limit(inner):
+                self.assertIs(current_budget(), inner)
+            self.assertIs(current_budget(), outer)
+
+            # the budget of a thread is independent of the budgets of other threads
+            seen = []
+            thread = threading.Thread(target=lambda: seen.append(current_budget()))
+            thread.start()
+            thread.join()
+            self.assertEqual(seen, [None])
+        self.assertIsNone(current_budget())
+
+    def test_algorithms(self):
+        N = parse_nfa(nth_symbol_from_the_end_nfa(10))
+        with budget_limit(Budget(max_states=100)):
+            with self.assertRaises(BudgetExceeded) as context:
+                nfa_to_dfa(N)
+        self.assertEqual(context.exception.resource, 'states')
+        with budget_limit(Budget(max_states=10000)):
+            self.assertEqual(len(nfa_to_dfa(N).Q), 2**10)
+
+        r = parse_simple_regexp('(a+b)*(a+b)*')
+        with budget_limit(Budget(max_steps=1000)):
+            self.assertRaises(BudgetExceeded, regexp_words_up_to_n, r, 10)
+        self.assertEqual(len(regexp_words_up_to_n(r, 3)), 15)
+
+        # a concatenation is charged before the product of the sets is computed
+        L = {'a' * i for i in range(100)}
+        with budget_limit(Budget(max_steps=1000)):
+            with self.assertRaises(BudgetExceeded) as context:
+                concatenate(L, L)
+        self.assertEqual(context.exception.resource, 'steps')
+
+        G = parse_simple_cfg('S -> SS | a | b | ε')
+        with budget_limit(Budget(max_memory=10000)):
+            with self.assertRaises(BudgetExceeded) as context:
+                cfg_words_up_to_n(G, 10)
+        self.assertEqual(context.exception.resource, 'memory')
+
+        P = parse_pda(read_utf8_text('examples/pda1.pda'))
+        with budget_limit(Budget(max_steps=100)):
+            self.assertRaises(BudgetExceeded, pda_words_up_to_n, P, 8)
+        with budget_limit(Budget(max_steps=10**7)):
+            self.assertEqual(pda_words_up_to_n(P, 3), {'', 'aab', 'aba', 'baa'})
+
+        # the epsilon closure is interrupted, also if the maximum number of iterations is very large
+        P = parse_pda('initial q\nfinal q\nq q _,_a')
+        max_iterations = GambaTools.pda_epsilon_closure_max_iterations
+        try:
+            GambaTools.pda_epsilon_closure_max_iterations = 10**9
+            for closure in [lambda: pda_epsilon_closure(P, [PDAState(P.q0, [])]), lambda: pda_simulate_word(P, 'a')]:
+                with budget_limit(Budget(max_steps=5000)):
+                    with self.assertRaises(BudgetExceeded) as context:
+                        closure()
+                self.assertEqual(context.exception.resource, 'steps')
+        finally:
+            GambaTools.pda_epsilon_closure_max_iterations = max_iterations
+
+    def test_grading_budget(self):
+        reference = Reference.from_words('', 12)
+        submission = Submission('large', 'nfa', nth_symbol_from_the_end_nfa(12))
+        result = grade_submission(submission, Reference(parse_nfa(nth_symbol_from_the_end_nfa(12)), 12), budget=Budget(max_states=100))
+        self.assertEqual(result['status'], 'correct')  # the languages are compared without a subset construction
+        result = grade_submission(submission, reference, budget=Budget(max_steps=100))
+        self.assertEqual(result['status'], 'budget')
+        self.assertEqual(result['feedback'], ['Error: the maximum number of steps (100) is exceeded'])
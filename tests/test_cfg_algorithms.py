@@ -11,7 +11,7 @@ from gambatools.cfg_algorithms import parse_cfg_baeten, expand_nullable_variable
     cfg_to_chomsky, cfg_words_up_to_n, cfg_accepts_word, parse_simple_cfg, \
     cfg_add_new_start_variable_in_place, cfg_remove_epsilon_rules_in_place, cfg_eliminate_unit_rules_in_place, \
     cfg_make_rules_of_length_two_in_place, cfg_eliminate_terminals_in_place, \
-    cfg_derivable_variables, cfg_print_simple, cfg_is_simple
+    cfg_derivable_variables, cfg_print_simple, cfg_is_simple, cfg_cyk_matrix, cfg_parse_forest, cfg_derive_word
 
 from gambatools.cfg_parser import parse_cfg
 from gambatools.language_algorithms import words_of_length_n, words_up_to_n
@@ -246,6 +246,50 @@ class Test(TestCase):
         G: CFG = parse_simple_cfg(grammar)
         self.assertFalse(cfg_accepts_word(G, 'ab'))
 
+    def test_cfg_parse_forest(self):
+        grammar = '''
+            S = AB + BC
+            A = BA + a
+            B = CC + b
+            C = AB + a
+        '''
+        G: CFG = parse_cfg_baeten(grammar)
+        w = 'baaba'
+        forest = cfg_parse_forest(G, w)
+        self.assertTrue(forest.accepts())
+        self.assertEqual(forest.parse_count(), 2)
+        self.assertTrue(forest.is_ambiguous())
+        X = cfg_cyk_matrix(G, w)
+        Y = forest.matrix()
+        for i in range(len(w)):
+            for j in range(i, len(w)):
+                self.assertEqual(X[i, j], Y[i, j])
+
+        derivations = set()
+        for index in range(forest.parse_count()):
+            for derivation_type in ['leftmost', 'rightmost']:
+                derivation = forest.derivation(derivation_type, index)
+                self.assertEqual(derivation[0], [G.S])
+                self.assertEqual(''.join(derivation[-1]), w)
+                derivations.add(' => '.join(''.join(element) for element in derivation))
+        self.assertEqual(len(derivations), 4)
+        self.assertIn('S => BC => bC => bAB => baB => baCC => baABC => baaBC => baabC => baaba', derivations)
+        self.assertIn('S => AB => ACC => ACa => AABa => AAba => Aaba => BAaba => Baaba => baaba', derivations)
+
+        self.assertFalse(cfg_parse_forest(G, 'bb').accepts())
+        self.assertEqual(cfg_parse_forest(G, 'bb').parse_count(), 0)
+
+        grammar = '''
+            S -> aSb | _
+        '''
+        G: CFG = cfg_to_chomsky(parse_simple_cfg(grammar))
+        self.assertEqual(cfg_derive_word(G, ''), [[G.S], []])
+        derivation = cfg_derive_word(G, 'aabb', 'rightmost')
+        self.assertEqual(''.join(derivation[-1]), 'aabb')
+        self.assertEqual(cfg_parse_forest(G, 'aabb').parse_count(), 1)
+        with self.assertRaises(RuntimeError):
+            cfg_derive_word(G, 'abab')
+
     def test_parse_cfg(self):
         grammar = '''
             S -> A'.A' ;
@@ -0,0 +1,96 @@
+#  (C) Copyright Wieger Wesselink 2020. Distributed under the GPL-3.0-or-later
+#  Software License, (See accompanying file LICENSE or copy at
+#  https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import contextlib
+import io
+import json
+from unittest import TestCase
+
+from gambatools.check_result import CheckResult
+from gambatools.language_generator import languages_difference
+from gambatools.notebook import check_dfa_syntax_result, check_dfa_language_from_words_result, \
+    check_dfa_accepts_rejects_result, check_dfa_accepts_rejects, check_number_of_nfa_states_result
+from gambatools.notebook_cfg import check_cyk_matrix_result
+from gambatools.notebook_chomsky import cfg_check_chomsky_result
+from gambatools.notebook_dfa import check_dfa_reverse_result
+
+dfa_text = '''
+input_symbols a b
+states qA qB qC qD
+initial qA
+final qC
+qA qB a
+qA qD b
+qB qB a
+qB qC b
+qC qB a
+qC qC b
+qD qD a
+qD qD b
+'''
+
+nfa_text = '''
+initial q0
+final q2
+q0 q1 a
+q1 q1 a
+q1 q1 b
+q1 q2 b
+'''
+
+
+class Test(TestCase):
+    def test_languages_difference(self):
+        self.assertEqual(languages_difference({'a', 'ab'}, {'a', 'ab'}), None)
+        self.assertEqual(languages_difference({'a', 'ab', 'abb'}, {'a'}), ('ab', False))
+        self.assertEqual(languages_difference({'a'}, {'a', 'b', 'bb'}), ('b', True))
+
+    def test_check_result(self):
+        result = CheckResult()
+        result.add([], 'unused')
+        self.assertEqual((result.status, result.error_code), ('correct', None))
+        result.add(['Warning: something'], 'style')
+        self.assertEqual((result.status, result.error_code), ('warning', 'style'))
+        result.add_difference(('', True))
+        self.assertEqual((result.status, result.error_code, result.word), ('incorrect', 'style', ''))
+        self.assertEqual(result.feedback, ['Warning: something', "Error: word 'ε' should be accepted"])
+        json.dumps(result.to_dict())
+
+    def test_notebook_check_results(self):
+        result = check_dfa_syntax_result(dfa_text)
+        self.assertEqual(result.status, 'correct')
+        self.assertGreaterEqual(result.time, 0)
+        result = check_dfa_syntax_result('states qA\ninitial')
+        self.assertEqual((result.status, result.error_code), ('error', 'exception'))
+
+        result = check_dfa_language_from_words_result(dfa_text, 'ab aab abb', 3)
+        self.assertEqual(result.status, 'correct')
+        result = check_dfa_language_from_words_result(dfa_text, 'ab aab', 3, max_states=2)
+        self.assertEqual((result.status, result.error_code, result.word), ('incorrect', 'max_states', 'abb'))
+        self.assertEqual(len(result.feedback), 2)
+
+        result = check_dfa_accepts_rejects_result(dfa_text, 'ab abb', 'a b')
+        self.assertEqual(result.status, 'correct')
+        result = check_dfa_accepts_rejects_result(dfa_text, 'ab ba', 'b')
+        self.assertEqual((result.status, result.error_code, result.word), ('incorrect', 'should_be_accepted', 'ba'))
+
+        result = check_number_of_nfa_states_result(nfa_text, 2)
+        self.assertEqual((result.status, result.error_code, result.feedback), ('incorrect', 'number_of_states', []))
+
+        result = check_dfa_reverse_result(dfa_text, nfa_text, 4)
+        self.assertEqual(result.status, 'incorrect')
+        self.assertTrue(result.feedback[0].startswith('Warning'))
+
+        result = cfg_check_chomsky_result('S -> aSb | ε', 'S -> aSb | ε', 2, 'S0', 4)
+        self.assertEqual((result.status, result.error_code), ('incorrect', 'start_variable'))
+
+        result = check_cyk_matrix_result('S -> AB\nA -> a\nB -> b', 'ab', '{S}\n{A} {B}')
+        self.assertEqual((result.status, result.details), ('correct', {'start_variable': 'S', 'accepted': True}))
+
+    def test_print_feedback(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            check_dfa_accepts_rejects(dfa_text, 'ab', 'b')
+            check_dfa_accepts_rejects(dfa_text, 'ab', 'abb')
+        self.assertEqual(out.getvalue(), "OK\nError: word 'abb' should not be accepted\n")
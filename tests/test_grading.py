@@ -0,0 +1,102 @@
+#  (C) Copyright Wieger Wesselink 2020. Distributed under the GPL-3.0-or-later
+#  Software License, (See accompanying file LICENSE or copy at
+#  https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from gambatools.grading import Reference, Submission, grade_submissions, read_submissions
+
+dfa_text = '''
+input_symbols a b
+states qA qB qC qD
+initial qA
+final qC
+qA qB a
+qA qD b
+qB qB a
+qB qC b
+qC qB a
+qC qC b
+qD qD a
+qD qD b
+'''
+
+wrong_dfa_text = '''
+input_symbols a b
+states qA qB
+initial qA
+final qB
+qA qB a
+qA qA b
+qB qB a
+qB qB b
+'''
+
+
+class Test(TestCase):
+    def test_read_submissions(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name, text in [('s1.dfa', dfa_text), ('s2.regexp', 'a(a+b)*b'), ('notes.txt', 'ignored')]:
+                with open(os.path.join(directory, name), 'w') as f:
+                    f.write(text)
+            submissions = read_submissions(directory)
+            self.assertEqual([(s.id, s.kind) for s in submissions], [('s1', 'dfa'), ('s2', 'regexp')])
+
+            filename = os.path.join(directory, 'submissions.jsonl')
+            with open(filename, 'w') as f:
+                f.write(json.dumps({'id': 'a', 'kind': 'cfg', 'text': 'S -> aSb | ε'}) + '\n\n')
+                f.write(json.dumps({'id': 'b', 'kind': 'nfa', 'text': ''}) + '\n')
+            submissions = read_submissions(filename)
+            self.assertEqual([(s.id, s.kind) for s in submissions], [('a', 'cfg'), ('b', 'nfa')])
+
+    def test_grade_submissions(self):
+        with tempfile.TemporaryDirectory() as directory:
+            answerfile = os.path.join(directory, 'answer.dfa')
+            with open(answerfile, 'w') as f:
+                f.write(dfa_text)
+            reference = Reference.from_file(answerfile, 6, max_states=4)
+            submissions = [Submission('correct', 'regexp', 'a(a+b)*b'),
+                           Submission('incorrect', 'dfa', wrong_dfa_text),
+                           Submission('syntax', 'dfa', 'states qA\n initial'),
+                           Submission('automaton', 'dfa', dfa_text)]
+            expected = [('correct', 'correct'), ('incorrect', 'incorrect'), ('syntax', 'error'), ('automaton', 'correct')]
+            for processes in [1, 2]:
+                results = grade_submissions(submissions, reference, processes=processes, timeout=60)
+                self.assertEqual([(r['id'], r['status']) for r in results], expected)
+                self.assertEqual(results[1]['feedback'], ["Error: word 'a' should not be accepted"])
+                json.dumps(results)
+
+            reference = Reference.from_words('ab aab abb', 3)
+            results = grade_submissions(submissions[:1], reference)
+            self.assertEqual(results[0]['status'], 'correct')
+
+    def test_reference_words(self):
+        import gambatools.dfa_algorithms
+        calls = []
+        dfa_words_up_to_n = gambatools.dfa_algorithms.dfa_words_up_to_n
+
+        def counting_dfa_words_up_to_n(D, n):
+            calls.append(n)
+            return dfa_words_up_to_n(D, n)
+
+        with tempfile.TemporaryDirectory() as directory:
+            answerfile = os.path.join(directory, 'answer.dfa')
+            with open(answerfile, 'w') as f:
+                f.write(dfa_text)
+            reference = Reference.from_file(answerfile, 5)
+            submissions = [Submission(str(i), 'regexp', 'a(a+b)*b') for i in range(10)] + [Submission('d', 'dfa', dfa_text)]
+            try:
+                gambatools.dfa_algorithms.dfa_words_up_to_n = counting_dfa_words_up_to_n
+                results = grade_submissions(submissions, reference)
+            finally:
+                gambatools.dfa_algorithms.dfa_words_up_to_n = dfa_words_up_to_n
+            self.assertTrue(all(r['status'] == 'correct' for r in results))
+            self.assertEqual(calls, [5])
+
+    def test_grading_timeout(self):
+        reference = Reference.from_words('', 30)
+        results = grade_submissions([Submission('slow', 'regexp', '(a+b)*')], reference, timeout=0.2)
+        self.assertEqual(results[0]['status'], 'timeout')
@@ -0,0 +1,30 @@
+#  (C) Copyright Wieger Wesselink 2020. Distributed under the GPL-3.0-or-later
+#  Software License, (See accompanying file LICENSE or copy at
+#  https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import subprocess
+import sys
+from unittest import TestCase
+
+
+class Test(TestCase):
+    def imported_modules(self, statement: str):
+        """Executes statement in a fresh interpreter, and returns the modules that were imported"""
+        code = '{}\nimport sys\nprint(" ".join(sys.modules))'.format(statement)
+        output = subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True).stdout
+        return set(output.split())
+
+    def test_lazy_imports(self):
+        # the algorithms, the parsers and the notebook functions can be imported without loading the rendering
+        # dependencies or the ANTLR runtime
+        heavy_modules = {'graphviz', 'tabulate', 'IPython', 'antlr4', 'multiprocessing'}
+        for statement in ['from gambatools.dfa_algorithms import dfa_accepts_word',
+                          'import gambatools.nfa_algorithms, gambatools.pda_algorithms, gambatools.tm_algorithms',
+                          'import gambatools.cfg_algorithms, gambatools.regexp_algorithms',
+                          'from gambatools.regexp_simple_parser import parse_simple_regexp; parse_simple_regexp("(a+b)*c")',
+                          'import gambatools.notebook, gambatools.notebook_cfg, gambatools.notebook_dfa',
+                          ]:
+            modules = set(m.split('.')[0] for m in self.imported_modules(statement))
+            self.assertEqual(modules & heavy_modules, set(), statement)
+
+        self.assertIn('graphviz', self.imported_modules('from gambatools.dfa_io import draw_dfa; draw_dfa({"q"}, set(), {}, "q", set())'))
@@ -0,0 +1,59 @@
+#  (C) Copyright Wieger Wesselink 2020. Distributed under the GPL-3.0-or-later
+#  Software License, (See accompanying file LICENSE or copy at
+#  https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import os
+import sys
+import tempfile
+from unittest import TestCase
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'notebooks'))
+from make_notebook import process_paragraph
+
+from gambatools.text_utility import read_utf8_text, write_utf8_text
+
+
+class Test(TestCase):
+    def test_process_paragraph(self):
+        with tempfile.TemporaryDirectory() as directory:
+            template_file = os.path.join(directory, 'template.ipynb')
+            input_file = os.path.join(directory, 'answer.dfa')
+            write_utf8_text(template_file, 'length <<length>>\n<<load(inputfile)>>')
+            write_utf8_text(input_file, '%% length = 3\ninitial q0\nq0 q0 a')
+            paragraph = 'templatefile = {}\ninputfile = {}\nname = exercise'.format(template_file, input_file)
+            outputfile = os.path.join(directory, 'exercise.ipynb')
+
+            question, output, digest, printed = process_paragraph(0, paragraph, directory, False, {})
+            self.assertEqual((output, printed), (outputfile, 'Creating {}\n'.format(outputfile)))
+            self.assertIn('length 3', read_utf8_text(outputfile))
+
+            # the notebook is skipped if the digest matches the manifest
+            manifest = {outputfile: digest}
+            _, _, digest1, printed = process_paragraph(0, paragraph, directory, False, manifest)
+            self.assertEqual(digest1, digest)
+            self.assertTrue(printed.startswith('Skipping'))
+
+            # the notebook is created again if the template or the input file changes
+            write_utf8_text(template_file, 'length = <<length>>\n<<load(inputfile)>>')
+            _, _, digest2, printed = process_paragraph(0, paragraph, directory, False, manifest)
+            self.assertNotEqual(digest2, digest)
+            self.assertTrue(printed.startswith('Creating'))
+            self.assertIn('length = 3', read_utf8_text(outputfile))
+            manifest = {outputfile: digest2}
+            write_utf8_text(input_file, '%% length = 4\ninitial q0\nq0 q0 a')
+            _, _, digest3, printed = process_paragraph(0, paragraph, directory, False, manifest)
+            self.assertNotEqual(digest3, digest2)
+            self.assertIn('length = 4', read_utf8_text(outputfile))
+
+            # an error in one paragraph does not affect the other paragraphs
+            paragraphs = ['templatefile = {}\nname = broken'.format(os.path.join(directory, 'missing.ipynb')), paragraph]
+            results = [process_paragraph(i, p, directory, False, {}) for i, p in enumerate(paragraphs)]
+            self.assertIsNone(results[0][2])
+            self.assertIn('Error', results[0][3])
+            self.assertEqual(results[1][2], digest3)
+            self.assertTrue(results[1][3].startswith('Creating'))
+
+
+if __name__ == '__main__':
+    import unittest
+    unittest.main()
@@ -5,9 +5,12 @@
 from unittest import TestCase
 
 from gambatools.cfg_algorithms import parse_cfg_baeten, cfg_to_nfa
-from gambatools.dfa_algorithms import dfa_words_up_to_n
+from gambatools.dfa_algorithms import dfa_words_up_to_n, dfa_accepts_word
 from gambatools.nfa_algorithms import nfa_accepts_word, nfa_words_up_to_n, nfa_to_dfa, random_nfa, \
-    parse_nfa
+    parse_nfa, nfa_to_lazy_dfa, nfa_included, nfa_equivalent, nfa_reduce, nfa_simulate_word
+from gambatools.regexp_algorithms import regexp_to_nfa
+from gambatools.regexp_simple_parser import parse_simple_regexp
+from gambatools.language_generator import check_equal_languages
 from gambatools.dfa import Symbol
 from gambatools.nfa import NFA
 from gambatools.printing import print_words
@@ -96,6 +99,104 @@ class Test(TestCase):
                 print('words_up_to_n(N, {}) = {}'.format(n, print_words(wordsN)))
             self.assertEqual(wordsD, wordsN)
 
+    def test_lazy_dfa(self):
+        for i in range(50):
+            N = random_nfa({Symbol('a'), Symbol('b')}, 5)
+            D = nfa_to_dfa(N)
+            L = nfa_to_lazy_dfa(N, max_cache_size=4)
+            self.assertEqual(dfa_words_up_to_n(L, 4), dfa_words_up_to_n(D, 4))
+            for word in ['', 'a', 'ab', 'bba', 'abab']:
+                self.assertEqual(dfa_accepts_word(L, word), nfa_accepts_word(N, word))
+            self.assertLessEqual(len(L._cache), 4)
+            E = L.to_dfa()
+            self.assertEqual((E.Q, E.F, E.q0), (D.Q, D.F, D.q0))
+            self.assertEqual(dict(E.delta), dict(D.delta))
+            self.assertEqual(set(L.F), D.F)
+            self.assertEqual(D.Q - L.F, D.Q - D.F)
+
+        # only the states that are visited are created
+        N = parse_nfa('''
+            initial q0
+            final q3
+            q0 q0 a b
+            q0 q1 a
+            q1 q2 a b
+            q2 q3 a b
+        ''')
+        L = nfa_to_lazy_dfa(N)
+        self.assertTrue(dfa_accepts_word(L, 'baab'))
+        self.assertEqual(len(L._cache), 4)
+        self.assertEqual(len(L.Q), 8)
+
+    def test_nfa_included(self):
+        for i in range(100):
+            N1 = random_nfa({Symbol('a'), Symbol('b')}, 3)
+            N2 = random_nfa({Symbol('a'), Symbol('b')}, 3)
+            words1 = nfa_words_up_to_n(N1, 6)
+            words2 = nfa_words_up_to_n(N2, 6)
+            included, word = nfa_included(N1, N2)
+            if included:
+                self.assertTrue(words1 <= words2)
+            else:
+                self.assertTrue(nfa_accepts_word(N1, word))
+                self.assertFalse(nfa_accepts_word(N2, word))
+                if words1 - words2:
+                    self.assertEqual(len(word), min(len(w) for w in words1 - words2))
+            self.assertEqual(nfa_equivalent(N1, N1), (True, None))
+            self.assertEqual(nfa_equivalent(N1, nfa_to_dfa(N1)), (True, None))
+
+        # the words with an a at the 12th position from the end; the minimal DFA has 2^12 states
+        text = '''
+            initial q0
+            final q12
+            q0 q0 a b
+            q0 q1 a
+        ''' + '\n'.join('q{} q{} a b'.format(i, i + 1) for i in range(1, 12))
+        N1 = parse_nfa(text)
+        N2 = parse_nfa(text.replace('q0 q1 a', 'q0 q1 b'))
+        self.assertEqual(nfa_equivalent(N1, N1), (True, None))
+        self.assertEqual(nfa_equivalent(N1, N2), (False, 'a' + 'a' * 11))
+        self.assertEqual(check_equal_languages(N1, N2), ["Error: word 'aaaaaaaaaaaa' should not be accepted"])
+        self.assertEqual(check_equal_languages(N1, N1), [])
+
+    def test_nfa_reduce(self):
+        for i in range(100):
+            N = random_nfa({Symbol('a'), Symbol('b')}, 5)
+            R = nfa_reduce(N)
+            self.assertLessEqual(len(R.Q), len(N.Q))
+            self.assertEqual(nfa_equivalent(N, R), (True, None))
+            self.assertFalse(any(a == R.epsilon and Q1 for (_, a), Q1 in R.delta.items()))
+            self.assertEqual(dfa_words_up_to_n(nfa_to_dfa(N, reduce=True), 5), dfa_words_up_to_n(nfa_to_dfa(N), 5))
+
+        N = regexp_to_nfa(parse_simple_regexp('(a+b)*abb'))
+        R = nfa_reduce(N)
+        self.assertEqual(len(R.Q), 4)
+        self.assertEqual(nfa_equivalent(N, R), (True, None))
+        self.assertEqual(len(nfa_to_dfa(N, reduce=True).Q), 4)
+
+    def test_nfa_words_up_to_n_bitsets(self):
+        for i in range(100):
+            N = random_nfa({Symbol('a'), Symbol('b'), Symbol('c')}, 5)
+            words = nfa_words_up_to_n(N, 5)
+            self.assertEqual(words, nfa_words_up_to_n(N, 5, max_bitset_size=0))
+            self.assertEqual(words, set(w for w in dfa_words_up_to_n(nfa_to_dfa(N), 5)))
+
+    def test_nfa_simulate_word(self):
+        N = regexp_to_nfa(parse_simple_regexp('(a+b)*abb'))
+        for w in ['abb', 'ab' * 1000 + 'abb', 'ba' * 5000 + 'bb']:
+            run = nfa_simulate_word(N, w)
+            self.assertIsNotNone(run)
+            self.assertEqual(run[0], (N.q0, w))
+            self.assertIn(run[-1][0], N.F)
+            self.assertEqual(run[-1][1], '')
+            for (p, u), (q, v) in zip(run, run[1:]):
+                if u == v:
+                    self.assertIn(q, N.delta[p, N.epsilon])
+                else:
+                    self.assertEqual(u[1:], v)
+                    self.assertIn(q, N.delta[p, Symbol(u[0])])
+        self.assertIsNone(nfa_simulate_word(N, 'ab' * 1000))
+
 
 def parse_nfa_baeten(text: str) -> NFA:
     G = parse_cfg_baeten(text)
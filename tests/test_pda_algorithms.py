@@ -8,7 +8,8 @@ import copy
 
 from gambatools.language_algorithms import words_up_to_n
 from gambatools.pda_algorithms import pda_accepts_word, pda_words_up_to_n, pda_to_cfg, \
-    pda_to_push_pop, pda_to_one_accepting_state_in_place, print_pda, pda_is_push_pop, parse_pda
+    pda_to_push_pop, pda_to_one_accepting_state_in_place, print_pda, pda_is_push_pop, parse_pda, \
+    PDAState, make_pda_stack, empty_pda_stack, pda_simulate_word, PDATransitionIndex
 from gambatools.pda import PDA
 from gambatools.cfg_algorithms import cfg_words_up_to_n, cfg_remove_inproductive_variables_in_place, \
     cfg_remove_epsilon_rules_in_place, cfg_remove_useless_rules_in_place
@@ -158,7 +159,7 @@ class Test(TestCase):
 
         self._pda_to_one_accepting_state_test(P)
         self._pda_to_push_pop_test(P)
-        # self.pda_to_cfg_test(P) # does not finish!
+        self._pda_to_cfg_test(P, True)
 
     def test_pda_to_cfg(self):
         pda = '''
@@ -169,6 +170,8 @@ class Test(TestCase):
         '''
         P = parse_pda(pda)
         self.assertTrue(pda_is_push_pop(P))
+        G = pda_to_cfg(P, True)
+        self.assertEqual(len(G.V), 4)  # only A'C, A'A, B'B and C'C are generated
         self._pda_to_one_accepting_state_test(P)
         self._pda_to_push_pop_test(P)
         self._pda_to_cfg_test(P, True)
@@ -232,6 +235,98 @@ class Test(TestCase):
         '''
         P = parse_pda(pda)
 
+    def test_pda_state(self):
+        stack = make_pda_stack(['$', 'a'])
+        self.assertEqual(stack.to_list(), ['$', 'a'])
+        self.assertEqual(stack.top, 'a')
+        self.assertEqual(stack.size, 2)
+        self.assertIs(stack.pop().pop(), empty_pda_stack)
+        self.assertTrue(empty_pda_stack.is_empty())
+
+        # stacks with the same content are equal, and share their tails
+        stack1 = stack.push('b')
+        stack2 = make_pda_stack(['$', 'a', 'b'])
+        self.assertEqual(stack1, stack2)
+        self.assertEqual(hash(stack1), hash(stack2))
+        self.assertIs(stack1.pop(), stack)
+        self.assertNotEqual(stack1, stack.push('c'))
+
+        r1 = PDAState('q', stack1)
+        r2 = PDAState('q', ['$', 'a', 'b'])
+        self.assertEqual(r1, r2)
+        self.assertEqual(len({r1, r2}), 1)
+        self.assertNotEqual(r1, PDAState('p', stack1))
+        self.assertEqual(str(r1), '(q, [$ab])')
+        self.assertFalse(stack1 == None)
+        self.assertNotEqual(stack1, ['$', 'a', 'b'])
+        self.assertFalse(r1 == None)
+        self.assertNotEqual(r1, stack1)
+
+        P = parse_pda('''
+            initial q1
+            final q4
+            q1 q2 _,_$
+            q2 q2 0,_0
+            q2 q3 1,0_
+            q3 q3 1,0_
+            q3 q4 _,$_
+        ''')
+        expected_result = [('q1', '01', []), ('q2', '01', ['$']), ('q2', '1', ['$', '0']), ('q3', '', ['$']), ('q4', '', [])]
+        self.assertEqual(pda_simulate_word(P, '01'), expected_result)
+
+        # the run on a long word is reconstructed from the recorded predecessors
+        n = 2000
+        result = pda_simulate_word(P, '0' * n + '1' * n)
+        self.assertEqual(len(result), 2 * n + 3)
+        self.assertEqual(result[n + 1], ('q2', '1' * n, ['$'] + ['0'] * n))
+        self.assertEqual(result[-1], ('q4', '', []))
+        self.assertIsNone(pda_simulate_word(P, '0' * n + '1' * (n - 1)))
+
+    def test_pda_transition_index(self):
+        P = parse_pda('''
+            initial q1
+            final q4
+            q1 q2 _,_$
+            q2 q2 0,_0
+            q2 q3 1,0_
+            q3 q3 1,0_
+            q3 q4 _,$_
+        ''')
+        index = PDATransitionIndex(P)
+        epsilon = P.epsilon
+        self.assertEqual(index.transitions(PDAState('q2', ['$']), '1'), [])
+        self.assertEqual(index.transitions(PDAState('q2', ['$', '0']), '1'), [('0', 'q3', epsilon)])
+        self.assertEqual(index.transitions(PDAState('q2', []), '0'), [(epsilon, 'q2', '0')])
+        self.assertEqual(index.successors(PDAState('q3', ['$']), epsilon), [PDAState('q4', [])])
+        self.assertEqual(index.successors(PDAState('q3', ['0']), epsilon), [])
+        self.assertEqual(len(index.by_input['q3', '1']), 1)
+
+    def test_pda_accepts_word_epsilon_cycle(self):
+        # The epsilon loop in q0 can push an unbounded number of symbols
+        pda = '''
+            initial q0
+            final q1
+            q0 q0 _,_X
+            q0 q1 _,__
+            q1 q1 a,X_
+        '''
+        P = parse_pda(pda)
+        self.assertTrue(pda_accepts_word(P, ''))
+        self.assertTrue(pda_accepts_word(P, 'a' * 1500))
+
+        # The epsilon loop in q1 replaces the top of the stack forever
+        pda = '''
+            initial q0
+            final q2
+            q0 q1 a,_X
+            q1 q1 _,XY _,YX
+            q1 q2 b,Y_
+        '''
+        P = parse_pda(pda)
+        self.assertTrue(pda_accepts_word(P, 'ab'))
+        self.assertFalse(pda_accepts_word(P, 'a'))
+        self.assertFalse(pda_accepts_word(P, 'abb'))
+
     def test_pda_words_up_to_n(self):
         count = 0
         length = 8
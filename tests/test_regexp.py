@@ -7,6 +7,7 @@ from unittest import TestCase
 from gambatools.regexp import *
 from gambatools.regexp_parser import parse_regexp
 from gambatools.regexp_simple_parser import parse_simple_regexp
+from gambatools.regexp_descent_parser import parse_regexp_descent, parse_simple_regexp_descent
 
 
 __author__      = "Wieger Wesselink"
@@ -46,6 +47,26 @@ class Test(TestCase):
         self._parse_print_test('a . b . c')
         self._parse_print_test('abc', 'a . b . c', simple=True)
 
+    def test_descent_parser(self):
+        def structure(x: Regexp) -> str:
+            if isinstance(x, (Sum, Concat)):
+                return '{}({}, {})'.format(x.__class__.__name__, structure(x.left), structure(x.right))
+            elif isinstance(x, Iteration):
+                return 'Iteration({})'.format(structure(x.operand))
+            return str(x)
+
+        for text in ['abc', 'a+b+c', 'ab*+c', 'a + bc + d', '(a+b)*abb(a+1)*0', 'a**b', '((a))', 'a %comment\n b']:
+            self.assertEqual(structure(parse_simple_regexp_descent(text)), structure(parse_simple_regexp(text, use_antlr=True)))
+        for text in ['a.b.c', 'a + b.c*', 'a_1 . b2 + 1 . 0', '(a+b)* . a . b']:
+            self.assertEqual(structure(parse_regexp_descent(text)), structure(parse_regexp(text, use_antlr=True)))
+
+        # syntax errors are left to the ANTLR parser, which recovers from them
+        for text in ['', 'a+', 'a)', '(a', 'a?b']:
+            self.assertIsNone(parse_simple_regexp_descent(text))
+        self.assertEqual(str(parse_simple_regexp('a)')), 'a')
+        self.assertIsNone(parse_regexp_descent('a b'))
+        self.assertEqual(str(parse_regexp('a b')), 'a')
+
 
 if __name__ == '__main__':
     import unittest
@@ -0,0 +1,68 @@
+#  (C) Copyright Wieger Wesselink 2020. Distributed under the GPL-3.0-or-later
+#  Software License, (See accompanying file LICENSE or copy at
+#  https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import os
+import tempfile
+from unittest import TestCase
+
+from gambatools.global_settings import GambaTools
+from gambatools.result_cache import ResultCache, cached_words, default_result_cache
+
+
+class Test(TestCase):
+    def test_result_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResultCache(directory, max_size=250)
+            self.assertNotEqual(cache.key('ab', 'c'), cache.key('a', 'bc'))
+            self.assertEqual(cache.key('ab', 'c'), cache.key(b'ab', 'c'))
+
+            keys = [cache.key(str(i)) for i in range(3)]
+            self.assertIsNone(cache.get(keys[0]))
+            cache.put(keys[0], b'x' * 100)
+            cache.put(keys[1], b'y' * 100)
+            self.assertEqual(cache.get(keys[0]), b'x' * 100)
+
+            # keys[1] is the least recently used entry, so it is removed first
+            paths = {key: cache._path(key) for key in keys[:2]}
+            os.utime(paths[keys[1]], (1, 1))
+            cache.put(keys[2], b'z' * 100)
+            self.assertIsNone(cache.get(keys[1]))
+            self.assertEqual(cache.get(keys[0]), b'x' * 100)
+            self.assertEqual(cache.get(keys[2]), b'z' * 100)
+            self.assertLessEqual(cache.size(), 250)
+
+            # the directory is only scanned if the tracked size exceeds max_size
+            scans = []
+            entries = cache.entries
+            cache.entries = lambda: scans.append(1) or entries()
+            cache.put(keys[2], b'z' * 50)
+            self.assertEqual((cache._size, len(scans)), (150, 0))
+            cache.put(keys[1], b'y' * 150)
+            self.assertEqual(len(scans), 1)
+            self.assertEqual(cache._size, cache.size())
+            self.assertLessEqual(cache._size, 250)
+            del cache.entries
+
+            cache.clear()
+            self.assertEqual(cache.size(), 0)
+
+    def test_cached_words(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {'', 'ab', 'aabb'}
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache_directory = GambaTools.cache_directory
+            try:
+                GambaTools.cache_directory = None
+                self.assertIsNone(default_result_cache())
+                self.assertEqual(cached_words(['S = aSb + 1', 'generate', '4'], compute), {'', 'ab', 'aabb'})
+                GambaTools.cache_directory = directory
+                for i in range(3):
+                    self.assertEqual(cached_words(['S = aSb + 1', 'generate', '4'], compute), {'', 'ab', 'aabb'})
+                self.assertEqual(len(calls), 2)
+            finally:
+                GambaTools.cache_directory = cache_directory
@@ -6,7 +6,8 @@ from unittest import TestCase
 import os
 
 from gambatools.language_algorithms import words_up_to_n
-from gambatools.tm_algorithms import tm_accepts_word, tm_words_up_to_n, tm_simulate_word, print_tm_state, parse_tm
+from gambatools.tm_algorithms import tm_accepts_word, tm_words_up_to_n, tm_simulate_word, print_tm_state, parse_tm, \
+    tm_compile, tm_run_words, print_tm
 from gambatools.printing import print_words
 from gambatools.text_utility import read_utf8_text, remove_comments
 
@@ -80,6 +81,200 @@ class Test(TestCase):
         expected_result = '{#, 0#0, 1#1, 00#00, 01#01, 10#10, 11#11}'
         self.assertEqual(expected_result, result)
 
+        # the compiled TM takes the same number of steps as tm_simulate_word
+        C = tm_compile(T)
+        for word in ['1011#1011', '10#11', '0#', '01']:
+            accepted, steps = C.run(word)
+            states = tm_simulate_word(T, word)
+            self.assertEqual(steps, len(states) - 1)
+            self.assertEqual(accepted, states[-1][0] == T.q_accept)
+        self.assertEqual(C.run('1011#1011', 10), (None, 10))
+
+        # long runs
+        word = '0110' * 50
+        word = word + '#' + word
+        self.assertIsNone(tm_accepts_word(T, word))
+        self.assertTrue(tm_accepts_word(T, word, max_steps=10**6))
+        self.assertEqual(C.run(word, 10**6)[1], 80802)
+        self.assertFalse(tm_accepts_word(T, word + '0', max_steps=10**6))
+
+    def test_tm_loop_detection(self):
+        # On input a the TM moves back and forth forever, on input b it moves to the right forever
+        tm = '''
+            initial q0
+            accept q_accept
+            reject q_reject
+            input_symbols a b c
+            tape_symbols a b c x _
+            q0 q1 aa,R
+            q1 q0 __,L
+            q0 q2 bx,R
+            q2 q2 __,R
+            q0 q_accept cc,R
+        '''
+        T = parse_tm(tm)
+        C = tm_compile(T)
+        self.assertEqual(C.run('a', 10**6, detect_loops=False), (None, 10**6))
+        accepted, steps = C.run('a', 10**6)
+        self.assertFalse(accepted)
+        self.assertLess(steps, 10)
+        accepted, steps = C.run('b', 10**6)
+        self.assertFalse(accepted)
+        self.assertLess(steps, 100)
+        self.assertTrue(tm_accepts_word(T, 'c'))
+        self.assertEqual(tm_words_up_to_n(T, 6, max_steps=10**6), set('c' + w for w in words_up_to_n({'a', 'b', 'c'}, 5)))
+
+    def test_tm_run_words_parallel(self):
+        tm = '''
+            initial q0
+            accept q_accept
+            reject q_reject
+            input_symbols a b
+            tape_symbols a b _
+            blank _
+            q0 q1 aa,R
+            q0 q_reject bb,R
+            q1 q0 aa,R
+            q1 q_reject bb,R __,R
+            q0 q_accept __,R
+        '''
+        T = parse_tm(tm)
+        words = sorted(words_up_to_n({'a', 'b'}, 10), key=lambda w: (len(w), w))
+        expected = [tm_accepts_word(T, word) for word in words]
+        self.assertEqual(tm_run_words(T, words, processes=3, chunk_size=100), expected)
+        self.assertEqual(tm_words_up_to_n(T, 10, processes=2), set('a' * i for i in range(0, 11, 2)))
+        with self.assertRaises(RuntimeError):
+            tm_run_words(T, words, time_budget=0)
+        with self.assertRaises(RuntimeError):
+            tm_run_words(T, words, processes=2, chunk_size=100, time_budget=0)
+
+    def test_tm_multitape(self):
+        # a two tape TM for the language { a^n b^n | n >= 0 }
+        tm = '''
+            tapes 2
+            initial q0
+            accept q_accept
+            reject q_reject
+            input_symbols a b
+            tape_symbols a b _
+            blank _
+            q0 q_accept ____,SS
+            q0 q2 a_aa,RR
+            q2 q2 a_aa,RR
+            q2 q1 b_b_,SL
+            q1 q1 bab_,RL
+            q1 q_accept ____,SS
+        '''
+        T = parse_tm(tm)
+        self.assertEqual(T.tapes, 2)
+        self.assertEqual(T.delta['q1', ('b', 'a')], ('q1', ('b', '_'), ('R', 'L')))
+        self.assertEqual(tm_words_up_to_n(T, 8), set('a' * n + 'b' * n for n in range(5)))
+        C = tm_compile(T)
+        for word in ['', 'ab', 'aabb', 'aab', 'abb', 'ba', 'aaaabbbb']:
+            table = tm_simulate_word(T, word)
+            accepted, steps = C.run(word, detect_loops=False)
+            self.assertEqual(steps, len(table) - 1)
+            self.assertEqual(accepted, table[-1][0] == T.q_accept)
+        self.assertEqual(C.run('a' * 1000 + 'b' * 1000, 10**4), (True, 2002))
+        self.assertEqual(parse_tm(print_tm(T)).delta, T.delta)
+
+        # a two tape TM that does not move
+        T = parse_tm('''
+            tapes 2
+            initial q0
+            q0 q0 ____,SS
+        ''')
+        self.assertEqual(tm_compile(T).run('', 10**6)[0], False)
+
+        with self.assertRaises(RuntimeError):
+            parse_tm('''
+                tapes 2
+                initial q0
+                q0 q0 ab,R
+            ''')
+
+    def test_tm_two_way_tape(self):
+        tm = '''
+            initial q0
+            accept q_accept
+            reject q_reject
+            input_symbols a
+            tape_symbols a x _
+            blank _
+            q0 q1 aa,L
+            q1 q2 _x,R
+            q2 q_accept aa,R
+        '''
+        T = parse_tm(tm)
+        self.assertFalse(T.two_way)
+        self.assertFalse(tm_accepts_word(T, 'a'))
+        T = parse_tm('tape_mode two_way\n' + tm)
+        self.assertTrue(T.two_way)
+        self.assertTrue(tm_accepts_word(T, 'a'))
+        self.assertEqual(tm_simulate_word(T, 'a')[-1], ('q_accept', ['x', 'a', '_'], 2))
+
+        # a TM that moves to the left forever
+        tm = '''
+            initial q0
+            q0 q0 aa,L __,L
+        '''
+        T = parse_tm(tm)
+        self.assertEqual(tm_compile(T).run('aaa', 10**6)[0], False)
+        T = parse_tm('tape_mode two_way\n' + tm)
+        accepted, steps = tm_compile(T).run('aaa', 10**6)
+        self.assertFalse(accepted)
+        self.assertLess(steps, 10)
+        self.assertEqual(tm_compile(T).run('aaa', 100, detect_loops=False), (None, 100))
+
+    def test_tm_macro_steps(self):
+        # the language { w#w | w in {0,1}* }
+        tm = '''
+            initial q1
+            accept q_accept
+            input_symbols 0 1 #
+            tape_symbols 0 1 # x _
+            q1 q2 0x,R
+            q1 q3 1x,R
+            q1 q8 ##,R
+            q2 q2 00,R 11,R
+            q2 q4 ##,R
+            q3 q3 00,R 11,R
+            q3 q5 ##,R
+            q4 q4 xx,R
+            q4 q6 0x,L
+            q5 q5 xx,R
+            q5 q6 1x,L
+            q6 q6 00,L 11,L xx,L
+            q6 q7 ##,L
+            q7 q7 00,L 11,L
+            q7 q1 xx,R
+            q8 q8 xx,R
+            q8 q_accept __,R
+        '''
+        T = parse_tm(tm)
+        C = tm_compile(T)
+        for word in ['', '#', '0#0', '01#01', '01#00', '0110#0110', '0' * 50 + '#' + '0' * 50, '01' * 30 + '#' + '01' * 29 + '1']:
+            for max_steps in [0, 1, 10, 100, 10**6]:
+                expected = C.run(word, max_steps, detect_loops=False, accelerate=False)
+                self.assertEqual(C.run(word, max_steps, detect_loops=False), expected)
+                self.assertEqual(C.run(word, max_steps), expected)
+
+        # a TM that overwrites a block of symbols
+        T = parse_tm('''
+            tape_mode two_way
+            initial q0
+            accept q_accept
+            input_symbols a
+            tape_symbols a b _
+            q0 q0 ab,R
+            q0 q1 _b,L
+            q1 q1 bb,L
+            q1 q_accept __,R
+        ''')
+        self.assertEqual(tm_compile(T).run('a' * 1000, 10**4), tm_compile(T).run('a' * 1000, 10**4, accelerate=False))
+        self.assertEqual(tm_compile(T).run('a' * 1000, 10**4), (True, 2002))
+        self.assertEqual(tm_simulate_word(T, 'aaa')[-1][1], ['_', 'b', 'b', 'b', 'b'])
+
     def test_tape_alphabet(self):
         # This is a test for issue https://github.com/wiegerw/gambatools/issues/1
         turing_machine = '''